@@ -0,0 +1,56 @@
+"""Compare the batch datetime APIs with the scalar loop on 100k values
+
+python -m benchmarks.bench_batch_datetime
+"""
+import datetime
+import time
+from types import SimpleNamespace
+
+from discord_ext_commands_coghelper.utils import (
+    try_strptime,
+    try_strftime,
+    try_strptime_many,
+    try_strftime_many,
+    get_corrected_before_after_str,
+    get_corrected_before_after_str_many,
+)
+
+SIZE = 100_000
+FMTS = ("%Y/%m/%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
+JST = datetime.timezone(datetime.timedelta(hours=9), "JST")
+
+
+def measure(label: str, func) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:40s} {elapsed * 1000:9.1f}ms")
+    return elapsed
+
+
+def main():
+    base = datetime.datetime(2020, 1, 1)
+    dts = [base + datetime.timedelta(minutes=i) for i in range(SIZE)]
+    strings = [dt.strftime("%Y-%m-%d %H:%M:%S") for dt in dts]
+    windows = [(dt.replace(tzinfo=JST), None) for dt in dts]
+    owner = SimpleNamespace(created_at=datetime.datetime(2015, 5, 13))
+
+    measure("try_strptime loop", lambda: [try_strptime(s, *FMTS) for s in strings])
+    measure("try_strptime_many", lambda: try_strptime_many(strings, *FMTS))
+    measure("try_strftime loop", lambda: [try_strftime(dt, *FMTS) for dt in dts])
+    measure("try_strftime_many", lambda: try_strftime_many(dts, *FMTS))
+    measure(
+        "get_corrected_before_after_str loop",
+        lambda: [
+            get_corrected_before_after_str(before, after, owner, JST, *FMTS)
+            for before, after in windows
+        ],
+    )
+    measure(
+        "get_corrected_before_after_str_many",
+        lambda: get_corrected_before_after_str_many(windows, owner, JST, *FMTS),
+    )
+
+
+if __name__ == "__main__":
+    main()
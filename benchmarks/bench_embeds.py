@@ -0,0 +1,45 @@
+"""Compare error embed construction through the templates with the direct construction
+
+python -m benchmarks.bench_embeds
+"""
+import timeit
+from types import SimpleNamespace
+
+from discord import Embed
+
+from discord_ext_commands_coghelper import (
+    ChannelNotFoundError,
+    ChannelTypeError,
+    UserNotFoundError,
+)
+
+NUMBER = 50_000
+
+
+def legacy_embed(error, description):
+    embed = Embed(title=error.title, description=description)
+    for key, value in error.causes.items():
+        embed.add_field(name=key, value=value)
+    return embed
+
+
+def main():
+    ctx = SimpleNamespace(message=SimpleNamespace(content="!report channel_id=10"))
+    channel = SimpleNamespace(mention="<#10>")
+    errors = [
+        ChannelNotFoundError(ctx, 10),
+        UserNotFoundError(ctx, 20),
+        ChannelTypeError(ctx, channel, "text"),
+    ]
+    for error in errors:
+        name = type(error).__name__
+        legacy = timeit.timeit(lambda: legacy_embed(error, "!report"), number=NUMBER)
+        template = timeit.timeit(lambda: error.to_embed("!report"), number=NUMBER)
+        print(
+            f"{name:22s} legacy={legacy * 1e6 / NUMBER:6.2f}us "
+            f"template={template * 1e6 / NUMBER:6.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Measure the import time of the package and its parts in new interpreters
+
+python -m benchmarks.bench_import
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+STATEMENTS = (
+    "import discord_ext_commands_coghelper",
+    "from discord_ext_commands_coghelper.utils.misc import try_strptime",
+    "from discord_ext_commands_coghelper.utils import get_bool",
+    "from discord_ext_commands_coghelper import CogHelper",
+    "import discord.ext.commands",
+)
+REPEAT = 10
+
+
+def measure(statement: str) -> float:
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    baseline = measure("pass")
+    for statement in STATEMENTS:
+        elapsed = measure(statement) - baseline
+        print(f"{elapsed * 1e3:8.2f}ms {statement}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Per-invocation logging cost of CogHelper.execute when DEBUG is disabled
+
+python -m benchmarks.bench_logging
+"""
+import logging
+import timeit
+
+from discord_ext_commands_coghelper.coghelper import logger
+from discord_ext_commands_coghelper.testing import FakeContext
+
+NUMBER = 100_000
+
+
+def main():
+    logging.getLogger("discord_ext_commands_coghelper").setLevel(logging.INFO)
+    ctx = FakeContext()
+    args = ("channel_id=1", "before=2022-01-01")
+    stdlib = logging.getLogger("bench")
+    stdlib.setLevel(logging.INFO)
+
+    def eager():
+        stdlib.debug(
+            f"{ctx.command} executor={ctx.author}, guild={ctx.guild}, channel={ctx.channel}, args={args}"
+        )
+
+    def lazy():
+        if logger.is_enabled_for(logging.DEBUG):
+            logger.debug("execute", ctx, executor=ctx.author, args=args)
+
+    for label, func in (("eager f-string", eager), ("structured lazy", lazy)):
+        elapsed = timeit.timeit(func, number=NUMBER)
+        print(f"{label:20s} {elapsed * 1e9 / NUMBER:8.1f}ns per invocation")
+
+
+if __name__ == "__main__":
+    main()
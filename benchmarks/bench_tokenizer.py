@@ -0,0 +1,55 @@
+"""Compare tokenize_args with the previous regex based _parse_tuple_args
+
+python -m benchmarks.bench_tokenizer
+"""
+import re
+import timeit
+from typing import Tuple, Any, Dict
+
+from discord_ext_commands_coghelper.tokenizer import (
+    tokenize_args,
+    configure_tokenizer_cache,
+)
+
+
+def legacy_parse_tuple_args(args: Tuple[Any]) -> Dict[str, str]:
+    parsed: Dict[str, str] = {}
+    for arg in args:
+        if not isinstance(arg, str):
+            continue
+        result = re.match(r"(.*)=(.*)", arg)
+        if result is None:
+            parsed[arg] = "True"
+        else:
+            parsed[result.group(1)] = result.group(2)
+    return parsed
+
+
+def make_args(size: int) -> Tuple[str, ...]:
+    args = []
+    for i in range(size):
+        if i % 3 == 0:
+            args.append(f"flag{i}")
+        else:
+            args.append(f"key{i}=value{i}" + "x" * (i % 20))
+    return tuple(args)
+
+
+def main():
+    number = 2000
+    for size in (4, 64, 512):
+        args = make_args(size)
+        legacy = timeit.timeit(lambda: legacy_parse_tuple_args(args), number=number)
+        configure_tokenizer_cache(0)
+        uncached = timeit.timeit(lambda: tokenize_args(args), number=number)
+        configure_tokenizer_cache()
+        cached = timeit.timeit(lambda: tokenize_args(args), number=number)
+        print(
+            f"size={size:4d} legacy={legacy * 1e6 / number:9.2f}us "
+            f"uncached={uncached * 1e6 / number:9.2f}us "
+            f"cached={cached * 1e6 / number:9.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Load test a CogHelper command against the fake runtime
+
+python -m benchmarks.load --executions 1000 --guilds 20 --latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+from discord.ext import commands
+
+from discord_ext_commands_coghelper import ChannelNotFoundError, CogHelper
+from discord_ext_commands_coghelper.testing import FakeRuntime, make_guild, run_load
+from discord_ext_commands_coghelper.utils import find_text_channel
+
+
+class FindCog(commands.Cog, CogHelper):
+    """Replies with the content of the message, the same as a typical quote command"""
+
+    typing_policy = "never"
+
+    def _parse_args(self, ctx, args):
+        self.message_id = int(args["message_id"])
+
+    async def _execute(self, ctx):
+        result = await find_text_channel(ctx.guild, self.message_id, hint=ctx.channel)
+        if result is None:
+            raise ChannelNotFoundError(ctx, self.message_id)
+        await ctx.send(result[1].content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--executions", type=int, default=1000)
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--channels", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--not-found-rate", type=float, default=0.0)
+    parser.add_argument("--forbidden-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    options = parser.parse_args()
+
+    logging.getLogger("discord_ext_commands_coghelper").addHandler(logging.NullHandler())
+    logging.getLogger("discord_ext_commands_coghelper").propagate = False
+
+    runtime = FakeRuntime(
+        latency=options.latency,
+        not_found_rate=options.not_found_rate,
+        forbidden_rate=options.forbidden_rate,
+        rate_limit=options.rate_limit,
+        seed=0,
+    )
+    guilds = [
+        make_guild(i, channels=options.channels, runtime=runtime)
+        for i in range(options.guilds)
+    ]
+
+    def args(index, guild):
+        # a message of a random channel, the hint is the first channel
+        channel = guild.channels[index % len(guild.channels)]
+        return (f"message_id={channel.last_message_id}",)
+
+    report = asyncio.run(
+        run_load(FindCog(None), guilds, options.executions, args, concurrency=options.concurrency)
+    )
+    print(json.dumps(report.to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
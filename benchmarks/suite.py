@@ -0,0 +1,344 @@
+"""Benchmark suite of the CogHelper hot path and utils
+
+python -m benchmarks.suite --output results.json
+python -m benchmarks.suite --compare results.json
+
+Results are written as JSON so that a later run can be compared with them. The comparison exits with status 1 when
+a case is slower than the baseline by more than the threshold.
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime
+import inspect
+import itertools
+import json
+import logging
+import platform
+import statistics
+import sys
+import timeit
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+import discord
+from discord.ext import commands
+
+from discord_ext_commands_coghelper import (
+    Argument,
+    ArgumentError,
+    ChannelNotFoundError,
+    CogHelper,
+    ExecutionError,
+    TypingPolicy,
+)
+from discord_ext_commands_coghelper.coghelper import _parse_tuple_args
+from discord_ext_commands_coghelper.utils import (
+    filter_snowflakes,
+    find_text_channel,
+    get_before_after_fmts,
+    get_bool,
+    get_datetime,
+    get_datetime_fmts,
+    get_list,
+    get_snowflake_bounds,
+    LocationCache,
+    try_strftime,
+    try_strptime,
+)
+from discord_ext_commands_coghelper.testing import (
+    FakeContext,
+    FakeGuild,
+    FakeMessage,
+    FakeTextChannel,
+)
+
+FMTS = ("%Y-%m-%d", "%Y/%m/%d", "%Y%m%d")
+ARGS = ("channel_id=12", "before=2000/01/31", "after=2000/01/01", "users=1,2,3", "all")
+DIC = _parse_tuple_args(ARGS)
+JST = datetime.timezone(datetime.timedelta(hours=9))
+# the location cache would hide the channel search after the first call
+NO_CACHE = LocationCache()
+
+Setup = Callable[[], Union[Callable[[], object], Iterator[Callable[[], object]]]]
+CASES: Dict[str, Setup] = {}
+
+
+def case(name: str):
+    """Register a setup function that returns the function to measure
+
+    A setup that needs cleanup yields the function instead, it is resumed after the measurement.
+    """
+
+    def decorator(setup):
+        CASES[name] = setup
+        return setup
+
+    return decorator
+
+
+@case("parse_tuple_args")
+def _parse_tuple_args_case():
+    return lambda: _parse_tuple_args(ARGS)
+
+
+@case("get_bool")
+def _get_bool_case():
+    return lambda: get_bool(DIC, "all")
+
+
+@case("get_list")
+def _get_list_case():
+    return lambda: get_list(DIC, "users", ",", int)
+
+
+@case("get_datetime")
+def _get_datetime_case():
+    dic = dict(before="2000-01-31")
+    return lambda: get_datetime(dic, "before", "%Y-%m-%d")
+
+
+@case("get_datetime_fmts")
+def _get_datetime_fmts_case():
+    return lambda: get_datetime_fmts(DIC, "before", *FMTS)
+
+
+@case("try_strptime")
+def _try_strptime_case():
+    return lambda: try_strptime("20000131", *FMTS)
+
+
+@case("try_strptime_varied")
+def _try_strptime_varied_case():
+    # more strings than the result cache of the parser holds, every call reaches strptime
+    base = datetime.date(2000, 1, 1)
+    strings = [
+        (base + datetime.timedelta(days=i)).strftime(FMTS[i % len(FMTS)])
+        for i in range(1024)
+    ]
+    cycle = itertools.cycle(strings)
+    return lambda: try_strptime(next(cycle), *FMTS)
+
+
+@case("try_strftime")
+def _try_strftime_case():
+    dt = datetime.datetime(2000, 1, 31)
+    return lambda: try_strftime(dt, "%Y/%m/%d %H:%M")
+
+
+@case("get_before_after_fmts")
+def _get_before_after_fmts_case():
+    ctx = FakeContext()
+    return lambda: get_before_after_fmts(ctx, DIC, *FMTS, tz=JST)
+
+
+@case("filter_snowflakes")
+def _filter_snowflakes_case():
+    base = datetime.datetime(2020, 1, 1)
+    snowflakes = [
+        discord.utils.time_snowflake(base + datetime.timedelta(minutes=i))
+        for i in range(1000)
+    ]
+    before = base + datetime.timedelta(minutes=900, seconds=30)
+    after = base + datetime.timedelta(minutes=100, seconds=30)
+    return lambda: filter_snowflakes(snowflakes, *get_snowflake_bounds(before, after))
+
+
+@case("filter_created_at")
+def _filter_created_at_case():
+    # the same window compared as datetimes, the baseline of filter_snowflakes
+    base = datetime.datetime(2020, 1, 1)
+    snowflakes = [
+        discord.utils.time_snowflake(base + datetime.timedelta(minutes=i))
+        for i in range(1000)
+    ]
+    before = base + datetime.timedelta(minutes=900, seconds=30)
+    after = base + datetime.timedelta(minutes=100, seconds=30)
+    return lambda: [
+        i for i in snowflakes if after < discord.utils.snowflake_time(i) < before
+    ]
+
+
+@case("argument_error")
+def _argument_error_case():
+    ctx = FakeContext()
+    return lambda: ArgumentError(ctx, before="before must be a future than after.")
+
+
+@case("channel_not_found_error")
+def _channel_not_found_error_case():
+    ctx = FakeContext()
+    return lambda: ChannelNotFoundError(ctx, 12)
+
+
+@case("error_embed")
+def _error_embed_case():
+    error = ExecutionError(FakeContext(), reason="failed")
+    return lambda: error.to_embed("!report")
+
+
+class ReportCog(commands.Cog, CogHelper):
+    """Finds the channel of the message and replies, the same as a typical report command"""
+
+    arguments = (Argument("message_id", int, required=True),)
+
+    def _parse_args(self, ctx, args):
+        if "fail" in args:
+            raise ArgumentError(ctx, fail="requested")
+        super()._parse_args(ctx, args)
+
+    async def _execute(self, ctx):
+        # the cog is shared by the concurrent invocations, the arguments belong to each of them
+        message_id = self.args.message_id
+        result = await find_text_channel(
+            ctx.guild, message_id, hint=ctx.channel, cache=NO_CACHE
+        )
+        if result is None:
+            raise ChannelNotFoundError(ctx, message_id)
+        await ctx.send(result[1].content)
+
+
+def _round_trip(concurrency: int, latency: float, args):
+    channels = [FakeTextChannel(i, latency=latency) for i in range(1, 11)]
+    channels[-1].add_message(FakeMessage(1000, "report"))
+    guild = FakeGuild(1, channels)
+    cog = ReportCog(None)
+    cog.typing_policy = TypingPolicy.NEVER
+    contexts = [
+        FakeContext(guild=guild, channel=channels[0], send_latency=latency)
+        for _ in range(concurrency)
+    ]
+    loop = asyncio.new_event_loop()
+
+    async def run():
+        await asyncio.gather(*(cog.execute(ctx, args) for ctx in contexts))
+
+    try:
+        yield lambda: loop.run_until_complete(run())
+    finally:
+        loop.close()
+
+
+@case("execute_round_trip")
+def _execute_round_trip_case():
+    yield from _round_trip(1, 0.0, ("message_id=1000",))
+
+
+@case("execute_round_trip_latency")
+def _execute_round_trip_latency_case():
+    yield from _round_trip(50, 0.001, ("message_id=1000",))
+
+
+@case("execute_argument_error")
+def _execute_argument_error_case():
+    yield from _round_trip(1, 0.0, ("message_id=1000", "fail"))
+
+
+@contextlib.contextmanager
+def prepare(setup: Setup) -> Iterator[Callable[[], object]]:
+    """Run a setup and clean it up when the context exits"""
+    prepared = setup()
+    if not inspect.isgenerator(prepared):
+        yield prepared
+        return
+    try:
+        yield next(prepared)
+    finally:
+        prepared.close()
+
+
+def measure(func: Callable[[], object], repeat: int, number: Optional[int]) -> Dict[str, float]:
+    """Time func and return the statistics per call in microseconds"""
+    timer = timeit.Timer(func)
+    if number is None:
+        # run for about 0.2 seconds per repeat
+        number, _ = timer.autorange()
+    times = [t * 1e6 / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min_us": min(times),
+        "mean_us": statistics.mean(times),
+        "stdev_us": statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def run_suite(
+    names: Optional[List[str]] = None, repeat: int = 5, number: Optional[int] = None
+) -> Dict[str, object]:
+    """Run the cases and return the results as a JSON compatible dict"""
+    results = {}
+    for name, setup in CASES.items():
+        if names and name not in names:
+            continue
+        with prepare(setup) as func:
+            results[name] = measure(func, repeat, number)
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(
+    baseline: Dict[str, object], current: Dict[str, object], threshold: float
+) -> List[str]:
+    """Return the names of the cases slower than the baseline by more than threshold
+
+    The minimum of the repeats is compared since it is the least affected by other processes.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        if result["min_us"] > base["min_us"] * threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cases", nargs="*", help="names of the cases to run, all if omitted")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare with the results in this JSON file")
+    parser.add_argument("--threshold", type=float, default=1.2, help="allowed slowdown ratio")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=None, help="calls per repeat, automatic if omitted")
+    options = parser.parse_args(argv)
+
+    unknown = set(options.cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    current = run_suite(options.cases, options.repeat, options.number)
+    baseline = None
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+
+    for name, result in current["results"].items():
+        line = f"{name:28s} min={result['min_us']:10.2f}us mean={result['mean_us']:10.2f}us"
+        if baseline is not None and name in baseline["results"]:
+            ratio = result["min_us"] / baseline["results"][name]["min_us"]
+            line += f" x{ratio:5.2f}"
+        print(line)
+
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+
+    if baseline is not None:
+        regressions = compare(baseline, current, options.threshold)
+        if regressions:
+            print(f"regressions: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    # keep the cost of the warnings of error paths, but do not print them
+    package_logger = logging.getLogger("discord_ext_commands_coghelper")
+    package_logger.addHandler(logging.NullHandler())
+    package_logger.propagate = False
+    sys.exit(main())
@@ -1,7 +1,83 @@
-from .errors import *
-from .coghelper import *
+import importlib
 
 __title__ = "discord_ext_commands_coghelper"
 __version__ = "0.0.6"
 __author__ = "jukey17"
 __licence__ = "MIT"
+
+# submodules are imported on the first access of their names, so that importing a part of the package does not
+# import discord.py and every helper
+_SUBMODULES = {
+    "embeds": ("EmbedTemplate", "Fields"),
+    "errors": (
+        "ArgumentError",
+        "ExecutionError",
+        "ChannelNotFoundError",
+        "ChannelTypeError",
+        "UserNotFoundError",
+    ),
+    "log": ("context_fields", "StructuredLogger", "get_logger", "JsonFormatter"),
+    "tokenizer": (
+        "FLAG_VALUE",
+        "DEFAULT_CACHE_SIZE",
+        "tokenize_arg",
+        "tokenize_args",
+        "configure_tokenizer_cache",
+        "tokenizer_cache_info",
+        "clear_tokenizer_cache",
+    ),
+    "arguments": (
+        "Argument",
+        "BoolArgument",
+        "ListArgument",
+        "DatetimeArgument",
+        "ChoiceArgument",
+        "ParsedArguments",
+        "ArgumentParser",
+        "compile_arguments",
+    ),
+    "instrumentation": (
+        "PHASE_TOTAL",
+        "ExecutionRecord",
+        "PhaseTimer",
+        "MetricsSink",
+        "MemorySink",
+        "JsonLinesSink",
+        "Instrumentation",
+    ),
+    "dispatcher": ("DispatcherStats", "ErrorDispatcher"),
+    "cache": (
+        "normalize_args",
+        "set_invocation_args",
+        "get_invocation_args",
+        "CacheStats",
+        "ResultCache",
+        "cached_result",
+    ),
+    "offload": ("PoolKind", "PoolStats", "CpuPool"),
+    "scheduler": ("SchedulerStats", "Ticket", "ExecutionScheduler"),
+    "coghelper": ("TypingPolicy", "CogHelper"),
+}
+_ATTRIBUTES = {
+    name: module for module, names in _SUBMODULES.items() for name in names
+}
+
+# submodules are also attributes of the package as they were before the lazy import
+_MODULES = frozenset(_SUBMODULES) | frozenset(("testing", "utils"))
+
+__all__ = list(_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module = _ATTRIBUTES.get(name)
+    if module is None:
+        if name in _MODULES:
+            return importlib.import_module(f"{__name__}.{name}")
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | _MODULES)
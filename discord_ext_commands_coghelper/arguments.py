@@ -0,0 +1,229 @@
+import datetime
+from typing import Dict, Callable, List, Any, Sequence, Tuple, Type
+
+from discord.ext.commands.context import Context
+
+from discord_ext_commands_coghelper import ArgumentError
+from discord_ext_commands_coghelper.utils import Constant, choices_str, try_strptime
+
+
+class Argument:
+    """Declares an argument of a command
+
+    The value is converted by converter, if the argument does not exist the default value is used. A default list,
+    dict or set is copied for each parse, so that a parsed value can be modified without changing the others.
+    """
+
+    __slots__ = ("key", "attr", "default", "required", "converter")
+
+    def __init__(
+        self,
+        key: str,
+        converter: Callable[[str], Any] = None,
+        default: Any = None,
+        *,
+        attr: str = None,
+        required: bool = False,
+    ):
+        """__init__
+
+        :param key: key of the argument (key=value)
+        :type key: str
+        :param converter: for converting the string value
+        :type converter: Callable[[str], Any]
+        :param default: default value if key does not exist
+        :type default: Any
+        :param attr: attribute name of the parsed arguments, key is used if omitted
+        :type attr: str
+        :param required: if True, ArgumentError is raised when key does not exist
+        :type required: bool
+        """
+        self.key = key
+        self.attr = attr if attr is not None else key
+        self.default = default
+        self.required = required
+        self.converter = converter
+
+    def convert(self, value: str) -> Any:
+        """Convert the string value
+
+        :param value: string value
+        :type value: str
+        :return: converted value
+        :rtype: Any
+        """
+        if self.converter is None:
+            return value
+        return self.converter(value)
+
+
+class BoolArgument(Argument):
+    """Declares an argument of type bool, same as utils.get_bool"""
+
+    __slots__ = ()
+
+    def __init__(self, key: str, default: bool = False, **kwargs):
+        super().__init__(key, default=default, **kwargs)
+
+    def convert(self, value: str) -> bool:
+        return value.lower() != "false"
+
+
+class ListArgument(Argument):
+    """Declares an argument of type List, same as utils.get_list"""
+
+    __slots__ = ("delimiter", "predicate")
+
+    def __init__(
+        self,
+        key: str,
+        delimiter: str,
+        predicate: Callable[[str], Any] = None,
+        default: List[Any] = None,
+        **kwargs,
+    ):
+        super().__init__(key, default=default, **kwargs)
+        self.delimiter = delimiter
+        self.predicate = predicate
+
+    def convert(self, value: str) -> List[Any]:
+        if not self.predicate:
+            return value.split(self.delimiter)
+        return [self.predicate(element) for element in value.split(self.delimiter)]
+
+
+class DatetimeArgument(Argument):
+    """Declares an argument of type datetime, same as utils.get_datetime_fmts"""
+
+    __slots__ = ("fmts", "tz")
+
+    def __init__(
+        self,
+        key: str,
+        *fmts: str,
+        default: datetime.datetime = None,
+        tz: datetime.timezone = None,
+        **kwargs,
+    ):
+        super().__init__(key, default=default, **kwargs)
+        self.fmts = fmts
+        self.tz = tz
+
+    def convert(self, value: str) -> datetime.datetime:
+        dt = try_strptime(value, *self.fmts, default=self.default)
+        if dt is not None and self.tz is not None:
+            dt = dt.replace(tzinfo=self.tz)
+        return dt
+
+
+class ChoiceArgument(Argument):
+    """Declares an argument whose value is one of a Constant class, same as utils.get_choice"""
+
+    __slots__ = ("choices",)
+
+    def __init__(
+        self, key: str, choices: Type[Constant], default: Any = None, **kwargs
+    ):
+        super().__init__(key, default=default, **kwargs)
+        self.choices = choices
+
+    def convert(self, value: str) -> Any:
+        result = self.choices.find(value, _NOT_FOUND)
+        if result is _NOT_FOUND:
+            raise ValueError(choices_str(self.choices))
+        return result
+
+
+_NOT_FOUND = object()
+
+
+class ParsedArguments:
+    """Base class of the object that holds the parsed arguments"""
+
+    __slots__ = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dict
+
+        :return: attribute name and value
+        :rtype: Dict[str, Any]
+        """
+        return {attr: getattr(self, attr) for attr in self.__slots__}
+
+    def __repr__(self):
+        values = ", ".join(f"{key}={value!r}" for key, value in self.to_dict().items())
+        return f"{type(self).__name__}({values})"
+
+
+ArgumentParser = Callable[[Context, Dict[str, str]], ParsedArguments]
+
+_MUTABLE_DEFAULTS = (list, dict, set)
+
+
+def compile_arguments(
+    arguments: Sequence[Argument], name: str = "Arguments"
+) -> ArgumentParser:
+    """Compile the declaration of arguments into a parser
+
+    The parser converts Dict[str, str] into an instance of ParsedArguments in a single pass.
+
+    :param arguments: declaration of arguments
+    :type arguments: Sequence[Argument]
+    :param name: class name of the parsed arguments
+    :type name: str
+    :return: parser that takes context and arguments
+    :rtype: Callable[[Context, Dict[str, str]], ParsedArguments]
+    """
+    attrs = tuple(argument.attr for argument in arguments)
+    if len(set(attrs)) != len(attrs):
+        raise ValueError(f"duplicate argument attributes in {name}: {attrs}")
+    if len(set(argument.key for argument in arguments)) != len(arguments):
+        raise ValueError(f"duplicate argument keys in {name}")
+
+    result_cls = type(name, (ParsedArguments,), {"__slots__": attrs})
+    new = result_cls.__new__
+    defaults: Tuple[Tuple[str, Any], ...] = tuple(
+        (argument.attr, argument.default)
+        for argument in arguments
+        if not isinstance(argument.default, _MUTABLE_DEFAULTS)
+    )
+    # shared by every invocation, copied per parse
+    mutable_defaults: Tuple[Tuple[str, Any], ...] = tuple(
+        (argument.attr, argument.default)
+        for argument in arguments
+        if isinstance(argument.default, _MUTABLE_DEFAULTS)
+    )
+    required: Tuple[str, ...] = tuple(
+        argument.key for argument in arguments if argument.required
+    )
+    table: Dict[str, Tuple[str, Callable[[str], Any]]] = {
+        argument.key: (argument.attr, argument.convert) for argument in arguments
+    }
+
+    def parse(ctx: Context, args: Dict[str, str]) -> ParsedArguments:
+        for key in required:
+            if key not in args:
+                raise ArgumentError(ctx, **{key: "this argument is required."})
+
+        result = new(result_cls)
+        for attr, default in defaults:
+            setattr(result, attr, default)
+        for attr, default in mutable_defaults:
+            setattr(result, attr, default.copy())
+
+        for key, value in args.items():
+            entry = table.get(key)
+            if entry is None:
+                continue
+            attr, convert = entry
+            try:
+                setattr(result, attr, convert(value))
+            except ArgumentError:
+                raise
+            except (TypeError, ValueError) as e:
+                raise ArgumentError(ctx, **{key: f"{value} is invalid. ({e})"})
+        return result
+
+    parse.result_class = result_cls
+    return parse
+
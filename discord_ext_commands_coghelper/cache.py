@@ -0,0 +1,252 @@
+import asyncio
+import collections
+import contextvars
+import functools
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Optional,
+    Tuple,
+)
+
+import discord
+from discord.ext.commands.context import Context
+
+_invocation_args: "contextvars.ContextVar[Optional[Dict[str, str]]]" = (
+    contextvars.ContextVar("invocation_args", default=None)
+)
+
+
+def normalize_args(args: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    """Convert parsed arguments to a hashable form independent of the order
+
+    :param args: arguments parsed by CogHelper
+    :type args: Dict[str, str]
+    :rtype: Tuple[Tuple[str, str], ...]
+    """
+    return tuple(sorted(args.items()))
+
+
+def set_invocation_args(args: Dict[str, str]) -> None:
+    """Set the arguments of the command running in the current task
+
+    CogHelper.execute calls this before _parse_args.
+
+    :param args: arguments parsed by CogHelper
+    :type args: Dict[str, str]
+    :return: None
+    :rtype: None
+    """
+    _invocation_args.set(args)
+
+
+def get_invocation_args() -> Optional[Tuple[Tuple[str, str], ...]]:
+    """Get the normalized arguments of the command running in the current task
+
+    :rtype: Optional[Tuple[Tuple[str, str], ...]]
+    """
+    args = _invocation_args.get()
+    return None if args is None else normalize_args(args)
+
+
+class CacheStats:
+    """Counters of ResultCache"""
+
+    __slots__ = ("hits", "misses", "coalesced", "invalidations")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)}" for name in self.__slots__)
+        return f"CacheStats({values})"
+
+
+class ResultCache:
+    """Cache of command results with TTL and LRU eviction
+
+    Concurrent computations of the same key share one computation, if its caller is cancelled one of the others
+    computes instead. Entries are grouped by guild so that they can be invalidated when a new message arrives.
+    """
+
+    def __init__(self, ttl: float = 60.0, maxsize: int = 256):
+        """__init__
+
+        :param ttl: seconds to keep a result
+        :type ttl: float
+        :param maxsize: maximum number of results
+        :type maxsize: int
+        """
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._entries: "collections.OrderedDict[Hashable, Tuple[Any, float, Optional[int]]]" = (
+            collections.OrderedDict()
+        )
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._generations: Dict[Optional[int], int] = collections.defaultdict(int)
+        self._stats = CacheStats()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self) -> CacheStats:
+        """Counters of hits, misses, coalesced computations and invalidations
+
+        :rtype: CacheStats
+        """
+        return self._stats
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        guild_id: Optional[int],
+        compute: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Get the cached result or compute it
+
+        :param key: key of the result
+        :type key: Hashable
+        :param guild_id: guild the result belongs to
+        :type guild_id: Optional[int]
+        :param compute: computes the result
+        :type compute: Callable[[], Awaitable[Any]]
+        :return: result
+        :rtype: Any
+        """
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._stats.hits += 1
+                    return value
+                del self._entries[key]
+
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            self._stats.coalesced += 1
+            # raises the exception of the computation
+            completed, value = await asyncio.shield(future)
+            if completed:
+                return value
+            # the computing caller was cancelled, compute again or wait for another caller
+
+        self._stats.misses += 1
+        future = asyncio.get_event_loop().create_future()
+        self._inflight[key] = future
+        generation = self._generations[guild_id]
+        try:
+            value = await compute()
+        except Exception as e:
+            future.set_exception(e)
+            # the exception is raised to the caller, followers may not exist
+            future.exception()
+            raise
+        except BaseException:
+            # the followers do not share the cancellation of this caller
+            future.set_result((False, None))
+            raise
+        finally:
+            del self._inflight[key]
+
+        future.set_result((True, value))
+        # a result computed across an invalidation may be stale
+        if self._generations[guild_id] == generation:
+            self._entries[key] = (value, time.monotonic() + self._ttl, guild_id)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, guild_id: Optional[int]) -> None:
+        """Remove cached results of a guild
+
+        :param guild_id: guild the results belong to, None for direct messages
+        :type guild_id: Optional[int]
+        :return: None
+        :rtype: None
+        """
+        self._stats.invalidations += 1
+        self._generations[guild_id] += 1
+        for key, (_, _, entry_guild_id) in list(self._entries.items()):
+            if entry_guild_id == guild_id:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Remove all cached results
+
+        :return: None
+        :rtype: None
+        """
+        self._stats.invalidations += 1
+        self._entries.clear()
+        for key in list(self._generations):
+            self._generations[key] += 1
+
+    def on_message(self, message: discord.Message) -> None:
+        """Invalidate the results of the guild of a new message
+
+        Call this from an on_message listener.
+
+        :param message: new message
+        :type message: discord.Message
+        :return: None
+        :rtype: None
+        """
+        guild = message.guild
+        self.invalidate(guild.id if guild is not None else None)
+
+
+def cached_result(
+    ttl: float = 60.0,
+    maxsize: int = 256,
+    window: Callable[[Any, Context], Hashable] = None,
+):
+    """Cache the result of a coroutine method that takes the context
+
+    The result is cached by the command, the guild, the normalized arguments of the invocation, the window returned
+    by window(self, ctx) and the other arguments of the method. The cache is available as the cache attribute of the
+    decorated method.
+
+    :param ttl: seconds to keep a result
+    :type ttl: float
+    :param maxsize: maximum number of results
+    :type maxsize: int
+    :param window: returns the window of the invocation, such as lambda self, ctx: (self.args.before, self.args.after)
+    :type window: Callable[[Any, Context], Hashable]
+    """
+    cache = ResultCache(ttl, maxsize)
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, ctx: Context, *args, **kwargs):
+            guild_id = ctx.guild.id if ctx.guild is not None else None
+            key = (
+                str(ctx.command),
+                guild_id,
+                get_invocation_args(),
+                window(self, ctx) if window is not None else None,
+                args,
+                tuple(sorted(kwargs.items())),
+            )
+            try:
+                hash(key)
+            except TypeError:
+                return await func(self, ctx, *args, **kwargs)
+            return await cache.get_or_compute(
+                key, guild_id, lambda: func(self, ctx, *args, **kwargs)
+            )
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
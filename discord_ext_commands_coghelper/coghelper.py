@@ -1,32 +1,158 @@
+import asyncio
+import contextvars
 import logging
-import re
-from typing import Dict, Tuple, Any
+import time
+from typing import Dict, Tuple, Any, Sequence, Optional, Callable, Hashable, List
 
-from discord import Embed
 from discord.ext.commands import Bot
 from discord.ext.commands.context import Context
 
 from discord_ext_commands_coghelper import ArgumentError, ExecutionError
+from discord_ext_commands_coghelper.errors import _ErrorBase
+from discord_ext_commands_coghelper.arguments import (
+    Argument,
+    ArgumentParser,
+    ParsedArguments,
+    compile_arguments,
+)
+from discord_ext_commands_coghelper.cache import normalize_args, set_invocation_args
+from discord_ext_commands_coghelper.dispatcher import ErrorDispatcher
+from discord_ext_commands_coghelper.instrumentation import (
+    PHASE_TOTAL,
+    Instrumentation,
+    PhaseTimer,
+)
+from discord_ext_commands_coghelper.log import get_logger
+from discord_ext_commands_coghelper.offload import CpuPool
+from discord_ext_commands_coghelper.scheduler import ExecutionScheduler
+from discord_ext_commands_coghelper.tokenizer import tokenize_args
+from discord_ext_commands_coghelper.utils import Constant
 
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
+
+# the parsed arguments of the invocation running in the current task, with the cog that parsed them
+_parsed_args: "contextvars.ContextVar[Optional[Tuple[CogHelper, ParsedArguments]]]" = (
+    contextvars.ContextVar("parsed_args", default=None)
+)
 
 
 def _parse_tuple_args(args: Tuple[Any]) -> Dict[str, str]:
-    parsed: Dict[str, str] = {}
-    for arg in args:
-        if not isinstance(arg, str):
-            continue
-        result = re.match(r"(.*)=(.*)", arg)
-        if result is None:
-            parsed[arg] = "True"
-        else:
-            parsed[result.group(1)] = result.group(2)
+    return tokenize_args(args)
+
+
+class TypingPolicy(Constant):
+    """When CogHelper.execute shows the typing indicator
+
+    NEVER: never show it, ALWAYS: show it while _execute runs,
+    DELAYED: show it only if _execute has not finished within CogHelper.typing_delay seconds
+    """
+
+    NEVER = "never"
+    ALWAYS = "always"
+    DELAYED = "delayed"
+
+
+class _NoTyping:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class _DelayedTyping:
+    def __init__(self, ctx: Context, delay: float):
+        self._ctx = ctx
+        self._delay = delay
+        self._task: Optional[asyncio.Future] = None
+
+    async def __aenter__(self):
+        self._task = asyncio.ensure_future(self._typing())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        return False
+
+    async def _typing(self):
+        await asyncio.sleep(self._delay)
+        async with self._ctx.typing():
+            # keep typing until cancelled by __aexit__
+            await asyncio.Event().wait()
+
 
-    return parsed
+class _Flight:
+    __slots__ = ("future", "sent", "error")
+
+    def __init__(self):
+        self.future = asyncio.get_event_loop().create_future()
+        self.sent: List[Tuple[Tuple[Any, ...], Dict[str, Any]]] = []
+        self.error: Optional[_ErrorBase] = None
+
+
+class _FlightContext:
+    """Context of the invocation running a flight, records its replies for the invocations waiting for it"""
+
+    def __init__(self, ctx: Context, flight: _Flight):
+        self.context = ctx
+        self.flight = flight
+
+    def __getattr__(self, name: str):
+        return getattr(self.context, name)
+
+    async def send(self, *args, **kwargs):
+        message = await self.context.send(*args, **kwargs)
+        self.flight.sent.append((args, kwargs))
+        return message
 
 
 class CogHelper:
-    """Base class to assist classes using discord.ext.commands.Cog features"""
+    """Base class to assist classes using discord.ext.commands.Cog features
+
+    If arguments is declared in the inherited class, it is compiled into a parser when the class is created and
+    _parse_args stores the parsed arguments in args. args belongs to the invocation, so concurrent invocations of a
+    command do not see the arguments of each other.
+
+    If instrumentation is set, the phases of execute are measured by it.
+
+    typing_policy decides whether the typing indicator is shown while _execute runs, see TypingPolicy. Arguments are
+    parsed before any typing indicator.
+
+    If error_dispatcher is set, error embeds are deduplicated and rate limited by it instead of being sent at once.
+
+    If cpu_pool is set, run_cpu_bound runs functions in it instead of on the event loop.
+
+    If scheduler is set, the invocation waits for a slot of it before the arguments are parsed, so that _parse_args
+    of a waiting invocation does not overwrite the state parsed by a running one. The wait is measured as the queue
+    phase of instrumentation.
+
+    If single_flight is True, an invocation with the same command, channel and arguments as a running one does not
+    parse or execute again, it waits for the running one and replies with the same messages by _send_shared_result
+    and the same error. The running one is given a context recording the messages sent by its send. If the running
+    one raises an exception, the waiting ones raise it too. If it is cancelled, one of the waiting ones runs instead.
+    """
+
+    arguments: Sequence[Argument] = ()
+    instrumentation: Optional[Instrumentation] = None
+    typing_policy: str = TypingPolicy.ALWAYS
+    typing_delay: float = 1.0
+    error_dispatcher: Optional[ErrorDispatcher] = None
+    cpu_pool: Optional[CpuPool] = None
+    scheduler: Optional[ExecutionScheduler] = None
+    single_flight: bool = False
+    _argument_parser: Optional[ArgumentParser] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "arguments" in cls.__dict__:
+            cls._argument_parser = (
+                staticmethod(
+                    compile_arguments(cls.arguments, f"{cls.__name__}Arguments")
+                )
+                if cls.arguments
+                else None
+            )
 
     def __init__(self, bot: Bot):
         """__init__
@@ -35,6 +161,7 @@ class CogHelper:
         :type bot: discord.ext.commands.Bot
         """
         self._bot = bot
+        self._flights: Dict[Hashable, _Flight] = {}
 
     @property
     def bot(self) -> Bot:
@@ -44,6 +171,17 @@ class CogHelper:
         """
         return self._bot
 
+    @property
+    def args(self) -> Optional[ParsedArguments]:
+        """Arguments of the current invocation parsed by the declared arguments
+
+        :rtype: Optional[ParsedArguments]
+        """
+        current = _parsed_args.get()
+        if current is None or current[0] is not self:
+            return None
+        return current[1]
+
     async def execute(self, ctx: Context, args: Tuple[Any]):
         """Execute command
 
@@ -57,25 +195,181 @@ class CogHelper:
         :return: None
         :rtype: None
         """
-        logger.debug(
-            f"{ctx.command} executor={ctx.author}, guild={ctx.guild}, channel={ctx.channel}, args={args}"
-        )
+        debug = logger.is_enabled_for(logging.DEBUG)
+        if debug:
+            logger.debug("execute", ctx, executor=ctx.author, args=args)
+            start = time.perf_counter()
+
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            await self._execute_phases(ctx, args, None)
+            if debug:
+                logger.debug("executed", ctx, duration=time.perf_counter() - start)
+            return
+
+        timer = instrumentation.start(ctx)
+        try:
+            await self._execute_phases(ctx, args, timer)
+        except BaseException:
+            timer.record.status = "exception"
+            raise
+        finally:
+            record = instrumentation.finish(timer)
+            if debug:
+                logger.debug(
+                    "executed", ctx, status=record.status, duration=record.phases[PHASE_TOTAL]
+                )
 
+    async def _execute_phases(
+        self, ctx: Context, args: Tuple[Any], timer: Optional[PhaseTimer]
+    ):
         if ctx.author.bot:
             if not self._on_execute_by_bot():
+                if timer is not None:
+                    timer.record.status = "bot"
                 return
 
-        async with ctx.typing():
-            try:
-                self._parse_args(ctx, _parse_tuple_args(args))
-            except ArgumentError as e:
-                await self._send_argument_error(ctx, e)
-                return
+        parsed = _parse_tuple_args(args)
+        set_invocation_args(parsed)
+        if self.single_flight:
+            await self._execute_single_flight(ctx, parsed, timer)
+        else:
+            await self._execute_parsed(ctx, parsed, timer)
+
+    async def _execute_single_flight(
+        self, ctx: Context, parsed: Dict[str, str], timer: Optional[PhaseTimer]
+    ):
+        key = (str(ctx.command), ctx.channel.id, normalize_args(parsed))
+        flight = self._flights.get(key)
+        while flight is not None:
+            # raises the exception of the running invocation, False if it was cancelled
+            if not await asyncio.shield(flight.future):
+                # run by itself, or wait for another invocation that was waiting too
+                flight = self._flights.get(key)
+                continue
+            if timer is not None:
+                timer.mark("wait_shared")
+                timer.record.status = "shared"
+            await self._send_shared_result(ctx, flight.sent)
+            error = flight.error
+            if isinstance(error, ArgumentError):
+                await self._send_argument_error(ctx, error)
+            elif isinstance(error, ExecutionError):
+                await self._send_execution_error(ctx, error)
+            if timer is not None:
+                timer.mark("send_shared")
+            return
 
+        flight = self._flights[key] = _Flight()
+        try:
+            await self._execute_parsed(_FlightContext(ctx, flight), parsed, timer)
+        except Exception as e:
+            flight.future.set_exception(e)
+            # mark it retrieved, no invocation may be waiting
+            flight.future.exception()
+            raise
+        except BaseException:
+            # the waiting invocations do not share the cancellation
+            flight.future.set_result(False)
+            raise
+        else:
+            flight.future.set_result(True)
+        finally:
+            del self._flights[key]
+
+    async def _execute_parsed(
+        self, ctx: Context, parsed: Dict[str, str], timer: Optional[PhaseTimer]
+    ):
+        scheduler = self.scheduler
+        if scheduler is None:
+            await self._parse_and_execute(ctx, parsed, timer)
+            return
+
+        # wait before parsing, so that a waiting invocation does not overwrite the state parsed by a running one
+        try:
+            ticket = await scheduler.acquire(ctx)
+        except ExecutionError as e:
+            if timer is not None:
+                timer.mark("queue")
+                timer.record.status = "rejected"
+            await self._send_execution_error(ctx, e)
+            if timer is not None:
+                timer.mark("send_error")
+            return
+        if timer is not None:
+            timer.mark("queue")
+        try:
+            await self._parse_and_execute(ctx, parsed, timer)
+        finally:
+            ticket.release()
+
+    async def _parse_and_execute(
+        self, ctx: Context, parsed: Dict[str, str], timer: Optional[PhaseTimer]
+    ):
+        try:
+            self._parse_args(ctx, parsed)
+        except ArgumentError as e:
+            if timer is not None:
+                timer.mark("parse_args")
+                timer.record.status = "argument_error"
+            await self._send_argument_error(ctx, e)
+            if timer is not None:
+                timer.mark("send_error")
+            return
+        if timer is not None:
+            timer.mark("parse_args")
+        await self._execute_with_typing(ctx, timer)
+
+    async def _execute_with_typing(self, ctx: Context, timer: Optional[PhaseTimer]):
+        async with self._typing(ctx):
             try:
                 await self._execute(ctx)
             except ExecutionError as e:
+                if timer is not None:
+                    timer.mark("execute")
+                    timer.record.status = "execution_error"
                 await self._send_execution_error(ctx, e)
+                if timer is not None:
+                    timer.mark("send_error")
+                return
+            if timer is not None:
+                timer.mark("execute")
+
+    async def run_cpu_bound(
+        self,
+        ctx: Context,
+        func: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Run a CPU-bound function such as aggregation or sorting of histories
+
+        Call this from _execute. The function runs in cpu_pool so that it does not block the gateway, or directly if
+        cpu_pool is not set.
+
+        :param ctx: context in which the command was executed
+        :type ctx: discord.ext.commands.context.Context
+        :param func: function to run, must be picklable for a process pool
+        :type func: Callable[..., Any]
+        :param args: arguments of func, must be picklable for a process pool
+        :type args: Any
+        :param timeout: seconds to wait for the result, the timeout of cpu_pool if omitted
+        :type timeout: Optional[float]
+        :return: result of func
+        :rtype: Any
+        """
+        pool = self.cpu_pool
+        if pool is None:
+            return func(*args)
+        return await pool.run(ctx, func, *args, timeout=timeout)
+
+    def _typing(self, ctx: Context):
+        policy = self.typing_policy
+        if policy == TypingPolicy.ALWAYS:
+            return ctx.typing()
+        if policy == TypingPolicy.DELAYED:
+            return _DelayedTyping(ctx, self.typing_delay)
+        return _NoTyping()
 
     def _on_execute_by_bot(self) -> bool:
         """Called by BOT on execute command
@@ -92,6 +386,7 @@ class CogHelper:
         """Parse arguments
 
         By defining this method in the inherited class, arguments formatted as Dict[str, str] types can be parsed.
+        If arguments is declared, they are parsed into args without overriding.
 
         :param ctx: context in which the command was executed
         :type ctx: discord.ext.commands.context.Context
@@ -100,6 +395,9 @@ class CogHelper:
         :return: None
         :rtype: None
         """
+        if self._argument_parser is not None:
+            _parsed_args.set((self, self._argument_parser(ctx, args)))
+            return
         return NotImplementedError("this method is must be override.")
 
     async def _execute(self, ctx: Context):
@@ -114,23 +412,48 @@ class CogHelper:
         """
         return NotImplementedError("this method is must be override.")
 
+    async def _send_shared_result(
+        self, ctx: Context, sent: List[Tuple[Tuple[Any, ...], Dict[str, Any]]]
+    ) -> None:
+        """Reply to an invocation that shared the execution of an identical running invocation
+
+        This function can be defined in an inherited class to change its behavior, such as replying with a link to
+        the messages. By default the messages are sent again, files cannot be sent twice and must be handled here.
+
+        :param ctx: context of the invocation that waited
+        :type ctx: discord.ext.commands.context.Context
+        :param sent: positional and keyword arguments of each ctx.send by the running invocation
+        :type sent: List[Tuple[Tuple[Any, ...], Dict[str, Any]]]
+        :return: None
+        :rtype: None
+        """
+        for args, kwargs in sent:
+            await ctx.send(*args, **kwargs)
+
     async def _send_argument_error(self, ctx: Context, error: ArgumentError) -> None:
-        logger.warning(f"send ArgumentError={error}")
-        title = error.title
-        description = (
-            error.description if not error.description else ctx.message.content
-        )
-        embed = Embed(title=title, description=description)
-        for key, value in error.causes.items():
-            embed.add_field(name=key, value=value)
-        await ctx.send(embed=embed)
+        logger.warning("send ArgumentError", ctx, error=error)
+        await self._send_error(ctx, error)
 
     async def _send_execution_error(self, ctx: Context, error: ExecutionError) -> None:
-        logger.warning(f"send ExecutionError={error}")
+        logger.warning("send ExecutionError", ctx, error=error)
+        await self._send_error(ctx, error)
+
+    async def _send_error(self, ctx: Context, error: _ErrorBase) -> None:
+        if isinstance(ctx, _FlightContext):
+            # the waiting invocations send the error by themselves, not the embed sent here
+            ctx.flight.error = error
+            ctx = ctx.context
         description = (
             error.description if not error.description else ctx.message.content
         )
-        embed = Embed(title=error.title, description=description)
-        for key, value in error.causes.items():
-            embed.add_field(name=key, value=value)
-        await ctx.send(embed=embed)
+        dispatcher = self.error_dispatcher
+        if dispatcher is None:
+            await ctx.send(embed=error.to_embed(description))
+            return
+        key = (
+            type(error),
+            error.title,
+            description,
+            tuple((key, str(value)) for key, value in error.causes.items()),
+        )
+        dispatcher.dispatch(ctx, key, lambda count: error.to_embed(description, count))
@@ -0,0 +1,198 @@
+import asyncio
+import collections
+from typing import Callable, Dict, Hashable, Optional, Deque
+
+from discord import Embed
+from discord.ext.commands.context import Context
+
+from discord_ext_commands_coghelper.log import get_logger
+
+logger = get_logger(__name__)
+
+
+class DispatcherStats:
+    """Counters of ErrorDispatcher"""
+
+    __slots__ = ("submitted", "sent", "coalesced", "dropped", "failed")
+
+    def __init__(self):
+        self.submitted = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)}" for name in self.__slots__)
+        return f"DispatcherStats({values})"
+
+
+class _Pending:
+    __slots__ = ("key", "ctx", "render", "count", "not_before")
+
+    def __init__(
+        self, key: Hashable, ctx: Context, render: Callable[[int], Embed], not_before: float
+    ):
+        self.key = key
+        self.ctx = ctx
+        self.render = render
+        self.count = 1
+        self.not_before = not_before
+
+
+class _ChannelState:
+    __slots__ = ("queue", "pending", "last_sent", "tokens", "refilled_at", "worker")
+
+    def __init__(self, burst: float, now: float):
+        self.queue: Deque[_Pending] = collections.deque()
+        self.pending: Dict[Hashable, _Pending] = {}
+        self.last_sent: Dict[Hashable, float] = {}
+        self.tokens = burst
+        self.refilled_at = now
+        self.worker: Optional[asyncio.Future] = None
+
+
+class ErrorDispatcher:
+    """Sends error embeds with deduplication and rate limiting per channel
+
+    Identical errors in a channel are sent at most once per window, the duplicates are collapsed into one embed with
+    the count. Sends are queued per channel and paced by a token bucket, errors beyond max_queue are dropped.
+    """
+
+    def __init__(
+        self,
+        window: float = 10.0,
+        rate: float = 1.0,
+        burst: int = 3,
+        max_queue: int = 20,
+    ):
+        """__init__
+
+        :param window: seconds in which identical errors are sent only once
+        :type window: float
+        :param rate: embeds sent per second per channel
+        :type rate: float
+        :param burst: embeds that can be sent at once per channel
+        :type burst: int
+        :param max_queue: maximum number of queued embeds per channel
+        :type max_queue: int
+        """
+        self._window = window
+        self._rate = rate
+        self._burst = burst
+        self._max_queue = max_queue
+        self._channels: Dict[int, _ChannelState] = {}
+        self._stats = DispatcherStats()
+
+    @property
+    def stats(self) -> DispatcherStats:
+        """Counters of submitted, sent, coalesced, dropped and failed errors
+
+        :rtype: DispatcherStats
+        """
+        return self._stats
+
+    def queue_depth(self, channel_id: Optional[int] = None) -> int:
+        """Number of embeds waiting to be sent
+
+        :param channel_id: if specified, only the channel is counted
+        :type channel_id: Optional[int]
+        :rtype: int
+        """
+        if channel_id is not None:
+            state = self._channels.get(channel_id)
+            return 0 if state is None else len(state.queue)
+        return sum(len(state.queue) for state in self._channels.values())
+
+    def dispatch(self, ctx: Context, key: Hashable, render: Callable[[int], Embed]) -> bool:
+        """Queue an error embed for the channel of the context
+
+        :param ctx: context in which the command was executed
+        :type ctx: discord.ext.commands.context.Context
+        :param key: identifies identical errors
+        :type key: Hashable
+        :param render: builds the embed from the number of collapsed errors
+        :type render: Callable[[int], discord.Embed]
+        :return: False if the error was dropped
+        :rtype: bool
+        """
+        self._stats.submitted += 1
+        now = asyncio.get_event_loop().time()
+        channel_id = ctx.channel.id
+        state = self._channels.get(channel_id)
+        if state is None:
+            state = self._channels[channel_id] = _ChannelState(self._burst, now)
+
+        pending = state.pending.get(key)
+        if pending is not None:
+            pending.count += 1
+            self._stats.coalesced += 1
+            return True
+
+        if len(state.queue) >= self._max_queue:
+            self._stats.dropped += 1
+            return False
+
+        last_sent = state.last_sent.get(key)
+        not_before = now if last_sent is None else max(now, last_sent + self._window)
+        pending = _Pending(key, ctx, render, not_before)
+        state.pending[key] = pending
+        state.queue.append(pending)
+
+        if state.worker is None or state.worker.done():
+            state.worker = asyncio.ensure_future(self._drain(channel_id, state))
+        return True
+
+    async def join(self) -> None:
+        """Wait until all queued embeds are sent
+
+        :return: None
+        :rtype: None
+        """
+        while True:
+            workers = [
+                state.worker
+                for state in self._channels.values()
+                if state.worker is not None and not state.worker.done()
+            ]
+            if not workers:
+                return
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _drain(self, channel_id: int, state: _ChannelState) -> None:
+        loop = asyncio.get_event_loop()
+        while state.queue:
+            now = loop.time()
+            state.tokens = min(
+                self._burst, state.tokens + (now - state.refilled_at) * self._rate
+            )
+            state.refilled_at = now
+
+            ready = next((p for p in state.queue if p.not_before <= now), None)
+            if ready is None or state.tokens < 1:
+                wait = min(p.not_before for p in state.queue) - now
+                if state.tokens < 1:
+                    wait = max(wait, (1 - state.tokens) / self._rate)
+                await asyncio.sleep(max(wait, 0))
+                continue
+
+            state.queue.remove(ready)
+            del state.pending[ready.key]
+            state.tokens -= 1
+            state.last_sent[ready.key] = now
+            try:
+                await ready.ctx.send(embed=ready.render(ready.count))
+            except Exception as e:
+                # keep draining, the other errors of the channel would stay queued forever
+                self._stats.failed += 1
+                logger.warning("failed to send error", ready.ctx, error=e)
+            else:
+                self._stats.sent += 1
+
+        # forget errors sent before the window so the states do not grow
+        now = loop.time()
+        for key, sent_at in list(state.last_sent.items()):
+            if sent_at + self._window <= now:
+                del state.last_sent[key]
+        if not state.last_sent and not state.queue:
+            self._channels.pop(channel_id, None)
@@ -0,0 +1,65 @@
+from typing import Any, Dict, Optional, Tuple
+
+from discord import Embed, Colour
+
+Fields = Tuple[Tuple[Any, Any], ...]
+
+
+class EmbedTemplate:
+    """Layout of an embed shared by the embeds of a kind, such as an error class
+
+    Rendering builds a new embed through the public Embed API with the layout, the same as constructing it directly.
+    """
+
+    def __init__(
+        self,
+        colour: Optional[int] = None,
+        footer: Optional[str] = None,
+        inline: bool = True,
+    ):
+        """__init__
+
+        :param colour: colour of the embed
+        :type colour: Optional[int]
+        :param footer: footer text of the embed
+        :type footer: Optional[str]
+        :param inline: whether the fields are displayed inline
+        :type inline: bool
+        """
+        self._colour = None if colour is None else Colour(colour)
+        self._footer = footer
+        self._inline = inline
+
+    def render(
+        self,
+        title: str,
+        description: Optional[str],
+        fields: Fields = (),
+        count: int = 1,
+    ) -> Embed:
+        """Render an embed
+
+        :param title: title of the embed
+        :type title: str
+        :param description: description of the embed
+        :type description: Optional[str]
+        :param fields: names and values of the fields
+        :type fields: Tuple[Tuple[Any, Any], ...]
+        :param count: if greater than 1, added to the title as the number of collapsed embeds
+        :type count: int
+        :return: new embed instance
+        :rtype: discord.Embed
+        """
+        # omitted rather than None, the defaults differ between discord.py versions
+        attributes: Dict[str, Any] = {"title": title if count == 1 else f"{title} (x{count})"}
+        if description:
+            attributes["description"] = description
+        if self._colour is not None:
+            attributes["colour"] = self._colour
+        embed = Embed(**attributes)
+        inline = self._inline
+        for name, value in fields:
+            embed.add_field(name=name, value=value, inline=inline)
+        if self._footer is not None:
+            embed.set_footer(text=self._footer)
+        return embed
@@ -1,13 +1,23 @@
+import functools
 from typing import Dict, Optional, Any
 
-from discord import ChannelType
+from discord import ChannelType, Embed
 from discord.abc import GuildChannel
 from discord.ext.commands import Context
 
+from discord_ext_commands_coghelper.embeds import EmbedTemplate
+
+
+@functools.lru_cache(maxsize=256)
+def _prefixed_title(title: str) -> str:
+    return title if title.startswith("⚠️") else f"⚠️{title}"
+
 
 class _ErrorBase(Exception):
+    embed_template = EmbedTemplate()
+
     def __init__(self, title: str, description: str, causes: Dict[str, Any]):
-        self._title = title if title.startswith("⚠️") else f"⚠️{title}"
+        self._title = _prefixed_title(title)
         self._description = description
         self._causes = causes
 
@@ -23,6 +33,22 @@ class _ErrorBase(Exception):
     def causes(self) -> Dict[str, Any]:
         return self._causes
 
+    def to_embed(self, description: Optional[str] = None, count: int = 1) -> Embed:
+        """Render the error with embed_template of the class
+
+        :param description: description of the embed, description of the error is used if omitted
+        :type description: Optional[str]
+        :param count: number of collapsed errors
+        :type count: int
+        :rtype: discord.Embed
+        """
+        return self.embed_template.render(
+            self.title,
+            self._description if description is None else description,
+            tuple(self._causes.items()),
+            count,
+        )
+
     def __str__(self):
         causes = ", ".join([f"{key}={value}" for key, value in self.causes.items()])
         return f"[title={self.title}, description={self.description}, {causes}]"
@@ -34,6 +60,8 @@ class ArgumentError(_ErrorBase):
     Please raise in the _parse_args function
     """
 
+    embed_template = EmbedTemplate()
+
     def __init__(self, ctx: Context, **kwargs):
         super().__init__(
             kwargs.pop("title", "Argument Error"),
@@ -48,6 +76,8 @@ class ExecutionError(_ErrorBase):
     Please raise in the _execute function
     """
 
+    embed_template = EmbedTemplate()
+
     def __init__(self, ctx: Context, **kwargs):
         super().__init__(
             kwargs.pop("title", "Execution Error"),
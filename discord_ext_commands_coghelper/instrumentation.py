@@ -0,0 +1,321 @@
+import asyncio
+import collections
+import concurrent.futures
+import json
+import threading
+import time
+from typing import Dict, Optional, Iterable, Sequence, TextIO, Tuple, List, Deque
+
+from discord.ext.commands.context import Context
+
+from discord_ext_commands_coghelper.log import get_logger
+
+logger = get_logger(__name__)
+
+PHASE_TOTAL = "total"
+
+
+class ExecutionRecord:
+    """Timings of a command execution"""
+
+    __slots__ = (
+        "command",
+        "guild_id",
+        "channel_id",
+        "user_id",
+        "status",
+        "started_at",
+        "phases",
+    )
+
+    def __init__(
+        self,
+        command: str,
+        guild_id: Optional[int],
+        channel_id: Optional[int],
+        user_id: Optional[int],
+    ):
+        self.command = command
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.user_id = user_id
+        self.status = "ok"
+        self.started_at = time.time()
+        self.phases: Dict[str, float] = {}
+
+    def to_dict(self) -> Dict[str, object]:
+        """Convert to dict
+
+        :rtype: Dict[str, object]
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class PhaseTimer:
+    """Measures the phases of a command execution with a monotonic clock"""
+
+    __slots__ = ("record", "_start", "_last")
+
+    def __init__(self, record: ExecutionRecord):
+        self.record = record
+        self._start = self._last = time.perf_counter()
+
+    def mark(self, phase: str) -> None:
+        """End the current phase
+
+        The time since the previous mark is added to the phase.
+
+        :param phase: name of the phase
+        :type phase: str
+        :return: None
+        :rtype: None
+        """
+        now = time.perf_counter()
+        phases = self.record.phases
+        phases[phase] = phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def stop(self) -> ExecutionRecord:
+        """Stop the timer and set the total time
+
+        :return: finished record
+        :rtype: ExecutionRecord
+        """
+        self.record.phases[PHASE_TOTAL] = time.perf_counter() - self._start
+        return self.record
+
+
+class MetricsSink:
+    """Receives finished ExecutionRecord, inherit it to export metrics"""
+
+    def emit(self, record: ExecutionRecord) -> None:
+        """Receive a record
+
+        :param record: finished record
+        :type record: ExecutionRecord
+        :return: None
+        :rtype: None
+        """
+        raise NotImplementedError
+
+
+class MemorySink(MetricsSink):
+    """Keeps the latest records in memory"""
+
+    def __init__(self, size: int = 1024):
+        self.records: Deque[ExecutionRecord] = collections.deque(maxlen=size)
+
+    def emit(self, record: ExecutionRecord) -> None:
+        self.records.append(record)
+
+
+class JsonLinesSink(MetricsSink):
+    """Writes records as JSON lines
+
+    While an event loop is running, the lines are buffered and written in batches by a background thread, so that
+    the event loop does not wait for the stream. Without a running event loop, they are written at once. Call flush
+    to wait for the buffered lines, and close when the sink is no longer used.
+    """
+
+    def __init__(self, stream: TextIO, flush: bool = True):
+        """__init__
+
+        :param stream: writable text stream, such as open(path, "a")
+        :type stream: TextIO
+        :param flush: flush the stream after every written batch of records
+        :type flush: bool
+        """
+        self._stream = stream
+        self._flush = flush
+        self._lock = threading.Lock()
+        self._pending: List[str] = []
+        self._pending_lock = threading.Lock()
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._writing = False
+
+    def emit(self, record: ExecutionRecord) -> None:
+        line = json.dumps(record.to_dict(), ensure_ascii=False)
+        with self._pending_lock:
+            self._pending.append(line + "\n")
+            if self._writing:
+                return
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                background = False
+            else:
+                background = self._writing = True
+        if not background:
+            self._write()
+            return
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="jsonlines-write"
+            )
+        self._executor.submit(self._write_in_background)
+
+    def flush(self) -> None:
+        """Write the buffered lines and wait for them
+
+        :return: None
+        :rtype: None
+        """
+        self._write()
+
+    def close(self) -> None:
+        """Write the buffered lines and stop the background thread, the stream is not closed
+
+        :return: None
+        :rtype: None
+        """
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        self._write()
+
+    def _write_in_background(self) -> None:
+        while True:
+            try:
+                self._write()
+            except Exception as e:
+                logger.warning("failed to write records", error=e)
+            # lines emitted while writing are not scheduled again
+            with self._pending_lock:
+                if not self._pending:
+                    self._writing = False
+                    return
+
+    def _write(self) -> None:
+        with self._lock:
+            with self._pending_lock:
+                lines, self._pending = self._pending, []
+            if not lines:
+                return
+            self._stream.write("".join(lines))
+            if self._flush:
+                self._stream.flush()
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    index = min(len(values) - 1, max(0, round(percentile / 100 * (len(values) - 1))))
+    return values[index]
+
+
+class Instrumentation:
+    """Collects phase timings of CogHelper.execute
+
+    The latest timings are kept per command and phase in ring buffers, finished records are passed to sinks.
+    """
+
+    def __init__(self, size: int = 1024, sinks: Iterable[MetricsSink] = ()):
+        """__init__
+
+        :param size: number of timings kept per command and phase
+        :type size: int
+        :param sinks: receivers of finished records
+        :type sinks: Iterable[MetricsSink]
+        """
+        self._size = size
+        self._sinks: List[MetricsSink] = list(sinks)
+        self._timings: Dict[Tuple[str, str], Deque[float]] = {}
+        self._counts: Dict[Tuple[str, str], int] = collections.Counter()
+
+    def add_sink(self, sink: MetricsSink) -> None:
+        """Add a sink
+
+        :param sink: receiver of finished records
+        :type sink: MetricsSink
+        :return: None
+        :rtype: None
+        """
+        self._sinks.append(sink)
+
+    def start(self, ctx: Context) -> PhaseTimer:
+        """Start measuring a command execution
+
+        :param ctx: context in which the command was executed
+        :type ctx: discord.ext.commands.context.Context
+        :return: timer of the execution
+        :rtype: PhaseTimer
+        """
+        guild = ctx.guild
+        channel = ctx.channel
+        author = ctx.author
+        record = ExecutionRecord(
+            str(ctx.command),
+            guild.id if guild is not None else None,
+            channel.id if channel is not None else None,
+            author.id if author is not None else None,
+        )
+        return PhaseTimer(record)
+
+    def finish(self, timer: PhaseTimer) -> ExecutionRecord:
+        """Finish measuring and store the timings
+
+        :param timer: timer returned by start
+        :type timer: PhaseTimer
+        :return: finished record
+        :rtype: ExecutionRecord
+        """
+        record = timer.stop()
+        for phase, elapsed in record.phases.items():
+            key = (record.command, phase)
+            timings = self._timings.get(key)
+            if timings is None:
+                timings = self._timings[key] = collections.deque(maxlen=self._size)
+            timings.append(elapsed)
+        self._counts[(record.command, record.status)] += 1
+        for sink in self._sinks:
+            # a failing sink must not replace the result of the command
+            try:
+                sink.emit(record)
+            except Exception as e:
+                logger.warning("failed to emit record", sink=sink, error=e)
+        return record
+
+    def percentiles(
+        self,
+        command: str,
+        phase: str = PHASE_TOTAL,
+        percentiles: Sequence[float] = (50, 90, 99),
+    ) -> Dict[float, float]:
+        """Percentiles of the latest timings in seconds
+
+        :param command: name of the command
+        :type command: str
+        :param phase: name of the phase
+        :type phase: str
+        :param percentiles: percentiles to compute
+        :type percentiles: Sequence[float]
+        :return: seconds per percentile, empty if there are no timings
+        :rtype: Dict[float, float]
+        """
+        timings = self._timings.get((command, phase))
+        if not timings:
+            return {}
+        values = sorted(timings)
+        return {p: _percentile(values, p) for p in percentiles}
+
+    def counts(self) -> Dict[Tuple[str, str], int]:
+        """Number of executions per command and status
+
+        :rtype: Dict[Tuple[str, str], int]
+        """
+        return dict(self._counts)
+
+    def summary(
+        self, percentiles: Sequence[float] = (50, 90, 99)
+    ) -> Dict[str, Dict[str, Dict[float, float]]]:
+        """Percentiles of all commands and phases
+
+        :param percentiles: percentiles to compute
+        :type percentiles: Sequence[float]
+        :return: command -> phase -> percentile -> seconds
+        :rtype: Dict[str, Dict[str, Dict[float, float]]]
+        """
+        result: Dict[str, Dict[str, Dict[float, float]]] = {}
+        for command, phase in self._timings:
+            result.setdefault(command, {})[phase] = self.percentiles(
+                command, phase, percentiles
+            )
+        return result
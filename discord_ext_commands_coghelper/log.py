@@ -0,0 +1,138 @@
+import json
+import logging
+from typing import Dict, Any, Optional
+
+from discord.ext.commands.context import Context
+
+
+def context_fields(ctx: Context) -> Dict[str, Any]:
+    """Fields that identify where a command was executed
+
+    :param ctx: context in which the command was executed
+    :type ctx: discord.ext.commands.context.Context
+    :return: command, guild_id, channel_id and user_id
+    :rtype: Dict[str, Any]
+    """
+    guild = ctx.guild
+    channel = ctx.channel
+    author = ctx.author
+    return dict(
+        command=str(ctx.command),
+        guild_id=guild.id if guild is not None else None,
+        channel_id=channel.id if channel is not None else None,
+        user_id=author.id if author is not None else None,
+    )
+
+
+class _LazyMessage:
+    __slots__ = ("event", "fields")
+
+    def __init__(self, event: str, fields: Dict[str, Any]):
+        self.event = event
+        self.fields = fields
+
+    def __str__(self):
+        if not self.fields:
+            return self.event
+        values = " ".join(f"{key}={value}" for key, value in self.fields.items())
+        return f"{self.event} {values}"
+
+
+class StructuredLogger:
+    """Logger that records an event with context fields
+
+    Nothing is evaluated unless the level is enabled, the message is rendered only when a handler formats it.
+    The fields are available as record.fields.
+    """
+
+    def __init__(self, logger: logging.Logger):
+        """__init__
+
+        :param logger: logger to output
+        :type logger: logging.Logger
+        """
+        self._logger = logger
+
+    @property
+    def logger(self) -> logging.Logger:
+        """Underlying logger
+
+        :rtype: logging.Logger
+        """
+        return self._logger
+
+    def is_enabled_for(self, level: int) -> bool:
+        """Whether the level is enabled
+
+        :param level: logging level
+        :type level: int
+        :rtype: bool
+        """
+        return self._logger.isEnabledFor(level)
+
+    def log(
+        self, level: int, event: str, ctx: Optional[Context] = None, **fields: Any
+    ) -> None:
+        """Record an event
+
+        :param level: logging level
+        :type level: int
+        :param event: name of the event
+        :type event: str
+        :param ctx: if specified, context_fields(ctx) are added to fields
+        :type ctx: discord.ext.commands.context.Context
+        :param fields: fields of the event
+        :type fields: Any
+        :return: None
+        :rtype: None
+        """
+        if not self._logger.isEnabledFor(level):
+            return
+        if ctx is not None:
+            fields = {**context_fields(ctx), **fields}
+        self._logger.log(
+            level,
+            "%s",
+            _LazyMessage(event, fields),
+            extra={"event": event, "fields": fields},
+            stacklevel=3,
+        )
+
+    def debug(self, event: str, ctx: Optional[Context] = None, **fields: Any) -> None:
+        self.log(logging.DEBUG, event, ctx, **fields)
+
+    def info(self, event: str, ctx: Optional[Context] = None, **fields: Any) -> None:
+        self.log(logging.INFO, event, ctx, **fields)
+
+    def warning(self, event: str, ctx: Optional[Context] = None, **fields: Any) -> None:
+        self.log(logging.WARNING, event, ctx, **fields)
+
+    def error(self, event: str, ctx: Optional[Context] = None, **fields: Any) -> None:
+        self.log(logging.ERROR, event, ctx, **fields)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    """Get a StructuredLogger
+
+    :param name: name of the logger
+    :type name: str
+    :rtype: StructuredLogger
+    """
+    return StructuredLogger(logging.getLogger(name))
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records of StructuredLogger as JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = dict(
+            time=self.formatTime(record),
+            level=record.levelname,
+            logger=record.name,
+            event=getattr(record, "event", None),
+            message=record.getMessage(),
+        )
+        data.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
@@ -0,0 +1,229 @@
+import asyncio
+import concurrent.futures
+import functools
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Set
+
+from discord.ext.commands.context import Context
+
+from discord_ext_commands_coghelper import ExecutionError
+from discord_ext_commands_coghelper.log import get_logger
+from discord_ext_commands_coghelper.utils import Constant
+
+logger = get_logger(__name__)
+
+
+class PoolKind(Constant):
+    """Executor used by CpuPool
+
+    PROCESS: a process pool, the function and the arguments must be picklable,
+    THREAD: a thread pool, only for work that releases the GIL such as numpy or compression
+    """
+
+    PROCESS = "process"
+    THREAD = "thread"
+
+
+class PoolStats:
+    """Counters of CpuPool"""
+
+    __slots__ = ("submitted", "completed", "failed", "timeouts", "cancelled")
+
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.cancelled = 0
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)}" for name in self.__slots__)
+        return f"PoolStats({values})"
+
+
+class CpuPool:
+    """Runs CPU-bound functions outside of the event loop
+
+    The executor is created on the first run. Runs are tracked by the message that invoked the command, so that they
+    can be cancelled when the message is deleted. A function that already started in a process cannot be interrupted,
+    its result is discarded.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        kind: str = PoolKind.PROCESS,
+        timeout: Optional[float] = None,
+    ):
+        """__init__
+
+        :param max_workers: number of workers, the number of CPUs if omitted
+        :type max_workers: Optional[int]
+        :param kind: executor used, see PoolKind
+        :type kind: str
+        :param timeout: default seconds to wait for a result, None waits forever
+        :type timeout: Optional[float]
+        """
+        if kind not in (PoolKind.PROCESS, PoolKind.THREAD):
+            raise ValueError(f"unknown pool kind: {kind}")
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._kind = kind
+        self._timeout = timeout
+        self._executor: Optional[concurrent.futures.Executor] = None
+        self._running: Dict[int, Set[asyncio.Future]] = {}
+        self._active = 0
+        # runs finish in the workers, the counter is also updated from their threads
+        self._active_lock = threading.Lock()
+        self._stats = PoolStats()
+
+    @property
+    def max_workers(self) -> int:
+        """Number of workers
+
+        :rtype: int
+        """
+        return self._max_workers
+
+    @property
+    def active(self) -> int:
+        """Number of runs being executed or waiting for a worker
+
+        A run that timed out or was cancelled while executing is counted until the worker finishes it.
+
+        :rtype: int
+        """
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        """Number of runs waiting for a worker
+
+        :rtype: int
+        """
+        return max(0, self._active - self._max_workers)
+
+    @property
+    def utilization(self) -> float:
+        """Ratio of busy workers, from 0.0 to 1.0
+
+        :rtype: float
+        """
+        return min(self._active, self._max_workers) / self._max_workers
+
+    @property
+    def stats(self) -> PoolStats:
+        """Counters of submitted, completed, failed, timed out and cancelled runs
+
+        :rtype: PoolStats
+        """
+        return self._stats
+
+    async def run(
+        self,
+        ctx: Optional[Context],
+        func: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Run func(*args) in the pool and wait for the result
+
+        :param ctx: context in which the command was executed, the run is cancelled when its message is deleted
+        :type ctx: Optional[discord.ext.commands.context.Context]
+        :param func: function to run, must be picklable for PoolKind.PROCESS
+        :type func: Callable[..., Any]
+        :param args: arguments of func, must be picklable for PoolKind.PROCESS
+        :type args: Any
+        :param timeout: seconds to wait for the result, the timeout of the pool if omitted
+        :type timeout: Optional[float]
+        :return: result of func
+        :rtype: Any
+        :raises ExecutionError: if the result is not ready within timeout, asyncio.TimeoutError without ctx
+        :raises asyncio.CancelledError: if the run is cancelled by cancel_for_message
+        """
+        if timeout is None:
+            timeout = self._timeout
+        loop = asyncio.get_event_loop()
+        self._stats.submitted += 1
+        work = self._get_executor().submit(functools.partial(func, *args))
+        with self._active_lock:
+            self._active += 1
+        # decremented when the worker is done, not when the caller stops waiting
+        work.add_done_callback(self._on_work_done)
+        future = asyncio.wrap_future(work, loop=loop)
+        message_id = ctx.message.id if ctx is not None else None
+        if message_id is not None:
+            self._running.setdefault(message_id, set()).add(future)
+        try:
+            result = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._stats.timeouts += 1
+            logger.warning("cpu bound run timed out", ctx, func=func, timeout=timeout)
+            if ctx is None:
+                raise
+            raise ExecutionError(ctx, title="Execution Timeout", timeout=f"{timeout}s")
+        except asyncio.CancelledError:
+            self._stats.cancelled += 1
+            raise
+        except Exception:
+            self._stats.failed += 1
+            raise
+        finally:
+            if message_id is not None:
+                futures = self._running[message_id]
+                futures.discard(future)
+                if not futures:
+                    del self._running[message_id]
+        self._stats.completed += 1
+        return result
+
+    def cancel_for_message(self, message_id: int) -> int:
+        """Cancel the runs invoked by a message
+
+        :param message_id: Message ID of the command
+        :type message_id: int
+        :return: number of cancelled runs
+        :rtype: int
+        """
+        futures = self._running.get(message_id, ())
+        return sum(1 for future in list(futures) if future.cancel())
+
+    def on_message_delete(self, message) -> None:
+        """Cancel the runs invoked by a deleted message
+
+        Call this from an on_message_delete listener.
+
+        :param message: deleted message
+        :type message: discord.Message
+        :return: None
+        :rtype: None
+        """
+        self.cancel_for_message(message.id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the executor, it is created again on the next run
+
+        :param wait: wait until the running functions finish
+        :type wait: bool
+        :return: None
+        :rtype: None
+        """
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def _on_work_done(self, work: concurrent.futures.Future) -> None:
+        with self._active_lock:
+            self._active -= 1
+
+    def _get_executor(self) -> concurrent.futures.Executor:
+        if self._executor is None:
+            if self._kind == PoolKind.PROCESS:
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    self._max_workers
+                )
+            else:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    self._max_workers, thread_name_prefix="coghelper-cpu"
+                )
+        return self._executor
@@ -0,0 +1,229 @@
+import asyncio
+import collections
+import time
+from typing import Deque, Dict, Hashable, Optional, Tuple
+
+from discord.ext.commands.context import Context
+
+from discord_ext_commands_coghelper import ExecutionError
+
+_Keys = Tuple[str, Optional[int], int]
+
+
+class SchedulerStats:
+    """Counters of ExecutionScheduler"""
+
+    __slots__ = ("admitted", "waited", "rejected", "cancelled")
+
+    def __init__(self):
+        self.admitted = 0
+        self.waited = 0
+        self.rejected = 0
+        self.cancelled = 0
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)}" for name in self.__slots__)
+        return f"SchedulerStats({values})"
+
+
+class Ticket:
+    """Permission to execute returned by ExecutionScheduler.acquire"""
+
+    __slots__ = ("_scheduler", "_keys", "wait_time")
+
+    def __init__(self, scheduler: "ExecutionScheduler", keys: _Keys, wait_time: float):
+        self._scheduler = scheduler
+        self._keys = keys
+        self.wait_time = wait_time
+
+    def release(self) -> None:
+        """Give the slot to the next waiting execution, calling it again does nothing
+
+        :return: None
+        :rtype: None
+        """
+        if self._keys is not None:
+            keys, self._keys = self._keys, None
+            self._scheduler._release(keys)
+
+
+class _Waiter:
+    __slots__ = ("keys", "future")
+
+    def __init__(self, keys: _Keys, future: asyncio.Future):
+        self.keys = keys
+        self.future = future
+
+
+class ExecutionScheduler:
+    """Limits concurrent executions per command, guild and user
+
+    Executions beyond the limits wait in a queue per guild, and the queues are served in round-robin so that a busy
+    guild does not starve the others. When max_queue executions are waiting, new executions are rejected with an
+    ExecutionError.
+    """
+
+    def __init__(
+        self,
+        per_command: Optional[int] = None,
+        per_guild: Optional[int] = None,
+        per_user: Optional[int] = None,
+        max_queue: int = 100,
+        overflow_title: str = "Too Many Requests",
+        overflow_description: Optional[str] = None,
+    ):
+        """__init__
+
+        :param per_command: maximum concurrent executions of a command across guilds, None is unlimited
+        :type per_command: Optional[int]
+        :param per_guild: maximum concurrent executions in a guild, None is unlimited
+        :type per_guild: Optional[int]
+        :param per_user: maximum concurrent executions by a user, None is unlimited
+        :type per_user: Optional[int]
+        :param max_queue: maximum number of waiting executions
+        :type max_queue: int
+        :param overflow_title: title of the ExecutionError raised when the queue is full
+        :type overflow_title: str
+        :param overflow_description: description of the ExecutionError, the message content if omitted
+        :type overflow_description: Optional[str]
+        """
+        self._limits = (per_command, per_guild, per_user)
+        self._max_queue = max_queue
+        self._overflow_title = overflow_title
+        self._overflow_description = overflow_description
+        self._running: Tuple[Dict[Hashable, int], ...] = ({}, {}, {})
+        self._waiting: "collections.OrderedDict[Optional[int], Deque[_Waiter]]" = (
+            collections.OrderedDict()
+        )
+        self._queue_depth = 0
+        self._stats = SchedulerStats()
+
+    @property
+    def stats(self) -> SchedulerStats:
+        """Counters of admitted, waited, rejected and cancelled executions
+
+        :rtype: SchedulerStats
+        """
+        return self._stats
+
+    @property
+    def running(self) -> int:
+        """Number of executions holding a slot
+
+        :rtype: int
+        """
+        return sum(self._running[0].values())
+
+    def queue_depth(self, guild_id: Optional[int] = None) -> int:
+        """Number of waiting executions
+
+        :param guild_id: if specified, only the guild is counted
+        :type guild_id: Optional[int]
+        :rtype: int
+        """
+        if guild_id is not None:
+            return len(self._waiting.get(guild_id, ()))
+        return self._queue_depth
+
+    async def acquire(self, ctx: Context) -> Ticket:
+        """Wait until the execution is allowed
+
+        Release the returned ticket when the execution finishes.
+
+        :param ctx: context in which the command was executed
+        :type ctx: discord.ext.commands.context.Context
+        :return: ticket holding the slot
+        :rtype: Ticket
+        :raises ExecutionError: if the queue is full
+        """
+        keys = (
+            str(ctx.command),
+            ctx.guild.id if ctx.guild is not None else None,
+            ctx.author.id,
+        )
+        if not self._queue_depth and self._can_run(keys):
+            self._take(keys)
+            return Ticket(self, keys, 0.0)
+
+        if self._queue_depth >= self._max_queue:
+            self._stats.rejected += 1
+            kwargs = {}
+            if self._overflow_description is not None:
+                kwargs["description"] = self._overflow_description
+            raise ExecutionError(
+                ctx, title=self._overflow_title, queue=self._queue_depth, **kwargs
+            )
+
+        self._stats.waited += 1
+        started_at = time.perf_counter()
+        waiter = _Waiter(keys, asyncio.get_event_loop().create_future())
+        self._waiting.setdefault(keys[1], collections.deque()).append(waiter)
+        self._queue_depth += 1
+        # the new waiter may fit even though others are blocked by their own limits
+        self._wake()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            self._stats.cancelled += 1
+            if waiter.future.done() and not waiter.future.cancelled():
+                # the slot was given just before the cancellation
+                self._release(keys)
+            else:
+                self._remove(waiter)
+            raise
+        return Ticket(self, keys, time.perf_counter() - started_at)
+
+    def _can_run(self, keys: _Keys) -> bool:
+        for limit, running, key in zip(self._limits, self._running, keys):
+            if limit is not None and running.get(key, 0) >= limit:
+                return False
+        return True
+
+    def _take(self, keys: _Keys) -> None:
+        self._stats.admitted += 1
+        for running, key in zip(self._running, keys):
+            running[key] = running.get(key, 0) + 1
+
+    def _release(self, keys: _Keys) -> None:
+        for running, key in zip(self._running, keys):
+            count = running[key] - 1
+            if count:
+                running[key] = count
+            else:
+                del running[key]
+        self._wake()
+
+    def _remove(self, waiter: _Waiter) -> None:
+        queue = self._waiting.get(waiter.keys[1])
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self._queue_depth -= 1
+            if not queue:
+                del self._waiting[waiter.keys[1]]
+
+    def _wake(self) -> None:
+        # give at most one slot per guild per round, and move served guilds to the end
+        granted = True
+        while granted and self._waiting:
+            granted = False
+            for guild_id in list(self._waiting):
+                queue = self._waiting[guild_id]
+                waiter = next(
+                    (
+                        w
+                        for w in queue
+                        if not w.future.done() and self._can_run(w.keys)
+                    ),
+                    None,
+                )
+                if waiter is None:
+                    continue
+                queue.remove(waiter)
+                self._queue_depth -= 1
+                if queue:
+                    self._waiting.move_to_end(guild_id)
+                else:
+                    del self._waiting[guild_id]
+                self._take(waiter.keys)
+                waiter.future.set_result(None)
+                granted = True
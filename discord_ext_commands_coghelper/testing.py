@@ -0,0 +1,729 @@
+import asyncio
+import collections
+import contextvars
+import datetime
+import random
+import time
+from types import SimpleNamespace
+from typing import (
+    Any,
+    Callable,
+    Counter,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import discord
+
+from discord_ext_commands_coghelper.instrumentation import _percentile
+
+PAGE_SIZE = 100
+
+_execution_calls: "contextvars.ContextVar[Optional[Counter[str]]]" = (
+    contextvars.ContextVar("execution_calls", default=None)
+)
+
+
+def make_not_found(message: str = "Unknown Message") -> discord.NotFound:
+    """Create the NotFound raised by the REST API for an unknown message
+
+    :param message: error message, such as "Unknown Member" for a member
+    :type message: str
+    :rtype: discord.NotFound
+    """
+    return discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), message)
+
+
+def make_forbidden() -> discord.Forbidden:
+    """Create the Forbidden raised by the REST API for a channel that cannot be read
+
+    :rtype: discord.Forbidden
+    """
+    return discord.Forbidden(SimpleNamespace(status=403, reason="Forbidden"), "Missing Access")
+
+
+class FakeRuntime:
+    """Simulated Discord REST API shared by fake objects
+
+    Every request sleeps for the latency, is counted per route and is paced by the rate limit the same as discord.py
+    waits on 429 responses. Message fetches fail with NotFound and Forbidden at the given rates.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        not_found_rate: float = 0.0,
+        forbidden_rate: float = 0.0,
+        rate_limit: Optional[float] = None,
+        seed: Optional[int] = None,
+    ):
+        """__init__
+
+        :param latency: seconds of a request
+        :type latency: float
+        :param not_found_rate: probability that a message fetch fails with NotFound
+        :type not_found_rate: float
+        :param forbidden_rate: probability that a message fetch or history request fails with Forbidden
+        :type forbidden_rate: float
+        :param rate_limit: requests per second per route, None is unlimited
+        :type rate_limit: Optional[float]
+        :param seed: seed of the injected errors
+        :type seed: Optional[int]
+        """
+        self.latency = latency
+        self.not_found_rate = not_found_rate
+        self.forbidden_rate = forbidden_rate
+        self.rate_limit = rate_limit
+        self.http_calls: Counter[str] = collections.Counter()
+        self.rate_limited = 0
+        self._random = random.Random(seed)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def reset(self) -> None:
+        """Reset the counters and the rate limit buckets
+
+        :return: None
+        :rtype: None
+        """
+        self.http_calls.clear()
+        self.rate_limited = 0
+        self._buckets.clear()
+
+    async def request(
+        self,
+        route: str,
+        latency: Optional[float] = None,
+        not_found: bool = False,
+        forbidden: bool = False,
+    ) -> None:
+        """Simulate a request
+
+        :param route: name of the API, such as "fetch_message"
+        :type route: str
+        :param latency: seconds of the request, the latency of the runtime if omitted
+        :type latency: Optional[float]
+        :param not_found: whether the request can fail with NotFound
+        :type not_found: bool
+        :param forbidden: whether the request can fail with Forbidden
+        :type forbidden: bool
+        :return: None
+        :rtype: None
+        """
+        self.http_calls[route] += 1
+        calls = _execution_calls.get()
+        if calls is not None:
+            calls[route] += 1
+        if self.rate_limit is not None:
+            await self._wait_rate_limit(route)
+        await asyncio.sleep(self.latency if latency is None else latency)
+        if forbidden and self.forbidden_rate and self._random.random() < self.forbidden_rate:
+            raise make_forbidden()
+        if not_found and self.not_found_rate and self._random.random() < self.not_found_rate:
+            raise make_not_found()
+
+    async def _wait_rate_limit(self, route: str) -> None:
+        rate = self.rate_limit
+        burst = max(1.0, rate)
+        now = time.monotonic()
+        tokens, refilled_at = self._buckets.get(route, (burst, now))
+        tokens = min(burst, tokens + (now - refilled_at) * rate)
+        if tokens >= 1:
+            self._buckets[route] = (tokens - 1, now)
+            return
+        # reserve the next token and wait for it
+        self.rate_limited += 1
+        self._buckets[route] = (tokens - 1, now)
+        await asyncio.sleep((1 - tokens) / rate)
+
+
+_default_runtime = FakeRuntime()
+
+
+def get_default_runtime() -> FakeRuntime:
+    """Get the FakeRuntime used by fake objects created without a runtime
+
+    :rtype: FakeRuntime
+    """
+    return _default_runtime
+
+
+def _bound_id(value, high: bool) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return discord.utils.time_snowflake(value, high=high)
+    return value.id
+
+
+class FakeMessage:
+    """Message with an ID and content"""
+
+    def __init__(self, message_id: int, content: str = "", author: Any = None):
+        self.id = message_id
+        self.content = content
+        self.author = author
+        self.channel = None
+        self.guild = None
+
+    def __repr__(self):
+        return f"<FakeMessage id={self.id}>"
+
+    @property
+    def created_at(self) -> datetime.datetime:
+        return discord.utils.snowflake_time(self.id)
+
+
+class FakeTextChannel(discord.TextChannel):
+    """TextChannel that passes isinstance checks without a connection state
+
+    fetch_message and history request the runtime, history makes a request per 100 messages.
+    """
+
+    def __init__(
+        self,
+        channel_id: int,
+        messages: Iterable[FakeMessage] = (),
+        latency: Optional[float] = None,
+        forbidden: bool = False,
+        last_message_id: Optional[int] = None,
+        runtime: Optional[FakeRuntime] = None,
+    ):
+        """__init__
+
+        :param channel_id: Channel ID
+        :type channel_id: int
+        :param messages: messages in the channel
+        :type messages: Iterable[FakeMessage]
+        :param latency: seconds of a request to this channel, the latency of the runtime if omitted
+        :type latency: Optional[float]
+        :param forbidden: whether every request fails with Forbidden
+        :type forbidden: bool
+        :param last_message_id: ID of the last message, raised by add_message and the given messages
+        :type last_message_id: Optional[int]
+        :param runtime: simulated API, get_default_runtime() if omitted
+        :type runtime: Optional[FakeRuntime]
+        """
+        self.id = channel_id
+        self.name = f"channel-{channel_id}"
+        self.guild = None
+        self.runtime = runtime if runtime is not None else get_default_runtime()
+        self.latency = latency
+        self.forbidden = forbidden
+        self.fetch_count = 0
+        self.history_count = 0
+        self.cancelled_count = 0
+        self.tracker = None
+        self._messages: Dict[int, FakeMessage] = {}
+        self.last_message_id = last_message_id
+        for message in messages:
+            self.add_message(message)
+
+    def __repr__(self):
+        return f"<FakeTextChannel id={self.id}>"
+
+    @property
+    def created_at(self) -> datetime.datetime:
+        return discord.utils.snowflake_time(self.id)
+
+    def add_message(self, message: FakeMessage) -> None:
+        message.channel = self
+        message.guild = self.guild
+        self._messages[message.id] = message
+        if self.last_message_id is None or message.id > self.last_message_id:
+            self.last_message_id = message.id
+
+    async def fetch_message(self, message_id: int) -> FakeMessage:
+        self.fetch_count += 1
+        try:
+            await self.runtime.request(
+                "fetch_message", self.latency, not_found=True, forbidden=True
+            )
+        except asyncio.CancelledError:
+            self.cancelled_count += 1
+            raise
+        if self.forbidden:
+            raise make_forbidden()
+        message = self._messages.get(message_id)
+        if message is None:
+            raise make_not_found()
+        return message
+
+    async def _request_page(self) -> None:
+        self.history_count += 1
+        tracker = self.tracker
+        if tracker is not None:
+            tracker.active += 1
+            tracker.peak = max(tracker.peak, tracker.active)
+        try:
+            await self.runtime.request("history", self.latency, forbidden=True)
+        finally:
+            if tracker is not None:
+                tracker.active -= 1
+        if self.forbidden:
+            raise make_forbidden()
+
+    async def history(
+        self, limit=100, before=None, after=None, around=None, oldest_first=None
+    ):
+        """Same order and bounds as discord.abc.Messageable.history"""
+        before_id = _bound_id(before, high=False)
+        after_id = _bound_id(after, high=True)
+        ids = sorted(self._messages)
+        if around is not None:
+            around_id = _bound_id(around, high=False)
+            half = min(limit or PAGE_SIZE, PAGE_SIZE + 1) // 2
+            older = [i for i in ids if i < around_id][-half:]
+            newer = [i for i in ids if i >= around_id][
+                : half + 1 if around_id in self._messages else half
+            ]
+            ids = older + newer
+            ids.reverse()
+        else:
+            if before_id is not None:
+                ids = [i for i in ids if i < before_id]
+            if after_id is not None:
+                ids = [i for i in ids if i > after_id]
+            if oldest_first is None:
+                oldest_first = after is not None
+            if not oldest_first:
+                ids.reverse()
+            if limit is not None:
+                ids = ids[:limit]
+
+        await self._request_page()
+        for index, message_id in enumerate(ids):
+            if index and index % PAGE_SIZE == 0:
+                await self._request_page()
+            yield self._messages[message_id]
+
+
+class FakeMember:
+    """Member or user with an ID"""
+
+    def __init__(self, user_id: int, bot: bool = False, name: Optional[str] = None):
+        self.id = user_id
+        self.bot = bot
+        self.name = name if name is not None else f"user-{user_id}"
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return f"<FakeMember id={self.id}>"
+
+
+class FakeGuild:
+    """Guild with text channels and members"""
+
+    def __init__(
+        self,
+        guild_id: int,
+        channels: Sequence[FakeTextChannel] = (),
+        members: Iterable[FakeMember] = (),
+        runtime: Optional[FakeRuntime] = None,
+        member_cache: bool = True,
+        members_intent: bool = True,
+    ):
+        """__init__
+
+        :param guild_id: Guild ID
+        :type guild_id: int
+        :param channels: channels of the guild
+        :type channels: Sequence[FakeTextChannel]
+        :param members: members of the guild
+        :type members: Iterable[FakeMember]
+        :param runtime: simulated API, get_default_runtime() if omitted
+        :type runtime: Optional[FakeRuntime]
+        :param member_cache: whether the members are in the gateway cache, otherwise get_member finds only the
+            members cached by query_members
+        :type member_cache: bool
+        :param members_intent: whether query_members is allowed, it raises ClientException if False
+        :type members_intent: bool
+        """
+        self.id = guild_id
+        self.name = f"guild-{guild_id}"
+        self.runtime = runtime if runtime is not None else get_default_runtime()
+        self.channels = list(channels)
+        self.members_intent = members_intent
+        self._members = {member.id: member for member in members}
+        self._cached_members = dict(self._members) if member_cache else {}
+        for channel in self.channels:
+            channel.guild = self
+            for message in channel._messages.values():
+                message.guild = self
+
+    def __repr__(self):
+        return f"<FakeGuild id={self.id}>"
+
+    @property
+    def created_at(self) -> datetime.datetime:
+        return discord.utils.snowflake_time(self.id)
+
+    @property
+    def members(self) -> List[FakeMember]:
+        return list(self._members.values())
+
+    def get_channel(self, channel_id: int) -> Optional[FakeTextChannel]:
+        for channel in self.channels:
+            if channel.id == channel_id:
+                return channel
+        return None
+
+    def get_member(self, user_id: int) -> Optional[FakeMember]:
+        return self._cached_members.get(user_id)
+
+    async def query_members(
+        self, query=None, *, limit=5, user_ids=None, presences=False, cache=True
+    ) -> List[FakeMember]:
+        """Same as discord.Guild.query_members with user_ids, the gateway request is counted as a request"""
+        if not self.members_intent:
+            raise discord.ClientException("Intents.members must be enabled to use this.")
+        if user_ids is None or len(user_ids) > 100:
+            raise ValueError("user_ids must contain 1 to 100 values")
+        await self.runtime.request("query_members")
+        members = [self._members[i] for i in user_ids if i in self._members][:limit]
+        if cache:
+            self._cached_members.update((member.id, member) for member in members)
+        return members
+
+    async def fetch_member(self, user_id: int) -> FakeMember:
+        await self.runtime.request("fetch_member")
+        member = self._members.get(user_id)
+        if member is None:
+            raise make_not_found("Unknown Member")
+        return member
+
+    @property
+    def fetch_count(self) -> int:
+        return sum(channel.fetch_count for channel in self.channels)
+
+
+class FakeBot:
+    """Bot with guilds, pass it to the cogs"""
+
+    def __init__(
+        self,
+        guilds: Iterable[FakeGuild] = (),
+        runtime: Optional[FakeRuntime] = None,
+        users: Iterable[FakeMember] = (),
+    ):
+        """__init__
+
+        :param guilds: guilds of the bot
+        :type guilds: Iterable[FakeGuild]
+        :param runtime: simulated API, get_default_runtime() if omitted
+        :type runtime: Optional[FakeRuntime]
+        :param users: users that can be fetched but are not in the gateway cache
+        :type users: Iterable[FakeMember]
+        """
+        self.runtime = runtime if runtime is not None else get_default_runtime()
+        self.guilds = list(guilds)
+        self.user = FakeMember(0, bot=True, name="bot")
+        self._users = {user.id: user for user in users}
+
+    def get_guild(self, guild_id: int) -> Optional[FakeGuild]:
+        for guild in self.guilds:
+            if guild.id == guild_id:
+                return guild
+        return None
+
+    def get_user(self, user_id: int) -> Optional[FakeMember]:
+        for guild in self.guilds:
+            member = guild.get_member(user_id)
+            if member is not None:
+                return member
+        return None
+
+    async def fetch_user(self, user_id: int) -> FakeMember:
+        await self.runtime.request("fetch_user")
+        user = self._users.get(user_id)
+        for guild in self.guilds:
+            if user is None:
+                user = guild._members.get(user_id)
+        if user is None:
+            raise make_not_found("Unknown User")
+        return user
+
+
+class FakeCommand:
+    def __init__(self, name: str):
+        self.name = name
+        self.qualified_name = name
+
+    def __str__(self):
+        return self.qualified_name
+
+
+class FakeTyping:
+    def __init__(self, ctx: "FakeContext"):
+        self._ctx = ctx
+
+    async def __aenter__(self):
+        self._ctx.typing_count += 1
+        await self._ctx.runtime.request("typing")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class FakeContext:
+    """Context of a command invocation, sent messages are recorded in sent"""
+
+    def __init__(
+        self,
+        command: str = "command",
+        content: str = "!command",
+        guild: Optional[FakeGuild] = None,
+        channel: Optional[FakeTextChannel] = None,
+        author: Optional[FakeMember] = None,
+        send_latency: Optional[float] = None,
+        message_id: int = 1,
+        bot: Optional[FakeBot] = None,
+    ):
+        """__init__
+
+        :param command: name of the command
+        :type command: str
+        :param content: content of the invoking message
+        :type content: str
+        :param guild: guild of the invocation, a guild without channels if omitted
+        :type guild: Optional[FakeGuild]
+        :param channel: channel of the invocation
+        :type channel: Optional[FakeTextChannel]
+        :param author: author of the invocation
+        :type author: Optional[FakeMember]
+        :param send_latency: seconds of a send, the latency of the runtime if omitted
+        :type send_latency: Optional[float]
+        :param message_id: ID of the invoking message
+        :type message_id: int
+        :param bot: bot of the invocation
+        :type bot: Optional[FakeBot]
+        """
+        self.command = FakeCommand(command)
+        self.guild = guild if guild is not None else FakeGuild(1, [])
+        self.channel = channel if channel is not None else FakeTextChannel(10)
+        self.author = author if author is not None else FakeMember(100)
+        self.bot = bot
+        self.runtime = self.channel.runtime
+        self.message = FakeMessage(message_id, content, self.author)
+        self.message.channel = self.channel
+        self.message.guild = self.guild
+        self.send_latency = send_latency
+        self.sent: List[Dict[str, Any]] = []
+        self.typing_count = 0
+
+    def typing(self) -> FakeTyping:
+        return FakeTyping(self)
+
+    async def send(self, content=None, **kwargs):
+        await self.runtime.request("send", self.send_latency)
+        self.sent.append(dict(content=content, **kwargs))
+
+
+def make_guild(
+    guild_id: int,
+    channels: int = 5,
+    messages: int = 10,
+    runtime: Optional[FakeRuntime] = None,
+    created_at: datetime.datetime = datetime.datetime(2020, 1, 1),
+) -> FakeGuild:
+    """Create a guild whose IDs are snowflakes ordered by time
+
+    The channels are created at created_at and the messages follow a minute apart, channel by channel.
+
+    :param guild_id: index of the guild, added to the snowflakes so that guilds do not share IDs
+    :type guild_id: int
+    :param channels: number of text channels
+    :type channels: int
+    :param messages: number of messages per channel
+    :type messages: int
+    :param runtime: simulated API, get_default_runtime() if omitted
+    :type runtime: Optional[FakeRuntime]
+    :param created_at: creation time of the guild in UTC naive
+    :type created_at: datetime.datetime
+    :rtype: FakeGuild
+    """
+
+    def snowflake(minutes: int, index: int) -> int:
+        at = created_at + datetime.timedelta(minutes=minutes)
+        return discord.utils.time_snowflake(at) + guild_id * 4096 + index
+
+    text_channels = []
+    for c in range(channels):
+        channel = FakeTextChannel(snowflake(0, c + 1), runtime=runtime)
+        for m in range(messages):
+            channel.add_message(
+                FakeMessage(snowflake(1 + c * messages + m, 0), f"message {m}")
+            )
+        text_channels.append(channel)
+    return FakeGuild(snowflake(0, 0), text_channels, runtime=runtime)
+
+
+class LoadReport:
+    """Result of run_load"""
+
+    def __init__(
+        self,
+        latencies: List[float],
+        calls: List[Counter[str]],
+        failures: int,
+        error_replies: int,
+        duration: float,
+        rate_limited: int,
+    ):
+        self.executions = len(latencies)
+        self.failures = failures
+        self.error_replies = error_replies
+        self.duration = duration
+        self.rate_limited = rate_limited
+        self._latencies = sorted(latencies)
+        self._calls = calls
+
+    @property
+    def throughput(self) -> float:
+        """Executions per second
+
+        :rtype: float
+        """
+        return self.executions / self.duration if self.duration else 0.0
+
+    def latency(self, percentile: float) -> float:
+        """Seconds of an execution at the percentile
+
+        :param percentile: such as 50, 90 or 99
+        :type percentile: float
+        :rtype: float
+        """
+        return _percentile(self._latencies, percentile) if self._latencies else 0.0
+
+    @property
+    def http_calls(self) -> Counter[str]:
+        """Number of requests per route
+
+        :rtype: Counter[str]
+        """
+        total: Counter[str] = collections.Counter()
+        for calls in self._calls:
+            total.update(calls)
+        return total
+
+    @property
+    def http_calls_per_command(self) -> float:
+        """Average number of requests per execution
+
+        :rtype: float
+        """
+        if not self._calls:
+            return 0.0
+        return sum(sum(calls.values()) for calls in self._calls) / len(self._calls)
+
+    @property
+    def max_http_calls(self) -> int:
+        """Maximum number of requests of an execution
+
+        :rtype: int
+        """
+        return max((sum(calls.values()) for calls in self._calls), default=0)
+
+    def to_dict(self) -> Dict[str, object]:
+        """Convert to a JSON compatible dict
+
+        :rtype: Dict[str, object]
+        """
+        return {
+            "executions": self.executions,
+            "failures": self.failures,
+            "error_replies": self.error_replies,
+            "duration": self.duration,
+            "throughput": self.throughput,
+            "latency": {p: self.latency(p) for p in (50, 90, 99)},
+            "http_calls": dict(self.http_calls),
+            "http_calls_per_command": self.http_calls_per_command,
+            "max_http_calls": self.max_http_calls,
+            "rate_limited": self.rate_limited,
+        }
+
+
+async def run_load(
+    cog,
+    guilds: Sequence[FakeGuild],
+    executions: int,
+    args: Callable[[int, FakeGuild], Tuple[str, ...]] = lambda index, guild: (),
+    command: str = "command",
+    concurrency: Optional[int] = None,
+    users: int = 10,
+) -> LoadReport:
+    """Fire concurrent executions of a cog across guilds and measure them
+
+    Executions are assigned to the guilds in round-robin, each in the first channel of its guild by one of users.
+    Requests to the runtimes are counted per execution.
+
+    :param cog: CogHelper instance
+    :type cog: CogHelper
+    :param guilds: guilds to execute in
+    :type guilds: Sequence[FakeGuild]
+    :param executions: number of executions
+    :type executions: int
+    :param args: returns the arguments of the execution from its index and guild
+    :type args: Callable[[int, FakeGuild], Tuple[str, ...]]
+    :param command: name of the command
+    :type command: str
+    :param concurrency: maximum number of running executions, None starts all at once
+    :type concurrency: Optional[int]
+    :param users: number of distinct authors
+    :type users: int
+    :rtype: LoadReport
+    """
+    semaphore = asyncio.Semaphore(concurrency) if concurrency else None
+    runtimes = {id(guild.runtime): guild.runtime for guild in guilds}
+    rate_limited = sum(runtime.rate_limited for runtime in runtimes.values())
+    latencies: List[float] = []
+    calls: List[Counter[str]] = []
+    failures = 0
+    error_replies = 0
+
+    async def execute(index: int):
+        nonlocal failures, error_replies
+        guild = guilds[index % len(guilds)]
+        channel = guild.channels[0] if guild.channels else None
+        ctx = FakeContext(
+            command=command,
+            content=f"!{command}",
+            guild=guild,
+            channel=channel,
+            author=FakeMember(1000 + index % users),
+            message_id=index + 1,
+        )
+        counter: Counter[str] = collections.Counter()
+        _execution_calls.set(counter)
+        if semaphore is not None:
+            await semaphore.acquire()
+        started_at = time.perf_counter()
+        try:
+            await cog.execute(ctx, args(index, guild))
+        except Exception:
+            failures += 1
+        finally:
+            latencies.append(time.perf_counter() - started_at)
+            if semaphore is not None:
+                semaphore.release()
+        calls.append(counter)
+        error_replies += sum(
+            1
+            for sent in ctx.sent
+            if sent.get("embed") is not None and str(sent["embed"].title).startswith("⚠️")
+        )
+
+    started_at = time.perf_counter()
+    # each execution runs in its own task so that its context variables are isolated
+    await asyncio.gather(
+        *(asyncio.ensure_future(execute(index)) for index in range(executions))
+    )
+    duration = time.perf_counter() - started_at
+    rate_limited = sum(r.rate_limited for r in runtimes.values()) - rate_limited
+    return LoadReport(latencies, calls, failures, error_replies, duration, rate_limited)
@@ -0,0 +1,93 @@
+import functools
+import re
+from typing import Dict, Tuple, Any, Optional
+
+# key=value, key="quoted value", key='quoted value' or a bare flag.
+# The key never contains "=", so "a=b=c" is split at the first "=" into a / b=c.
+_ARG_PATTERN = re.compile(r"([^=]*)=(.*)", re.DOTALL)
+_QUOTES = ('"', "'")
+
+FLAG_VALUE = "True"
+DEFAULT_CACHE_SIZE = 1024
+
+
+def tokenize_arg(arg: str) -> Tuple[str, str]:
+    """Split a single command argument into a key/value pair
+
+    ``key=value`` is split at the first ``=``, a value surrounded by matching quotes is unquoted and an argument
+    without ``=`` is treated as a flag whose value is ``"True"``.
+
+    :param arg: raw argument string
+    :type arg: str
+    :return: key and value
+    :rtype: Tuple[str, str]
+    """
+    result = _ARG_PATTERN.fullmatch(arg)
+    if result is None:
+        return arg, FLAG_VALUE
+    key, value = result.groups()
+    if len(value) >= 2 and value[0] in _QUOTES and value[-1] == value[0]:
+        value = value[1:-1]
+    return key, value
+
+
+def _tokenize(args: Tuple[Any, ...]) -> Dict[str, str]:
+    parsed: Dict[str, str] = {}
+    for arg in args:
+        if not isinstance(arg, str):
+            continue
+        key, value = tokenize_arg(arg)
+        parsed[key] = value
+    return parsed
+
+
+_tokenize_cached = functools.lru_cache(maxsize=DEFAULT_CACHE_SIZE)(_tokenize)
+
+
+def tokenize_args(args: Tuple[Any, ...]) -> Dict[str, str]:
+    """Convert command arguments to Dict[str, str]
+
+    Results are memoized by the raw argument tuple, so repeated invocations with the same arguments are not
+    tokenized again. Arguments that are not str are ignored.
+
+    :param args: arguments from discord.py command
+    :type args: Tuple[Any, ...]
+    :return: parsed arguments
+    :rtype: Dict[str, str]
+    """
+    try:
+        parsed = _tokenize_cached(args)
+    except TypeError:
+        # unhashable arguments cannot be memoized
+        return _tokenize(args)
+    return dict(parsed)
+
+
+def configure_tokenizer_cache(maxsize: Optional[int] = DEFAULT_CACHE_SIZE) -> None:
+    """Change the size of the tokenize_args cache
+
+    :param maxsize: maximum number of cached argument tuples, 0 disables caching and None makes it unbounded
+    :type maxsize: Optional[int]
+    :return: None
+    :rtype: None
+    """
+    global _tokenize_cached
+    _tokenize_cached = functools.lru_cache(maxsize=maxsize)(_tokenize)
+
+
+def tokenizer_cache_info():
+    """Statistics of the tokenize_args cache
+
+    :return: hits, misses, maxsize and currsize
+    :rtype: functools._CacheInfo
+    """
+    return _tokenize_cached.cache_info()
+
+
+def clear_tokenizer_cache() -> None:
+    """Clear the tokenize_args cache
+
+    :return: None
+    :rtype: None
+    """
+    _tokenize_cached.cache_clear()
@@ -1,4 +1,80 @@
-from .contant import *
-from .misc import *
-from .dict import *
-from .discord import *
+import importlib
+
+# submodules are imported on the first access of their names, see discord_ext_commands_coghelper.__init__
+_SUBMODULES = {
+    "strptime": ("FormatStats", "DatetimeParser", "get_datetime_parser"),
+    "contant": ("ConstantError", "ConstantMeta", "Constant"),
+    "misc": (
+        "to_utc_naive",
+        "try_strptime",
+        "try_strftime",
+        "try_strptime_many",
+        "try_strftime_many",
+    ),
+    "dict": (
+        "get_bool",
+        "get_list",
+        "get_datetime",
+        "get_datetime_fmts",
+        "get_choice",
+        "choices_str",
+    ),
+    "location": (
+        "LocationCache",
+        "MemoryLocationCache",
+        "SqliteLocationCache",
+        "get_default_location_cache",
+        "set_default_location_cache",
+    ),
+    "users": ("UserCache", "get_default_user_cache", "set_default_user_cache"),
+    "snowflake": (
+        "DISCORD_EPOCH",
+        "TIMESTAMP_SHIFT",
+        "snowflake_time_ms",
+        "time_to_snowflake",
+        "get_snowflake_bounds",
+        "filter_snowflakes",
+        "ChannelSearchStats",
+        "get_channel_search_stats",
+    ),
+    "discord": (
+        "find_text_channel",
+        "find_text_channels",
+        "resolve_users",
+        "get_before_after",
+        "get_before_after_fmts",
+        "get_corrected_before_after_str",
+        "get_corrected_before_after_str_many",
+    ),
+    "history": ("PageCallback", "scan_history", "aggregate_history"),
+    "checkpoint": (
+        "Checkpoint",
+        "CheckpointStore",
+        "MemoryCheckpointStore",
+        "SqliteCheckpointStore",
+        "IncrementalAggregator",
+    ),
+}
+_ATTRIBUTES = {
+    name: module for module, names in _SUBMODULES.items() for name in names
+}
+
+# submodules are also attributes of the package as they were before the lazy import
+_MODULES = frozenset(_SUBMODULES) | frozenset(("sqlite",))
+
+__all__ = list(_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module = _ATTRIBUTES.get(name)
+    if module is None:
+        if name in _MODULES:
+            return importlib.import_module(f"{__name__}.{name}")
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | _MODULES)
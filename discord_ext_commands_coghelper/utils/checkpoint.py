@@ -0,0 +1,340 @@
+import asyncio
+import datetime
+import json
+import sqlite3
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import discord
+
+from discord_ext_commands_coghelper.utils.history import (
+    as_channels,
+    run_all,
+    scan_channel,
+    to_history_bound,
+)
+from discord_ext_commands_coghelper.utils.sqlite import SqliteWriteBuffer
+
+
+class Checkpoint:
+    """Position and partial aggregate of a channel scanned by IncrementalAggregator"""
+
+    __slots__ = ("last_message_id", "state", "updated_at")
+
+    def __init__(self, last_message_id: int, state: Any, updated_at: float):
+        """__init__
+
+        :param last_message_id: ID of the newest scanned message
+        :type last_message_id: int
+        :param state: partial aggregate of the messages up to last_message_id, must be JSON serializable
+        :type state: Any
+        :param updated_at: UNIX time when the checkpoint was stored
+        :type updated_at: float
+        """
+        self.last_message_id = last_message_id
+        self.state = state
+        self.updated_at = updated_at
+
+    @property
+    def last_message_at(self) -> datetime.datetime:
+        """Creation time of the newest scanned message in UTC naive
+
+        :rtype: datetime.datetime
+        """
+        return discord.utils.snowflake_time(self.last_message_id)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, Checkpoint)
+            and self.last_message_id == other.last_message_id
+            and self.state == other.state
+        )
+
+    def __repr__(self):
+        return f"Checkpoint(last_message_id={self.last_message_id}, state={self.state!r})"
+
+
+class CheckpointStore:
+    """Storage of checkpoints per (key, channel_id)
+
+    The key identifies the aggregation, such as the command and the fixed arguments of the report.
+
+    This class stores nothing, inherit it to implement a backend.
+    """
+
+    def get(self, key: str, channel_id: int) -> Optional[Checkpoint]:
+        """Get the checkpoint of a channel
+
+        :param key: aggregation key
+        :type key: str
+        :param channel_id: Channel ID
+        :type channel_id: int
+        :return: checkpoint or None if the channel was never scanned
+        :rtype: Optional[Checkpoint]
+        """
+        return None
+
+    def set(self, key: str, channel_id: int, checkpoint: Checkpoint) -> None:
+        """Store the checkpoint of a channel
+
+        :param key: aggregation key
+        :type key: str
+        :param channel_id: Channel ID
+        :type channel_id: int
+        :param checkpoint: checkpoint to store
+        :type checkpoint: Checkpoint
+        :return: None
+        :rtype: None
+        """
+
+    def delete(self, key: str, channel_id: Optional[int] = None) -> None:
+        """Remove checkpoints so that the next scan starts over
+
+        :param key: aggregation key
+        :type key: str
+        :param channel_id: if specified, only the channel is removed
+        :type channel_id: Optional[int]
+        :return: None
+        :rtype: None
+        """
+
+
+class MemoryCheckpointStore(CheckpointStore):
+    """CheckpointStore in memory, lost when the process exits"""
+
+    def __init__(self):
+        self._checkpoints: Dict[Tuple[str, int], Tuple[int, str, float]] = {}
+
+    def __len__(self):
+        return len(self._checkpoints)
+
+    def get(self, key: str, channel_id: int) -> Optional[Checkpoint]:
+        entry = self._checkpoints.get((key, channel_id))
+        if entry is None:
+            return None
+        last_message_id, state, updated_at = entry
+        # states are kept serialized so that callers cannot modify them in place
+        return Checkpoint(last_message_id, json.loads(state), updated_at)
+
+    def set(self, key: str, channel_id: int, checkpoint: Checkpoint) -> None:
+        self._checkpoints[(key, channel_id)] = (
+            checkpoint.last_message_id,
+            json.dumps(checkpoint.state),
+            checkpoint.updated_at,
+        )
+
+    def delete(self, key: str, channel_id: Optional[int] = None) -> None:
+        for entry_key in list(self._checkpoints):
+            if entry_key[0] == key and channel_id in (None, entry_key[1]):
+                del self._checkpoints[entry_key]
+
+
+class SqliteCheckpointStore(CheckpointStore):
+    """CheckpointStore persisted in a SQLite database
+
+    Checkpoints are buffered and committed in batches by a background thread while an event loop is running, so that
+    a scan does not wait for the disk after every page. A channel updated many times before the commit is written
+    once. Reads see the buffered checkpoints.
+    """
+
+    def __init__(self, path: str):
+        """__init__
+
+        :param path: path of the database file, ":memory:" is also available
+        :type path: str
+        """
+        self._buffer = SqliteWriteBuffer(
+            path,
+            (
+                "CREATE TABLE IF NOT EXISTS channel_checkpoints ("
+                "key TEXT NOT NULL, channel_id INTEGER NOT NULL, last_message_id INTEGER NOT NULL, "
+                "state TEXT NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (key, channel_id))",
+            ),
+            _apply_checkpoint_writes,
+        )
+
+    def close(self) -> None:
+        """Commit the buffered checkpoints and close the database
+
+        :return: None
+        :rtype: None
+        """
+        self._buffer.close()
+
+    def flush(self) -> None:
+        """Commit the buffered checkpoints at once
+
+        :return: None
+        :rtype: None
+        """
+        self._buffer.flush()
+
+    def get(self, key: str, channel_id: int) -> Optional[Checkpoint]:
+        found, row = self._buffer.buffered((key, channel_id))
+        if not found:
+            row = self._buffer.fetchone(
+                "SELECT key, channel_id, last_message_id, state, updated_at FROM channel_checkpoints "
+                "WHERE key = ? AND channel_id = ?",
+                (key, channel_id),
+            )
+        if row is None:
+            return None
+        return Checkpoint(row[2], json.loads(row[3]), row[4])
+
+    def set(self, key: str, channel_id: int, checkpoint: Checkpoint) -> None:
+        self._buffer.write(
+            (key, channel_id),
+            (
+                key,
+                channel_id,
+                checkpoint.last_message_id,
+                json.dumps(checkpoint.state),
+                checkpoint.updated_at,
+            ),
+        )
+
+    def delete(self, key: str, channel_id: Optional[int] = None) -> None:
+        if channel_id is not None:
+            self._buffer.write((key, channel_id), None)
+            return
+        self._buffer.execute(
+            "DELETE FROM channel_checkpoints WHERE key = ?",
+            (key,),
+            lambda buffered_key: buffered_key[0] == key,
+        )
+
+
+def _apply_checkpoint_writes(
+    connection: sqlite3.Connection, writes: Dict[Tuple[str, int], Optional[tuple]]
+) -> None:
+    for (key, channel_id), row in writes.items():
+        if row is None:
+            connection.execute(
+                "DELETE FROM channel_checkpoints WHERE key = ? AND channel_id = ?",
+                (key, channel_id),
+            )
+        else:
+            connection.execute(
+                "INSERT OR REPLACE INTO channel_checkpoints VALUES (?, ?, ?, ?, ?)", row
+            )
+
+
+class IncrementalAggregator:
+    """Aggregates channel histories scanning only the messages newer than the previous run
+
+    reduce(state, messages) folds a page of messages into the partial aggregate of a channel and returns it. The
+    partial aggregates and the newest scanned message are stored in the CheckpointStore after every page, so an
+    interrupted scan resumes from the last stored page. Edited and deleted messages already scanned are not reflected,
+    delete the checkpoints to rescan them.
+    """
+
+    def __init__(
+        self,
+        store: CheckpointStore,
+        key: str,
+        initial: Callable[[], Any],
+        reduce: Callable[[Any, List[discord.Message]], Any],
+    ):
+        """__init__
+
+        :param store: storage of the checkpoints
+        :type store: CheckpointStore
+        :param key: aggregation key, include the arguments that change the result such as after
+        :type key: str
+        :param initial: returns the aggregate of no messages
+        :type initial: Callable[[], Any]
+        :param reduce: folds a page of messages oldest first into the aggregate, the result must be JSON serializable
+        :type reduce: Callable[[Any, List[discord.Message]], Any]
+        """
+        self._store = store
+        self._key = key
+        self._initial = initial
+        self._reduce = reduce
+
+    @property
+    def key(self) -> str:
+        """Aggregation key
+
+        :rtype: str
+        """
+        return self._key
+
+    def checkpoint(self, channel: discord.abc.Snowflake) -> Optional[Checkpoint]:
+        """Get the stored checkpoint of a channel
+
+        :param channel: scanned channel
+        :type channel: discord.abc.Snowflake
+        :rtype: Optional[Checkpoint]
+        """
+        return self._store.get(self._key, channel.id)
+
+    def reset(self, channel: Optional[discord.abc.Snowflake] = None) -> None:
+        """Remove the checkpoints so that the next run scans the whole history
+
+        :param channel: if specified, only the channel is reset
+        :type channel: Optional[discord.abc.Snowflake]
+        :return: None
+        :rtype: None
+        """
+        self._store.delete(self._key, None if channel is None else channel.id)
+
+    async def aggregate(
+        self,
+        channels: Union[discord.abc.Messageable, Iterable[discord.abc.Messageable]],
+        after: Union[datetime.datetime, discord.abc.Snowflake] = None,
+        *,
+        concurrency: int = 4,
+        page_size: int = 100,
+        ignore_forbidden: bool = True,
+    ) -> Dict[int, Any]:
+        """Scan the messages newer than the checkpoints and merge them into the partial aggregates
+
+        :param channels: channel or channels to aggregate
+        :type channels: Union[discord.abc.Messageable, Iterable[discord.abc.Messageable]]
+        :param after: start of the first scan of a channel, None scans from the creation of the channel
+        :type after: Union[datetime.datetime, discord.abc.Snowflake]
+        :param concurrency: maximum number of channels fetched at the same time
+        :type concurrency: int
+        :param page_size: number of messages reduced and stored together
+        :type page_size: int
+        :param ignore_forbidden: skip channels that cannot be read
+        :type ignore_forbidden: bool
+        :return: aggregate of each channel by Channel ID
+        :rtype: Dict[int, Any]
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        states: Dict[int, Any] = {}
+        scans = []
+        for channel in as_channels(channels):
+            checkpoint = self._store.get(self._key, channel.id)
+            if checkpoint is None:
+                states[channel.id] = self._initial()
+                lower = after
+            else:
+                states[channel.id] = checkpoint.state
+                lower = discord.Object(checkpoint.last_message_id)
+            scans.append(
+                scan_channel(
+                    channel,
+                    None,
+                    to_history_bound(lower),
+                    True,
+                    page_size,
+                    ignore_forbidden,
+                    semaphore,
+                    self._on_page(states),
+                )
+            )
+        await run_all(scans)
+        return states
+
+    def _on_page(self, states: Dict[int, Any]):
+        async def on_page(channel, messages):
+            state = self._reduce(states[channel.id], messages)
+            states[channel.id] = state
+            last_message_id = max(message.id for message in messages)
+            self._store.set(
+                self._key, channel.id, Checkpoint(last_message_id, state, time.time())
+            )
+
+        return on_page
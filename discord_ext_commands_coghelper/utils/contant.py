@@ -1,4 +1,7 @@
 # https://qiita.com/nadu_festival/items/c507542c11fc0ff32529
+from types import MappingProxyType
+
+
 class ConstantError(Exception):
     """Constantクラスの例外"""
 
@@ -18,9 +21,12 @@ class ConstantMeta(type):
                 )
 
         # 親クラス同士で定数の衝突が起こっていないか確認
+        # ConstantMetaの親クラスは作成時に求めた定数の集合を再利用する
         super_consts = set()
         for base in bases:
-            base_consts = ConstantMeta.__get_constant_attr(mcs, base.__dict__)
+            base_consts = base.__dict__.get("__own_constants__")
+            if base_consts is None:
+                base_consts = ConstantMeta.__get_constant_attr(mcs, base.__dict__)
             collisions = super_consts & base_consts
             if collisions:
                 collies_str = ", ".join(collisions)
@@ -34,6 +40,15 @@ class ConstantMeta(type):
             rebinds_str = ", ".join(rebinds)
             raise ConstantError(f"Can't rebind constant [{rebinds_str}]")
 
+        # 名前と値の索引をクラス作成時に一度だけ作成する
+        constants = {}
+        for base in reversed(bases):
+            constants.update(base.__dict__.get("__constants__", {}))
+        constants.update((name, dic[name]) for name in dic if name in new_consts)
+        dic["__own_constants__"] = frozenset(new_consts)
+        dic["__constants__"] = MappingProxyType(constants)
+        dic["__constant_index__"] = ConstantMeta.__build_index(constants)
+
         # __init__関数置き換えてインスタンス生成を禁止する
         def _meta__init__(self, *args, **kwargs):
             # インスタンスの生成をしようとした際、ConstantErrorを送出する。
@@ -61,6 +76,41 @@ class ConstantMeta(type):
             )
         return const_atr
 
+    @staticmethod
+    def __build_index(constants):
+        """定数を引く索引を作成する
+
+        値、名前、大文字小文字を区別しない名前と値、前方一致の順に引く
+        """
+        names_by_value = {}
+        for name, value in constants.items():
+            try:
+                names_by_value.setdefault(value, name)
+            except TypeError:
+                # ハッシュ化できない値は名前でのみ引ける
+                continue
+        by_folded = {}
+        for value in constants.values():
+            if isinstance(value, str):
+                by_folded.setdefault(value.casefold(), value)
+        for name, value in constants.items():
+            by_folded.setdefault(name.casefold(), value)
+        # 異なる定数に一致する前方一致は曖昧なので除く
+        by_prefix = {}
+        ambiguous = set()
+        for key, value in by_folded.items():
+            for i in range(1, len(key) + 1):
+                prefix = key[:i]
+                other = by_prefix.setdefault(prefix, value)
+                if other is not value and other != value:
+                    ambiguous.add(prefix)
+        for prefix in ambiguous:
+            del by_prefix[prefix]
+        return tuple(
+            MappingProxyType(index)
+            for index in (names_by_value, by_folded, by_prefix)
+        )
+
     @staticmethod
     def __is_special_func(name):
         """特殊アトリビュートかどうかを判定する"""
@@ -76,6 +126,42 @@ class ConstantMeta(type):
         """例外的にクラス変数に格納することを許可するアトリビュートか判定する"""
         return not mcs.is_constant_attr(name)
 
+    def constants(cls):
+        """定数の名前と値の読み取り専用の辞書を取得する"""
+        return cls.__constants__
+
+    def choices(cls):
+        """選択肢として表示する定数の値の一覧を取得する"""
+        return tuple(str(value) for value in cls.__constants__.values())
+
+    def name_of(cls, value):
+        """値から定数の名前を取得する、存在しない場合はNoneを返す"""
+        try:
+            return cls.__constant_index__[0].get(value)
+        except TypeError:
+            return None
+
+    def find(cls, text, default=None):
+        """文字列に一致する定数の値を取得する
+
+        値、名前、大文字小文字を区別しない値と名前、一意な前方一致の順に探し、
+        見つからない場合はdefaultを返す
+        """
+        names_by_value, by_folded, by_prefix = cls.__constant_index__
+        constants = cls.__constants__
+        try:
+            return constants[names_by_value[text]]
+        except (KeyError, TypeError):
+            pass
+        if not isinstance(text, str) or not text:
+            return default
+        if text in constants:
+            return constants[text]
+        folded = text.casefold()
+        if folded in by_folded:
+            return by_folded[folded]
+        return by_prefix.get(folded, default)
+
     def __setattr__(cls, name, value):
         mcs = type(cls)
         if mcs.is_constant_attr(name) or (not mcs.is_settable_attr(name)):
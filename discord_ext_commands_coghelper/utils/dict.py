@@ -1,7 +1,8 @@
 import datetime
-from typing import Dict, Callable, List, Any
+from typing import Dict, Callable, List, Any, Type
 
 from discord_ext_commands_coghelper.utils import try_strptime
+from discord_ext_commands_coghelper.utils.contant import Constant
 
 
 def get_bool(dic: Dict[str, str], key: str, default: bool = False) -> bool:
@@ -90,3 +91,51 @@ def get_datetime_fmts(
     if key not in dic:
         return default
     return try_strptime(dic[key], *fmts, default=default)
+
+
+def get_choice(
+    ctx, dic: Dict[str, str], key: str, choices: Type[Constant], default: Any = None
+) -> Any:
+    """Get a value of a Constant class from Dict[str, str]
+
+    The value is looked up by the indexes of the Constant class, see ConstantMeta.find.
+
+    :param ctx: context in which the command was executed
+    :type ctx: discord.ext.commands.context.Context
+    :param dic: target dict value
+    :type dic: typing.Dict[str, str]
+    :param key: key to get the value
+    :type key: str
+    :param choices: Constant class whose values are the choices
+    :type choices: Type[Constant]
+    :param default: default value if key does not exist
+    :type default: Any
+    :return: value of the constant
+    :rtype: Any
+    :raises ArgumentError: if the value matches no choice, the choices are listed
+    """
+    if key not in dic:
+        return default
+    value = choices.find(dic[key], _NOT_FOUND)
+    if value is _NOT_FOUND:
+        # imported here so that utils.dict does not import discord.py
+        from discord_ext_commands_coghelper.errors import ArgumentError
+
+        raise ArgumentError(
+            ctx, **{key: f"{dic[key]} is invalid. ({choices_str(choices)})"}
+        )
+    return value
+
+
+def choices_str(choices: Type[Constant]) -> str:
+    """Format the choices of a Constant class for an error message
+
+    :param choices: Constant class whose values are the choices
+    :type choices: Type[Constant]
+    :return: such as "choices: never, always, delayed"
+    :rtype: str
+    """
+    return f"choices: {', '.join(choices.choices())}"
+
+
+_NOT_FOUND = object()
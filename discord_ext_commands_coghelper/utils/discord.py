@@ -1,41 +1,470 @@
+import asyncio
 import datetime
-from typing import Union, Dict, Optional
+from typing import Any, Awaitable, Callable, Union, Dict, Optional, Iterable, Tuple, List, Set
 
 import discord
 from discord.ext.commands import Context
 
-from discord_ext_commands_coghelper import ArgumentError
+from discord_ext_commands_coghelper import ArgumentError, UserNotFoundError
 from discord_ext_commands_coghelper.utils import (
     try_strftime,
+    try_strftime_many,
     get_datetime,
     get_datetime_fmts,
 )
+from discord_ext_commands_coghelper.utils.history import run_all
+from discord_ext_commands_coghelper.utils.location import (
+    LocationCache,
+    get_default_location_cache,
+)
+from discord_ext_commands_coghelper.utils.users import (
+    UserCache,
+    get_default_user_cache,
+)
+from discord_ext_commands_coghelper.utils.snowflake import (
+    TIMESTAMP_SHIFT,
+    get_channel_search_stats,
+)
+
+
+# maximum limit of history with around
+_AROUND_LIMIT = 101
+# maximum number of user IDs in a request of guild members
+_MEMBER_QUERY_LIMIT = 100
 
 
 async def find_text_channel(
-    guild: discord.Guild, message_id: int
+    guild: discord.Guild,
+    message_id: int,
+    *,
+    concurrency: int = 1,
+    hint: Optional[discord.abc.GuildChannel] = None,
+    cache: Optional[LocationCache] = None,
 ) -> (Optional[discord.TextChannel], Optional[discord.Message]):
     """find TextChannel from Message ID
 
+    The channel stored in the cache is probed first. Otherwise channels created after the message or whose last
+    message is older than the message are skipped without HTTP requests, and the rest are probed from the hint channel
+    and then in order of how close their last activity is to the message. If concurrency is greater than 1, up to
+    that number of channels are probed at the same time and the rest are cancelled when one is found. The result is
+    stored in the cache, including not found unless a channel could not be read with Forbidden.
+
     :param guild: that has the Channel you want to find
     :type guild: Guild
     :param message_id: Message ID to look for
     :type message_id: int
+    :param concurrency: maximum number of channels probed at the same time
+    :type concurrency: int
+    :param hint: channel that most likely has the message, such as the channel of the context
+    :type hint: discord.abc.GuildChannel
+    :param cache: location cache, get_default_location_cache() is used if omitted
+    :type cache: LocationCache
     :return: TexChannel and Message instances
     :rtype: Tuple[TexChannel, Message]
     """
+    stats = get_channel_search_stats()
+    stats.searches += 1
+    if cache is None:
+        cache = get_default_location_cache()
+
+    channel_id = cache.get(message_id)
+    if channel_id is not None:
+        channel = guild.get_channel(channel_id)
+        if isinstance(channel, discord.TextChannel):
+            result = await _probe_channel(channel, message_id, set())
+            if result is not None:
+                stats.cache_hits += 1
+                return result
+            cache.discard(message_id)
+
+    if cache.is_missing(guild.id, message_id):
+        stats.negative_cache_hits += 1
+        return None
+
+    channels = _candidate_channels(guild, message_id, hint)
+    denied: Set[int] = set()
+    if concurrency <= 1:
+        result = None
+        for channel in channels:
+            result = await _probe_channel(channel, message_id, denied)
+            if result is not None:
+                break
+    else:
+        result = await _probe_channels_concurrently(
+            channels, message_id, concurrency, denied
+        )
+
+    if result is None:
+        if not denied:
+            cache.set_missing(guild.id, message_id)
+        return None
+    cache.set(message_id, result[0].id)
+    return result
+
+
+async def find_text_channels(
+    guild: discord.Guild,
+    message_ids: Iterable[int],
+    *,
+    concurrency: int = 1,
+    hint: Optional[discord.abc.GuildChannel] = None,
+    cache: Optional[LocationCache] = None,
+) -> Dict[int, Optional[Tuple[discord.TextChannel, discord.Message]]]:
+    """find TextChannels of many Message IDs in one pass
+
+    Unlike calling find_text_channel per ID, each channel is probed once for all the IDs that are not resolved yet.
+    An ID alone is fetched, and several IDs are looked up by reading the history around one of them, which resolves or
+    rules out every ID in the range of the returned messages with one request. The IDs in the cache are probed in
+    their channels first, and channels are pruned per ID with snowflake timestamps as in find_text_channel. If
+    concurrency is greater than 1, up to that number of channels are probed at the same time, the cached ones too.
+    The results are stored in the cache, including not found unless a candidate channel could not be read with
+    Forbidden.
+
+    :param guild: that has the Channels you want to find
+    :type guild: Guild
+    :param message_ids: Message IDs to look for
+    :type message_ids: Iterable[int]
+    :param concurrency: maximum number of channels probed at the same time
+    :type concurrency: int
+    :param hint: channel that most likely has the messages, such as the channel of the context
+    :type hint: discord.abc.GuildChannel
+    :param cache: location cache, get_default_location_cache() is used if omitted
+    :type cache: LocationCache
+    :return: TextChannel and Message instances per Message ID in the given order, None if not found
+    :rtype: Dict[int, Optional[Tuple[TextChannel, Message]]]
+    """
+    stats = get_channel_search_stats()
+    if cache is None:
+        cache = get_default_location_cache()
+    results: Dict[int, Optional[Tuple[discord.TextChannel, discord.Message]]] = {
+        message_id: None for message_id in message_ids
+    }
+    stats.searches += len(results)
+
+    # probe the cached channels first, a stale entry falls back to the search
+    cached: Dict[int, Set[int]] = {}
+    for message_id in results:
+        channel_id = cache.get(message_id)
+        if channel_id is not None:
+            cached.setdefault(channel_id, set()).add(message_id)
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def probe(channel: discord.TextChannel, ids: Set[int], denied: Set[int]) -> None:
+        async with semaphore:
+            await _probe_channel_many(channel, ids, results, denied)
+
+    cached_channels = [
+        (guild.get_channel(channel_id), ids) for channel_id, ids in cached.items()
+    ]
+    await run_all(
+        probe(channel, set(ids), set())
+        for channel, ids in cached_channels
+        if isinstance(channel, discord.TextChannel)
+    )
+    for ids in cached.values():
+        for message_id in ids:
+            if results[message_id] is not None:
+                stats.cache_hits += 1
+            else:
+                cache.discard(message_id)
+
+    unresolved = set()
+    for message_id, result in results.items():
+        if result is not None:
+            continue
+        if cache.is_missing(guild.id, message_id):
+            stats.negative_cache_hits += 1
+            continue
+        unresolved.add(message_id)
+
+    if unresolved:
+        plan = _candidate_channels_many(guild, unresolved, hint)
+        denied: Set[int] = set()
+        await run_all(probe(channel, ids, denied) for channel, ids in plan)
+
+        for message_id in unresolved:
+            result = results[message_id]
+            if result is None:
+                if message_id not in denied:
+                    cache.set_missing(guild.id, message_id)
+            else:
+                cache.set(message_id, result[0].id)
+    return results
+
+
+async def resolve_users(
+    ctx: Context,
+    user_ids: Iterable[int],
+    *,
+    members: bool = True,
+    cache: Optional[UserCache] = None,
+    concurrency: int = 10,
+) -> Dict[int, Union[discord.Member, discord.User]]:
+    """Resolve many User IDs at once
+
+    The gateway cache of the bot is looked up first, then the cache of resolved users. The rest of the members are
+    requested up to 100 IDs per request with Guild.query_members, which falls back to fetch_member per ID when the
+    members can not be requested through the gateway. Users outside a guild are fetched with fetch_user. Up to
+    concurrency of fetch_member or fetch_user are requested at the same time. Users that were not found are cached for
+    a short time.
+
+    :param ctx: context in which the command was executed
+    :type ctx: discord.ext.commands.context.Context
+    :param user_ids: User IDs, such as the result of get_list(dic, key, ",", int)
+    :type user_ids: Iterable[int]
+    :param members: whether to resolve the members of ctx.guild, users are resolved if False or not in a guild
+    :type members: bool
+    :param cache: user cache, get_default_user_cache() is used if omitted
+    :type cache: UserCache
+    :param concurrency: maximum number of users fetched at the same time
+    :type concurrency: int
+    :return: Member or User instances per User ID in the given order
+    :rtype: Dict[int, Union[discord.Member, discord.User]]
+    :raises UserNotFoundError: listing all the User IDs that were not found
+    """
+    if cache is None:
+        cache = get_default_user_cache()
+    guild = ctx.guild if members else None
+    guild_id = guild.id if guild is not None else None
+    results: Dict[int, Optional[Union[discord.Member, discord.User]]] = {
+        user_id: None for user_id in user_ids
+    }
+
+    unresolved = []
+    missing = []
+    for user_id in results:
+        if guild is not None:
+            user = guild.get_member(user_id)
+        else:
+            user = ctx.bot.get_user(user_id)
+        if user is None:
+            user = cache.get(guild_id, user_id)
+        if user is not None:
+            results[user_id] = user
+        elif cache.is_missing(guild_id, user_id):
+            missing.append(user_id)
+        else:
+            unresolved.append(user_id)
+
+    if unresolved:
+        if guild is not None:
+            found = await _query_members(guild, unresolved, concurrency)
+        else:
+            found = {
+                user.id: user
+                for user in await _fetch_each(ctx.bot.fetch_user, unresolved, concurrency)
+            }
+        for user_id in unresolved:
+            user = found.get(user_id)
+            if user is None:
+                cache.set_missing(guild_id, user_id)
+                missing.append(user_id)
+            else:
+                cache.set(guild_id, user)
+                results[user_id] = user
+
+    if missing:
+        missing_set = set(missing)
+        raise UserNotFoundError(
+            ctx, ", ".join(str(i) for i in results if i in missing_set)
+        )
+    return results
+
+
+def _candidate_channels(
+    guild: discord.Guild,
+    message_id: int,
+    hint: Optional[discord.abc.GuildChannel],
+) -> List[discord.TextChannel]:
+    stats = get_channel_search_stats()
+    channels = []
+    hint_is_candidate = False
+    for channel in guild.channels:
+        if not isinstance(channel, discord.TextChannel):
+            continue
+        stats.channels += 1
+        stats.candidates += 1
+        if not _may_contain(channel, message_id):
+            stats.pruned += 1
+            continue
+        if channel == hint:
+            hint_is_candidate = True
+            continue
+        channels.append(channel)
+    channels.sort(
+        key=lambda c: (
+            c.last_message_id is None,
+            (c.last_message_id or 0) - message_id,
+        )
+    )
+    if hint_is_candidate:
+        channels.insert(0, hint)
+    return channels
+
+
+async def _probe_channel(
+    channel: discord.TextChannel, message_id: int, denied: Set[int]
+) -> Optional[Tuple[discord.TextChannel, discord.Message]]:
+    get_channel_search_stats().probes += 1
+    try:
+        message = await channel.fetch_message(message_id)
+    except discord.NotFound:
+        return None
+    except discord.Forbidden:
+        # the message may be in the channel, so not found must not be cached
+        denied.add(message_id)
+        return None
+    return channel, message
+
+
+def _may_contain(channel: discord.TextChannel, message_id: int) -> bool:
+    # snowflakes are ordered by time, the message must be between the creation and the last message
+    return not (
+        channel.id >> TIMESTAMP_SHIFT > message_id >> TIMESTAMP_SHIFT
+        or (
+            channel.last_message_id is not None
+            and channel.last_message_id < message_id
+        )
+    )
+
+
+def _candidate_channels_many(
+    guild: discord.Guild,
+    message_ids: Set[int],
+    hint: Optional[discord.abc.GuildChannel],
+) -> List[Tuple[discord.TextChannel, Set[int]]]:
+    stats = get_channel_search_stats()
+    plan = []
     for channel in guild.channels:
         if not isinstance(channel, discord.TextChannel):
             continue
+        stats.channels += 1
+        stats.candidates += len(message_ids)
+        ids = {i for i in message_ids if _may_contain(channel, i)}
+        stats.pruned += len(message_ids) - len(ids)
+        if ids:
+            plan.append((channel, ids))
+    # channels that may have more of the messages are probed first
+    plan.sort(key=lambda item: (item[0] != hint, -len(item[1])))
+    return plan
+
+
+async def _probe_channel_many(
+    channel: discord.TextChannel,
+    message_ids: Set[int],
+    results: Dict[int, Optional[Tuple[discord.TextChannel, discord.Message]]],
+    denied: Set[int],
+) -> None:
+    stats = get_channel_search_stats()
+    while True:
+        pending = sorted(i for i in message_ids if results[i] is None)
+        if not pending:
+            return
+        if len(pending) == 1:
+            result = await _probe_channel(channel, pending[0], denied)
+            if result is not None:
+                results[pending[0]] = result
+            return
+
+        anchor = pending[len(pending) // 2]
+        stats.probes += 1
         try:
-            message = await channel.fetch_message(message_id)
-        except (discord.NotFound, discord.Forbidden):
-            pass
-        except discord.HTTPException as e:
-            raise e
-        else:
-            return channel, message
-    return None
+            messages = [
+                message
+                async for message in channel.history(
+                    limit=_AROUND_LIMIT, around=discord.Object(anchor)
+                )
+            ]
+        except discord.NotFound:
+            return
+        except discord.Forbidden:
+            denied.update(pending)
+            return
+        for message in messages:
+            if message.id in message_ids and results[message.id] is None:
+                results[message.id] = channel, message
+        # the returned messages are contiguous, so the other IDs in their range are not in this channel,
+        # and no message on one side of the anchor means the channel has nothing on that side
+        low = min((m.id for m in messages if m.id < anchor), default=0)
+        high = max((m.id for m in messages if m.id >= anchor), default=None)
+        message_ids.difference_update(
+            i for i in pending if low <= i and (high is None or i <= high)
+        )
+
+
+async def _query_members(
+    guild: discord.Guild, user_ids: List[int], concurrency: int
+) -> Dict[int, discord.Member]:
+    found = {}
+    for i in range(0, len(user_ids), _MEMBER_QUERY_LIMIT):
+        chunk = user_ids[i : i + _MEMBER_QUERY_LIMIT]
+        try:
+            members = await guild.query_members(
+                user_ids=chunk, limit=len(chunk), cache=True
+            )
+        except (discord.ClientException, asyncio.TimeoutError):
+            # the members intent is disabled or the gateway did not answer
+            members = await _fetch_each(guild.fetch_member, chunk, concurrency)
+        found.update((member.id, member) for member in members)
+    return found
+
+
+async def _fetch_each(
+    fetch: Callable[[int], Awaitable[Any]], user_ids: List[int], concurrency: int
+) -> List[Any]:
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    found = []
+
+    async def fetch_one(user_id: int) -> None:
+        async with semaphore:
+            try:
+                found.append(await fetch(user_id))
+            except discord.NotFound:
+                pass
+
+    await run_all(fetch_one(user_id) for user_id in user_ids)
+    return found
+
+
+async def _probe_channels_concurrently(
+    channels: List[discord.TextChannel],
+    message_id: int,
+    concurrency: int,
+    denied: Set[int],
+) -> Optional[Tuple[discord.TextChannel, discord.Message]]:
+    remaining = iter(channels)
+    pending = set()
+
+    def fill():
+        while len(pending) < concurrency:
+            channel = next(remaining, None)
+            if channel is None:
+                return
+            pending.add(
+                asyncio.ensure_future(_probe_channel(channel, message_id, denied))
+            )
+
+    fill()
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            error = None
+            for task in done:
+                if task.exception() is not None:
+                    error = error or task.exception()
+                elif task.result() is not None:
+                    return task.result()
+            if error is not None:
+                raise error
+            fill()
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
 
 
 def get_before_after(
@@ -127,3 +556,45 @@ def get_corrected_before_after_str(
     after_str = try_strftime(after, *fmts)
 
     return before_str, after_str
+
+
+def get_corrected_before_after_str_many(
+    windows: Iterable[Tuple[Optional[datetime.datetime], Optional[datetime.datetime]]],
+    owner: Union[discord.Guild, discord.abc.GuildChannel],
+    tz: datetime.timezone,
+    *fmts: str,
+) -> List[Tuple[str, str]]:
+    """Batch version of get_corrected_before_after_str
+
+    The values used in place of None and the working format are resolved once for the whole batch.
+
+    :param windows: before/after naive datetime values
+    :type windows: Iterable[Tuple[Optional[datetime.datetime], Optional[datetime.datetime]]]
+    :param owner:　to use create_at when after is None
+    :type owner: Union[discord.Guild, discord.abc.GuildChannel]
+    :param tz: specify if you want an aware datetime
+    :type tz: datetime.timezone
+    :param fmts: for convert to datetime
+    :type fmts: Tuple[str, ...]
+    :return: before/after datetime strings in the same order
+    :rtype: List[Tuple[str, str]]
+    """
+    now = None
+    created_at = None
+    values = []
+    for before, after in windows:
+        if before is None:
+            if now is None:
+                now = datetime.datetime.now(tz=tz)
+            before = now
+        if after is None:
+            if created_at is None:
+                created_at = owner.created_at.replace(
+                    tzinfo=datetime.timezone.utc
+                ).astimezone(tz)
+            after = created_at
+        values.append(before)
+        values.append(after)
+
+    strings = try_strftime_many(values, *fmts)
+    return list(zip(strings[0::2], strings[1::2]))
@@ -0,0 +1,251 @@
+import asyncio
+import datetime
+import inspect
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Union,
+)
+
+import discord
+
+from discord_ext_commands_coghelper.utils.misc import to_utc_naive
+
+PageCallback = Callable[
+    [discord.TextChannel, List[discord.Message]], Optional[Awaitable[None]]
+]
+_DONE = object()
+
+# to_history_bound, as_channels, run_all and scan_channel are shared by the modules of utils, they are not exported
+
+
+def to_history_bound(
+    value: Union[datetime.datetime, discord.abc.Snowflake, None]
+) -> Union[datetime.datetime, discord.abc.Snowflake, None]:
+    """Convert a bound of scan_history to a bound of history, which requires an utc naive datetime
+
+    :param value: aware or utc naive datetime, or snowflake
+    :type value: Union[datetime.datetime, discord.abc.Snowflake, None]
+    :rtype: Union[datetime.datetime, discord.abc.Snowflake, None]
+    """
+    if isinstance(value, datetime.datetime) and value.tzinfo is not None:
+        return to_utc_naive(value)
+    return value
+
+
+def as_channels(
+    channels: Union[discord.abc.Messageable, Iterable[discord.abc.Messageable]]
+) -> List[discord.abc.Messageable]:
+    """Accept a channel where channels are expected
+
+    :param channels: channel or channels
+    :type channels: Union[discord.abc.Messageable, Iterable[discord.abc.Messageable]]
+    :rtype: List[discord.abc.Messageable]
+    """
+    if isinstance(channels, discord.abc.Messageable):
+        return [channels]
+    return list(channels)
+
+
+async def run_all(coroutines: Iterable[Awaitable[None]]) -> None:
+    """Run coroutines concurrently, the others are cancelled when one fails or the caller is cancelled
+
+    :param coroutines: coroutines to run
+    :type coroutines: Iterable[Awaitable[None]]
+    :return: None
+    :rtype: None
+    """
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # stop the other channels when one fails or the caller is cancelled
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def scan_channel(
+    channel: discord.abc.Messageable,
+    before,
+    after,
+    oldest_first: Optional[bool],
+    page_size: int,
+    ignore_forbidden: bool,
+    semaphore: asyncio.Semaphore,
+    emit: Callable[[discord.abc.Messageable, List[discord.Message]], Awaitable[None]],
+) -> None:
+    """Pass the history of a channel to emit page by page while holding the semaphore
+
+    :param channel: channel to scan
+    :type channel: discord.abc.Messageable
+    :param before: same as discord.abc.Messageable.history
+    :param after: same as discord.abc.Messageable.history
+    :param oldest_first: same as discord.abc.Messageable.history
+    :type oldest_first: Optional[bool]
+    :param page_size: number of messages passed to emit together
+    :type page_size: int
+    :param ignore_forbidden: end the scan silently if the channel cannot be read
+    :type ignore_forbidden: bool
+    :param semaphore: limits the channels scanned at the same time
+    :type semaphore: asyncio.Semaphore
+    :param emit: receives the channel and a page of messages
+    :type emit: Callable[[discord.abc.Messageable, List[discord.Message]], Awaitable[None]]
+    :return: None
+    :rtype: None
+    """
+    async with semaphore:
+        page: List[discord.Message] = []
+        try:
+            async for message in channel.history(
+                limit=None, before=before, after=after, oldest_first=oldest_first
+            ):
+                page.append(message)
+                if len(page) >= page_size:
+                    await emit(channel, page)
+                    page = []
+        except discord.Forbidden:
+            if not ignore_forbidden:
+                raise
+        if page:
+            await emit(channel, page)
+
+
+async def scan_history(
+    channels: Union[discord.abc.Messageable, Iterable[discord.abc.Messageable]],
+    before: Union[datetime.datetime, discord.abc.Snowflake] = None,
+    after: Union[datetime.datetime, discord.abc.Snowflake] = None,
+    *,
+    concurrency: int = 4,
+    page_size: int = 100,
+    oldest_first: Optional[bool] = None,
+    ignore_forbidden: bool = True,
+) -> AsyncIterator[discord.Message]:
+    """Iterate the messages of channels between before and after
+
+    Up to concurrency channels are fetched at the same time and at most 2 * concurrency pages are buffered, so the
+    memory does not depend on the number of messages. Messages of a channel are in order, but messages of
+    different channels are interleaved.
+
+    :param channels: channel or channels to scan
+    :type channels: Union[discord.abc.Messageable, Iterable[discord.abc.Messageable]]
+    :param before: scan messages before this, such as the before of get_before_after
+    :type before: Union[datetime.datetime, discord.abc.Snowflake]
+    :param after: scan messages after this, such as the after of get_before_after
+    :type after: Union[datetime.datetime, discord.abc.Snowflake]
+    :param concurrency: maximum number of channels fetched at the same time
+    :type concurrency: int
+    :param page_size: number of messages buffered together
+    :type page_size: int
+    :param oldest_first: same as discord.abc.Messageable.history
+    :type oldest_first: Optional[bool]
+    :param ignore_forbidden: skip channels that cannot be read
+    :type ignore_forbidden: bool
+    :return: messages
+    :rtype: AsyncIterator[discord.Message]
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, concurrency) * 2)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    before = to_history_bound(before)
+    after = to_history_bound(after)
+
+    async def emit(_, page):
+        await queue.put(page)
+
+    async def run():
+        try:
+            await run_all(
+                [
+                    scan_channel(
+                        channel,
+                        before,
+                        after,
+                        oldest_first,
+                        page_size,
+                        ignore_forbidden,
+                        semaphore,
+                        emit,
+                    )
+                    for channel in as_channels(channels)
+                ]
+            )
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(_DONE)
+
+    producer = asyncio.ensure_future(run())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            for message in item:
+                yield message
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+
+
+async def aggregate_history(
+    channels: Union[discord.abc.Messageable, Iterable[discord.abc.Messageable]],
+    on_page: PageCallback,
+    before: Union[datetime.datetime, discord.abc.Snowflake] = None,
+    after: Union[datetime.datetime, discord.abc.Snowflake] = None,
+    *,
+    concurrency: int = 4,
+    page_size: int = 100,
+    oldest_first: Optional[bool] = None,
+    ignore_forbidden: bool = True,
+) -> None:
+    """Pass the messages of channels between before and after to on_page page by page
+
+    Use this for counts and reductions, the pages are not kept after on_page returns.
+
+    :param channels: channel or channels to scan
+    :type channels: Union[discord.abc.Messageable, Iterable[discord.abc.Messageable]]
+    :param on_page: called with the channel and a page of messages, can be a coroutine function
+    :type on_page: Callable[[discord.TextChannel, List[discord.Message]], Optional[Awaitable[None]]]
+    :param before: scan messages before this, such as the before of get_before_after
+    :type before: Union[datetime.datetime, discord.abc.Snowflake]
+    :param after: scan messages after this, such as the after of get_before_after
+    :type after: Union[datetime.datetime, discord.abc.Snowflake]
+    :param concurrency: maximum number of channels fetched at the same time
+    :type concurrency: int
+    :param page_size: number of messages passed together
+    :type page_size: int
+    :param oldest_first: same as discord.abc.Messageable.history
+    :type oldest_first: Optional[bool]
+    :param ignore_forbidden: skip channels that cannot be read
+    :type ignore_forbidden: bool
+    :return: None
+    :rtype: None
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def emit(channel, page):
+        result = on_page(channel, page)
+        if inspect.isawaitable(result):
+            await result
+
+    await run_all(
+        [
+            scan_channel(
+                channel,
+                to_history_bound(before),
+                to_history_bound(after),
+                oldest_first,
+                page_size,
+                ignore_forbidden,
+                semaphore,
+                emit,
+            )
+            for channel in as_channels(channels)
+        ]
+    )
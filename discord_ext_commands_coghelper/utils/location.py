@@ -0,0 +1,287 @@
+import collections
+import sqlite3
+import time
+from typing import Dict, Hashable, Optional, Tuple
+
+from discord_ext_commands_coghelper.utils.sqlite import SqliteWriteBuffer
+
+
+class LocationCache:
+    """Cache of the channel that has a message
+
+    Message IDs are globally unique and never move channels, so the channel found once can be reused. Negative
+    results are cached per (guild_id, message_id) for a short time.
+
+    This class caches nothing, inherit it to implement a backend.
+    """
+
+    def get(self, message_id: int) -> Optional[int]:
+        """Get the channel ID that has the message
+
+        :param message_id: Message ID
+        :type message_id: int
+        :return: Channel ID or None if not cached
+        :rtype: Optional[int]
+        """
+        return None
+
+    def set(self, message_id: int, channel_id: int) -> None:
+        """Store the channel ID that has the message
+
+        :param message_id: Message ID
+        :type message_id: int
+        :param channel_id: Channel ID
+        :type channel_id: int
+        :return: None
+        :rtype: None
+        """
+
+    def discard(self, message_id: int) -> None:
+        """Remove the channel ID of the message
+
+        :param message_id: Message ID
+        :type message_id: int
+        :return: None
+        :rtype: None
+        """
+
+    def is_missing(self, guild_id: int, message_id: int) -> bool:
+        """Whether the message was recently not found in the guild
+
+        :param guild_id: Guild ID
+        :type guild_id: int
+        :param message_id: Message ID
+        :type message_id: int
+        :return: True if the negative result is cached
+        :rtype: bool
+        """
+        return False
+
+    def set_missing(self, guild_id: int, message_id: int) -> None:
+        """Store that the message was not found in the guild
+
+        :param guild_id: Guild ID
+        :type guild_id: int
+        :param message_id: Message ID
+        :type message_id: int
+        :return: None
+        :rtype: None
+        """
+
+    def clear(self) -> None:
+        """Remove all entries
+
+        :return: None
+        :rtype: None
+        """
+
+
+class MemoryLocationCache(LocationCache):
+    """LocationCache in memory with LRU eviction and TTL"""
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        ttl: Optional[float] = 86400.0,
+        negative_ttl: float = 60.0,
+    ):
+        """__init__
+
+        :param maxsize: maximum number of entries, for each of positive and negative results
+        :type maxsize: int
+        :param ttl: seconds to keep positive results, None keeps them until evicted
+        :type ttl: Optional[float]
+        :param negative_ttl: seconds to keep negative results
+        :type negative_ttl: float
+        """
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._locations: "collections.OrderedDict[int, Tuple[int, Optional[float]]]" = (
+            collections.OrderedDict()
+        )
+        self._missing: "collections.OrderedDict[Tuple[int, int], float]" = (
+            collections.OrderedDict()
+        )
+
+    def __len__(self):
+        return len(self._locations)
+
+    def get(self, message_id: int) -> Optional[int]:
+        entry = self._locations.get(message_id)
+        if entry is None:
+            return None
+        channel_id, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._locations[message_id]
+            return None
+        self._locations.move_to_end(message_id)
+        return channel_id
+
+    def set(self, message_id: int, channel_id: int) -> None:
+        expires_at = None if self._ttl is None else time.monotonic() + self._ttl
+        self._locations[message_id] = (channel_id, expires_at)
+        self._locations.move_to_end(message_id)
+        while len(self._locations) > self._maxsize:
+            self._locations.popitem(last=False)
+
+    def discard(self, message_id: int) -> None:
+        self._locations.pop(message_id, None)
+
+    def is_missing(self, guild_id: int, message_id: int) -> bool:
+        key = (guild_id, message_id)
+        expires_at = self._missing.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self._missing[key]
+            return False
+        return True
+
+    def set_missing(self, guild_id: int, message_id: int) -> None:
+        key = (guild_id, message_id)
+        self._missing[key] = time.monotonic() + self._negative_ttl
+        self._missing.move_to_end(key)
+        while len(self._missing) > self._maxsize:
+            self._missing.popitem(last=False)
+
+    def clear(self) -> None:
+        self._locations.clear()
+        self._missing.clear()
+
+
+class SqliteLocationCache(LocationCache):
+    """LocationCache persisted in a SQLite database
+
+    Writes are buffered and committed in batches by a background thread while an event loop is running, so that
+    find_text_channel does not wait for the disk. Reads see the buffered writes. Without a running event loop, or by
+    flush, the writes are committed at once.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: Optional[float] = None,
+        negative_ttl: float = 60.0,
+    ):
+        """__init__
+
+        :param path: path of the database file, ":memory:" is also available
+        :type path: str
+        :param ttl: seconds to keep positive results, None keeps them forever
+        :type ttl: Optional[float]
+        :param negative_ttl: seconds to keep negative results
+        :type negative_ttl: float
+        """
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._buffer = SqliteWriteBuffer(
+            path,
+            (
+                "CREATE TABLE IF NOT EXISTS message_locations ("
+                "message_id INTEGER PRIMARY KEY, channel_id INTEGER NOT NULL, expires_at REAL)",
+                "CREATE TABLE IF NOT EXISTS missing_messages ("
+                "guild_id INTEGER NOT NULL, message_id INTEGER NOT NULL, expires_at REAL NOT NULL, "
+                "PRIMARY KEY (guild_id, message_id))",
+            ),
+            _apply_location_writes,
+        )
+
+    def close(self) -> None:
+        """Commit the buffered writes and close the database
+
+        :return: None
+        :rtype: None
+        """
+        self._buffer.close()
+
+    def flush(self) -> None:
+        """Commit the buffered writes at once
+
+        :return: None
+        :rtype: None
+        """
+        self._buffer.flush()
+
+    def get(self, message_id: int) -> Optional[int]:
+        found, row = self._buffer.buffered(("location", message_id))
+        if found:
+            if row is None or (row[2] is not None and row[2] <= time.time()):
+                return None
+            return row[1]
+        row = self._buffer.fetchone(
+            "SELECT channel_id FROM message_locations "
+            "WHERE message_id = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (message_id, time.time()),
+        )
+        return None if row is None else row[0]
+
+    def set(self, message_id: int, channel_id: int) -> None:
+        expires_at = None if self._ttl is None else time.time() + self._ttl
+        self._buffer.write(("location", message_id), (message_id, channel_id, expires_at))
+
+    def discard(self, message_id: int) -> None:
+        self._buffer.write(("location", message_id), None)
+
+    def is_missing(self, guild_id: int, message_id: int) -> bool:
+        found, row = self._buffer.buffered(("missing", guild_id, message_id))
+        if found:
+            return row[2] > time.time()
+        row = self._buffer.fetchone(
+            "SELECT 1 FROM missing_messages WHERE guild_id = ? AND message_id = ? AND expires_at > ?",
+            (guild_id, message_id, time.time()),
+        )
+        return row is not None
+
+    def set_missing(self, guild_id: int, message_id: int) -> None:
+        self._buffer.write(
+            ("missing", guild_id, message_id),
+            (guild_id, message_id, time.time() + self._negative_ttl),
+        )
+
+    def clear(self) -> None:
+        self._buffer.execute("DELETE FROM message_locations")
+        self._buffer.execute("DELETE FROM missing_messages")
+
+
+def _apply_location_writes(
+    connection: sqlite3.Connection, writes: Dict[Hashable, Optional[tuple]]
+) -> None:
+    for key, row in writes.items():
+        if key[0] == "missing":
+            connection.execute("INSERT OR REPLACE INTO missing_messages VALUES (?, ?, ?)", row)
+        elif row is None:
+            connection.execute(
+                "DELETE FROM message_locations WHERE message_id = ?", (key[1],)
+            )
+        else:
+            connection.execute(
+                "INSERT OR REPLACE INTO message_locations VALUES (?, ?, ?)", row
+            )
+    connection.execute("DELETE FROM missing_messages WHERE expires_at <= ?", (time.time(),))
+
+
+# caching is opt-in, set_default_location_cache(MemoryLocationCache()) enables it
+_default_location_cache: LocationCache = LocationCache()
+
+
+def get_default_location_cache() -> LocationCache:
+    """Get the LocationCache used by find_text_channel when no cache is given
+
+    It caches nothing until a cache is set by set_default_location_cache.
+
+    :rtype: LocationCache
+    """
+    return _default_location_cache
+
+
+def set_default_location_cache(cache: Optional[LocationCache]) -> None:
+    """Change the LocationCache used by find_text_channel when no cache is given
+
+    :param cache: new cache, None disables caching
+    :type cache: Optional[LocationCache]
+    :return: None
+    :rtype: None
+    """
+    global _default_location_cache
+    _default_location_cache = cache if cache is not None else LocationCache()
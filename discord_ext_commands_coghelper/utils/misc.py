@@ -1,5 +1,7 @@
 import datetime
-from typing import Optional
+from typing import Optional, Iterable, List
+
+from discord_ext_commands_coghelper.utils.strptime import get_datetime_parser
 
 
 def to_utc_naive(dt: datetime.datetime) -> Optional[datetime.datetime]:
@@ -20,6 +22,8 @@ def try_strptime(
 ) -> datetime.datetime:
     """Try using multiple formats for datetime.datetime.strptime
 
+    The shared DatetimeParser for the formats is used, see get_datetime_parser for its statistics.
+
     :param data: data string
     :type data: str
     :param fmts: for convert to datetime
@@ -29,15 +33,7 @@ def try_strptime(
     :return: parsed datetime value
     :rtype: datetime.datetime
     """
-    for fmt in fmts:
-        # noinspection PyBroadException
-        try:
-            dt = datetime.datetime.strptime(data, fmt)
-        except Exception:
-            continue
-        else:
-            return dt
-    return default
+    return get_datetime_parser(*fmts).parse(data, default)
 
 
 def try_strftime(dt: datetime.datetime, *fmts: str, default: str = None) -> str:
@@ -61,3 +57,44 @@ def try_strftime(dt: datetime.datetime, *fmts: str, default: str = None) -> str:
         else:
             return value
     return default
+
+
+def try_strptime_many(
+    data: Iterable[str], *fmts: str, default: datetime.datetime = None
+) -> List[datetime.datetime]:
+    """Batch version of try_strptime
+
+    The DatetimeParser is resolved once for the whole batch and every value is parsed the same as try_strptime,
+    so ambiguous values are parsed by the first format that can parse them regardless of the previous values.
+
+    :param data: data strings
+    :type data: Iterable[str]
+    :param fmts: for convert to datetime
+    :type fmts: Tuple[str, ...]
+    :param default: default value if cannot be parsed
+    :type default: datetime.datetime
+    :return: parsed datetime values in the same order
+    :rtype: List[datetime.datetime]
+    """
+    parse = get_datetime_parser(*fmts).parse
+    return [parse(value, default) for value in data]
+
+
+def try_strftime_many(
+    dts: Iterable[datetime.datetime], *fmts: str, default: str = None
+) -> List[str]:
+    """Batch version of try_strftime
+
+    Every value is formatted the same as try_strftime, so each value is formatted by the first format that can
+    format it regardless of the previous values.
+
+    :param dts: datetime values
+    :type dts: Iterable[datetime.datetime]
+    :param fmts: for convert to str
+    :type fmts: Tuple[str, ...]
+    :param default: default value if cannot be formatted
+    :type default: str
+    :return: formatted string values in the same order
+    :rtype: List[str]
+    """
+    return [try_strftime(dt, *fmts, default=default) for dt in dts]
@@ -0,0 +1,182 @@
+import bisect
+import datetime
+from typing import Any, Optional, Sequence, Tuple
+
+DISCORD_EPOCH = 1420070400000
+TIMESTAMP_SHIFT = 22
+_LOW_BITS = (1 << TIMESTAMP_SHIFT) - 1
+_UNIX_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def snowflake_time_ms(snowflake: int) -> int:
+    """Get the creation time of a snowflake in unix milliseconds
+
+    :param snowflake: Discord ID
+    :type snowflake: int
+    :return: unix time in milliseconds
+    :rtype: int
+    """
+    return (snowflake >> TIMESTAMP_SHIFT) + DISCORD_EPOCH
+
+
+def time_to_snowflake(
+    dt: datetime.datetime, high: bool = False, tz: Optional[datetime.tzinfo] = None
+) -> int:
+    """Get the smallest or largest snowflake created at the time, the same as discord.utils.time_snowflake
+
+    :param dt: aware datetime, or naive datetime in tz
+    :type dt: datetime.datetime
+    :param high: whether to return the largest snowflake of the millisecond
+    :type high: bool
+    :param tz: timezone of a naive datetime, UTC if omitted as created_at of discord.py
+    :type tz: Optional[datetime.tzinfo]
+    :return: Discord ID
+    :rtype: int
+    """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=tz or datetime.timezone.utc)
+    # integer arithmetic on timedelta avoids the rounding errors of float timestamps
+    delta = dt - _UNIX_EPOCH
+    ms = (delta.days * 86400 + delta.seconds) * 1000 + delta.microseconds // 1000
+    return ((ms - DISCORD_EPOCH) << TIMESTAMP_SHIFT) + (_LOW_BITS if high else 0)
+
+
+def get_snowflake_bounds(
+    before: Optional[datetime.datetime],
+    after: Optional[datetime.datetime],
+    owner: Any = None,
+    tz: Optional[datetime.tzinfo] = None,
+) -> Tuple[Optional[int], Optional[int]]:
+    """Convert a before/after window to exclusive snowflake bounds
+
+    The bounds are the same as discord.py uses for history, so a message is in the window if after < id < before.
+    When after is None, the ID of the owner is used in place of owner.created_at as in
+    get_corrected_before_after_str, since nothing in a guild or channel is older than itself. When before is None,
+    the window has no upper bound.
+
+    :param before: before datetime value, such as the result of get_before_after
+    :type before: Optional[datetime.datetime]
+    :param after: after datetime value
+    :type after: Optional[datetime.datetime]
+    :param owner: guild or channel to bound after when it is None
+    :type owner: Optional[Union[discord.Guild, discord.abc.GuildChannel]]
+    :param tz: timezone of naive datetime values, UTC if omitted
+    :type tz: Optional[datetime.tzinfo]
+    :return: before/after snowflakes, None is unbounded
+    :rtype: Tuple[Optional[int], Optional[int]]
+    """
+    before_id = None if before is None else time_to_snowflake(before, False, tz)
+    if after is not None:
+        after_id = time_to_snowflake(after, True, tz)
+    elif owner is not None:
+        after_id = owner.id
+    else:
+        after_id = None
+    return before_id, after_id
+
+
+def filter_snowflakes(
+    snowflakes: Sequence[int],
+    before: Optional[int] = None,
+    after: Optional[int] = None,
+    *,
+    assume_sorted: bool = False,
+):
+    """Select the snowflakes in a window by integer comparisons
+
+    Arrays that support comparison operators and boolean indexing, such as numpy arrays, are filtered with a mask
+    and an array is returned. A sorted sequence is sliced with binary search if assume_sorted is True. Otherwise a
+    list is returned.
+
+    :param snowflakes: Discord IDs
+    :type snowflakes: Sequence[int]
+    :param before: exclusive upper bound, such as the result of get_snowflake_bounds, None is unbounded
+    :type before: Optional[int]
+    :param after: exclusive lower bound, None is unbounded
+    :type after: Optional[int]
+    :param assume_sorted: whether the snowflakes are sorted in ascending order
+    :type assume_sorted: bool
+    :return: snowflakes in the window in the same order
+    :rtype: Sequence[int]
+    """
+    if hasattr(snowflakes, "dtype"):
+        mask = None
+        if before is not None:
+            mask = snowflakes < before
+        if after is not None:
+            above = snowflakes > after
+            mask = above if mask is None else mask & above
+        return snowflakes if mask is None else snowflakes[mask]
+    if assume_sorted:
+        start = 0 if after is None else bisect.bisect_right(snowflakes, after)
+        if before is None:
+            stop = len(snowflakes)
+        else:
+            stop = bisect.bisect_left(snowflakes, before)
+        return list(snowflakes[start:stop])
+    if before is None and after is None:
+        return list(snowflakes)
+    if before is None:
+        return [i for i in snowflakes if i > after]
+    if after is None:
+        return [i for i in snowflakes if i < before]
+    return [i for i in snowflakes if after < i < before]
+
+
+class ChannelSearchStats:
+    """Counters of channel searches by find_text_channel and find_text_channels
+
+    channels counts the text channels considered once per search, candidates counts them per Message ID searched in
+    them, and pruned counts the candidates skipped with snowflake timestamps.
+    """
+
+    __slots__ = (
+        "searches",
+        "cache_hits",
+        "negative_cache_hits",
+        "channels",
+        "candidates",
+        "pruned",
+        "probes",
+    )
+
+    def __init__(self):
+        self.searches = 0
+        self.cache_hits = 0
+        self.negative_cache_hits = 0
+        self.channels = 0
+        self.candidates = 0
+        self.pruned = 0
+        self.probes = 0
+
+    @property
+    def saved_probes(self) -> int:
+        """Number of probes skipped by pruning with snowflake timestamps
+
+        :rtype: int
+        """
+        return self.pruned
+
+    def reset(self) -> None:
+        """Reset all counters
+
+        :return: None
+        :rtype: None
+        """
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)}" for name in self.__slots__)
+        return f"ChannelSearchStats({values})"
+
+
+_channel_search_stats = ChannelSearchStats()
+
+
+def get_channel_search_stats() -> ChannelSearchStats:
+    """Get the counters of find_text_channel
+
+    :rtype: ChannelSearchStats
+    """
+    return _channel_search_stats
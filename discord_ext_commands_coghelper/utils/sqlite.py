@@ -0,0 +1,184 @@
+import asyncio
+import concurrent.futures
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from discord_ext_commands_coghelper.log import get_logger
+
+logger = get_logger(__name__)
+
+_NO_VALUE = object()
+
+
+class SqliteWriteBuffer:
+    """Buffered writes to a SQLite database shared by the SQLite caches and stores
+
+    Writes are kept per key, so that a key written many times is committed once. While an event loop is running, they
+    are committed in batches by a background thread through run_in_executor, so that the event loop does not wait for
+    the disk. Without a running event loop, or by flush, they are committed at once. Look up buffered before reading
+    the database, the buffered writes are not in the database yet.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        schema: Iterable[str],
+        apply: Callable[[sqlite3.Connection, Dict[Hashable, Any]], None],
+    ):
+        """__init__
+
+        :param path: path of the database file, ":memory:" is also available
+        :type path: str
+        :param schema: statements executed when the database is opened
+        :type schema: Iterable[str]
+        :param apply: executes the statements of buffered writes by key in a transaction
+        :type apply: Callable[[sqlite3.Connection, Dict[Hashable, Any]], None]
+        """
+        self._apply = apply
+        # the writer commits in another thread, a separate connection lets reads go on meanwhile
+        self._reader = sqlite3.connect(path, check_same_thread=False)
+        if path == ":memory:":
+            self._writer = self._reader
+            self._read_lock = self._write_lock = threading.Lock()
+        else:
+            self._reader.execute("PRAGMA journal_mode=WAL")
+            self._writer = sqlite3.connect(path, check_same_thread=False)
+            self._read_lock = threading.Lock()
+            self._write_lock = threading.Lock()
+        with self._write_lock, self._writer:
+            for statement in schema:
+                self._writer.execute(statement)
+        self._pending: Dict[Hashable, Any] = {}
+        self._committing: Dict[Hashable, Any] = {}
+        self._pending_lock = threading.Lock()
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._flushing: Optional[asyncio.Future] = None
+
+    def fetchone(self, sql: str, parameters: Tuple[Any, ...]) -> Optional[Tuple[Any, ...]]:
+        """Read a row of the database, the buffered writes are not included
+
+        :param sql: SELECT statement
+        :type sql: str
+        :param parameters: parameters of the statement
+        :type parameters: Tuple[Any, ...]
+        :rtype: Optional[Tuple[Any, ...]]
+        """
+        with self._read_lock:
+            return self._reader.execute(sql, parameters).fetchone()
+
+    def buffered(self, key: Hashable) -> Tuple[bool, Any]:
+        """Get the buffered write of a key
+
+        :param key: key of the write
+        :type key: Hashable
+        :return: whether a write is buffered and its value
+        :rtype: Tuple[bool, Any]
+        """
+        with self._pending_lock:
+            for writes in (self._pending, self._committing):
+                value = writes.get(key, _NO_VALUE)
+                if value is not _NO_VALUE:
+                    return True, value
+        return False, None
+
+    def write(self, key: Hashable, value: Any) -> None:
+        """Buffer a write, replacing the buffered write of the same key
+
+        :param key: key of the write
+        :type key: Hashable
+        :param value: value passed to apply
+        :type value: Any
+        :return: None
+        :rtype: None
+        """
+        with self._pending_lock:
+            self._pending[key] = value
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        # a flush scheduled on a closed loop never calls back
+        if self._flushing is None or self._flushing.get_loop() is not loop:
+            self._schedule_flush(loop)
+
+    def execute(
+        self,
+        sql: str,
+        parameters: Tuple[Any, ...] = (),
+        discard: Callable[[Hashable], bool] = lambda key: True,
+    ) -> None:
+        """Execute a statement at once, such as deleting many rows
+
+        The running commit is waited for, and the buffered writes of the keys selected by discard are dropped so
+        that they do not write the rows back.
+
+        :param sql: statement
+        :type sql: str
+        :param parameters: parameters of the statement
+        :type parameters: Tuple[Any, ...]
+        :param discard: selects the keys of the buffered writes to drop, all if omitted
+        :type discard: Callable[[Hashable], bool]
+        :return: None
+        :rtype: None
+        """
+        if self._executor is not None:
+            self._executor.submit(lambda: None).result()
+        with self._pending_lock:
+            for key in [key for key in self._pending if discard(key)]:
+                del self._pending[key]
+        with self._write_lock, self._writer:
+            self._writer.execute(sql, parameters)
+
+    def flush(self) -> None:
+        """Commit the buffered writes in the current thread
+
+        :return: None
+        :rtype: None
+        """
+        with self._pending_lock:
+            writes, self._pending = self._pending, {}
+            self._committing.update(writes)
+        if not writes:
+            return
+        try:
+            with self._write_lock, self._writer:
+                self._apply(self._writer, writes)
+        finally:
+            with self._pending_lock:
+                for key, value in writes.items():
+                    if self._committing.get(key, _NO_VALUE) is value:
+                        del self._committing[key]
+
+    def close(self) -> None:
+        """Commit the buffered writes and close the database
+
+        :return: None
+        :rtype: None
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.flush()
+        if self._writer is not self._reader:
+            self._writer.close()
+        self._reader.close()
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="sqlite-write"
+            )
+        self._flushing = loop.run_in_executor(self._executor, self.flush)
+        self._flushing.add_done_callback(self._on_flushed)
+
+    def _on_flushed(self, future: asyncio.Future) -> None:
+        if self._flushing is future:
+            self._flushing = None
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning("failed to commit buffered writes", error=future.exception())
+        with self._pending_lock:
+            pending = bool(self._pending)
+        if pending and self._executor is not None and self._flushing is None:
+            self._schedule_flush(future.get_loop())
@@ -0,0 +1,212 @@
+import collections
+import datetime
+import functools
+from typing import Dict, Optional, Tuple
+
+# directives that only match ASCII digits and spaces in an ASCII string, checked without strptime
+_NUMERIC_DIRECTIVES = frozenset("YmdHMSyjfIUWw")
+_DIGITS = str.maketrans("", "", "0123456789")
+_WHITESPACE = frozenset(" \t\n\r\x0b\x0c")
+_MISS = object()
+
+
+def _literal_signature(fmt: str) -> Optional[str]:
+    """Literal characters of the format
+
+    None if the format contains non-numeric directives, or literal digits, whitespace or non-ASCII characters that a
+    signature of the string cannot be compared with.
+    """
+    literals = []
+    i = 0
+    while i < len(fmt):
+        c = fmt[i]
+        if c == "%":
+            if i + 1 >= len(fmt):
+                return None
+            directive = fmt[i + 1]
+            if directive == "%":
+                literals.append("%")
+            elif directive not in _NUMERIC_DIRECTIVES:
+                return None
+            i += 2
+            continue
+        if c.isspace() or c.isdigit() or not c.isascii():
+            return None
+        literals.append(c)
+        i += 1
+    # strptime ignores case
+    return "".join(literals).lower()
+
+
+class FormatStats:
+    """Statistics of a format used by DatetimeParser"""
+
+    __slots__ = ("hits", "misses", "skips")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.skips = 0
+
+    def __repr__(self):
+        return f"FormatStats(hits={self.hits}, misses={self.misses}, skips={self.skips})"
+
+
+class DatetimeParser:
+    """Parse a string with multiple formats
+
+    Formats whose literal characters do not match the string are skipped without calling strptime, and the rest are
+    tried in the given order, so the first format that can parse a string always wins as in try_strptime. Only an
+    ASCII string without whitespace is checked, strptime also accepts other digits and spaces for some directives, so
+    a format is skipped only when it cannot parse the string. Parsed results are cached by the string.
+    """
+
+    def __init__(self, fmts: Tuple[str, ...], cache_size: int = 256):
+        """__init__
+
+        :param fmts: for convert to datetime
+        :type fmts: Tuple[str, ...]
+        :param cache_size: maximum number of cached results
+        :type cache_size: int
+        """
+        self._fmts = tuple(fmts)
+        self._signatures = {fmt: _literal_signature(fmt) for fmt in self._fmts}
+        self._stats = {fmt: FormatStats() for fmt in self._fmts}
+        self._order: Tuple[str, ...] = tuple(dict.fromkeys(self._fmts))
+        # formats to try and to skip per literal signature of strings
+        self._candidates: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}
+        self._cache: "collections.OrderedDict[str, object]" = collections.OrderedDict()
+        self._cache_size = cache_size
+        self._cache_hits = 0
+
+    @property
+    def fmts(self) -> Tuple[str, ...]:
+        """Formats given at creation
+
+        :rtype: Tuple[str, ...]
+        """
+        return self._fmts
+
+    @property
+    def order(self) -> Tuple[str, ...]:
+        """Formats in the order of trial, the given order without duplicates
+
+        :rtype: Tuple[str, ...]
+        """
+        return self._order
+
+    @property
+    def stats(self) -> Dict[str, FormatStats]:
+        """Hit, miss and skip counters per format
+
+        :rtype: Dict[str, FormatStats]
+        """
+        return dict(self._stats)
+
+    @property
+    def cache_hits(self) -> int:
+        """Number of results returned from the cache
+
+        :rtype: int
+        """
+        return self._cache_hits
+
+    def reset_stats(self) -> None:
+        """Reset counters and the cache
+
+        :return: None
+        :rtype: None
+        """
+        self._stats = {fmt: FormatStats() for fmt in self._fmts}
+        self._candidates.clear()
+        self._cache.clear()
+        self._cache_hits = 0
+
+    def parse(
+        self, data: str, default: datetime.datetime = None
+    ) -> Optional[datetime.datetime]:
+        """Parse a string
+
+        :param data: data string
+        :type data: str
+        :param default: default value if cannot be parsed
+        :type default: datetime.datetime
+        :return: parsed datetime value
+        :rtype: datetime.datetime
+        """
+        if not isinstance(data, str):
+            return default
+
+        cached = self._cache.get(data, None)
+        if cached is not None:
+            self._cache.move_to_end(data)
+            self._cache_hits += 1
+            return default if cached is _MISS else cached
+
+        dt, _ = self.parse_with_format(data)
+        self._cache[data] = _MISS if dt is None else dt
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return default if dt is None else dt
+
+    def parse_with_format(
+        self, data: str
+    ) -> Tuple[Optional[datetime.datetime], Optional[str]]:
+        """Parse a string without the cache and return the format that parsed it
+
+        :param data: data string
+        :type data: str
+        :return: parsed datetime value and its format, both None if cannot be parsed
+        :rtype: Tuple[Optional[datetime.datetime], Optional[str]]
+        """
+        if not isinstance(data, str):
+            return None, None
+        signature = data.translate(_DIGITS).lower()
+        if data.isascii() and _WHITESPACE.isdisjoint(signature):
+            try_fmts, skip_fmts = self._get_candidates(signature)
+        else:
+            try_fmts, skip_fmts = self._order, ()
+        for fmt in skip_fmts:
+            self._stats[fmt].skips += 1
+        for fmt in try_fmts:
+            stats = self._stats[fmt]
+            # noinspection PyBroadException
+            try:
+                dt = datetime.datetime.strptime(data, fmt)
+            except Exception:
+                stats.misses += 1
+                continue
+            stats.hits += 1
+            return dt, fmt
+        return None, None
+
+    def _get_candidates(
+        self, signature: str
+    ) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        candidates = self._candidates.get(signature)
+        if candidates is None:
+            try_fmts = []
+            skip_fmts = []
+            for fmt in self._order:
+                expected = self._signatures[fmt]
+                if expected is None or expected == signature:
+                    try_fmts.append(fmt)
+                else:
+                    skip_fmts.append(fmt)
+            candidates = tuple(try_fmts), tuple(skip_fmts)
+            if len(self._candidates) >= self._cache_size:
+                self._candidates.clear()
+            self._candidates[signature] = candidates
+        return candidates
+
+
+@functools.lru_cache(maxsize=64)
+def get_datetime_parser(*fmts: str) -> DatetimeParser:
+    """Get the shared DatetimeParser for formats
+
+    :param fmts: for convert to datetime
+    :type fmts: Tuple[str, ...]
+    :return: parser for the formats
+    :rtype: DatetimeParser
+    """
+    return DatetimeParser(fmts)
@@ -0,0 +1,152 @@
+import collections
+import time
+from typing import Any, Optional, Tuple
+
+_Key = Tuple[Optional[int], int]
+
+
+class UserCache:
+    """Cache of resolved users and members in memory with LRU eviction and TTL
+
+    Members are cached per guild and users with guild_id None. A cached member is not updated by the gateway, its
+    roles, nickname and so on can be stale until member_ttl, which is shorter than ttl of users for that reason. Users
+    that were not found are cached for a shorter time, so that a typo in a command does not query the API again and
+    again.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        ttl: Optional[float] = 600.0,
+        negative_ttl: float = 60.0,
+        member_ttl: Optional[float] = 60.0,
+    ):
+        """__init__
+
+        :param maxsize: maximum number of entries, for each of positive and negative results
+        :type maxsize: int
+        :param ttl: seconds to keep resolved users, None keeps them until evicted
+        :type ttl: Optional[float]
+        :param negative_ttl: seconds to keep users that were not found
+        :type negative_ttl: float
+        :param member_ttl: seconds to keep resolved members, None keeps them until evicted
+        :type member_ttl: Optional[float]
+        """
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._member_ttl = member_ttl
+        self._negative_ttl = negative_ttl
+        self._users: "collections.OrderedDict[_Key, Tuple[Any, Optional[float]]]" = (
+            collections.OrderedDict()
+        )
+        self._missing: "collections.OrderedDict[_Key, float]" = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._users)
+
+    def get(self, guild_id: Optional[int], user_id: int) -> Optional[Any]:
+        """Get the resolved user
+
+        :param guild_id: Guild ID of the member, None for a user
+        :type guild_id: Optional[int]
+        :param user_id: User ID
+        :type user_id: int
+        :return: Member or User, None if not cached
+        :rtype: Optional[Union[discord.Member, discord.User]]
+        """
+        key = (guild_id, user_id)
+        entry = self._users.get(key)
+        if entry is None:
+            return None
+        user, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._users[key]
+            return None
+        self._users.move_to_end(key)
+        return user
+
+    def set(self, guild_id: Optional[int], user: Any) -> None:
+        """Store the resolved user
+
+        :param guild_id: Guild ID of the member, None for a user
+        :type guild_id: Optional[int]
+        :param user: Member or User
+        :type user: Union[discord.Member, discord.User]
+        :return: None
+        :rtype: None
+        """
+        key = (guild_id, user.id)
+        ttl = self._ttl if guild_id is None else self._member_ttl
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._users[key] = (user, expires_at)
+        self._users.move_to_end(key)
+        self._missing.pop(key, None)
+        while len(self._users) > self._maxsize:
+            self._users.popitem(last=False)
+
+    def is_missing(self, guild_id: Optional[int], user_id: int) -> bool:
+        """Whether the user was recently not found
+
+        :param guild_id: Guild ID of the member, None for a user
+        :type guild_id: Optional[int]
+        :param user_id: User ID
+        :type user_id: int
+        :return: True if the negative result is cached
+        :rtype: bool
+        """
+        key = (guild_id, user_id)
+        expires_at = self._missing.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self._missing[key]
+            return False
+        return True
+
+    def set_missing(self, guild_id: Optional[int], user_id: int) -> None:
+        """Store that the user was not found
+
+        :param guild_id: Guild ID of the member, None for a user
+        :type guild_id: Optional[int]
+        :param user_id: User ID
+        :type user_id: int
+        :return: None
+        :rtype: None
+        """
+        key = (guild_id, user_id)
+        self._missing[key] = time.monotonic() + self._negative_ttl
+        self._missing.move_to_end(key)
+        while len(self._missing) > self._maxsize:
+            self._missing.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries
+
+        :return: None
+        :rtype: None
+        """
+        self._users.clear()
+        self._missing.clear()
+
+
+_default_user_cache = UserCache()
+
+
+def get_default_user_cache() -> UserCache:
+    """Get the UserCache used by resolve_users when no cache is given
+
+    :rtype: UserCache
+    """
+    return _default_user_cache
+
+
+def set_default_user_cache(cache: Optional[UserCache]) -> None:
+    """Change the UserCache used by resolve_users when no cache is given
+
+    :param cache: new cache, None disables caching
+    :type cache: Optional[UserCache]
+    :return: None
+    :rtype: None
+    """
+    global _default_user_cache
+    _default_user_cache = cache if cache is not None else UserCache(maxsize=0)
@@ -0,0 +1,133 @@
+import datetime
+from types import SimpleNamespace
+from typing import Dict, Any
+
+import pytest
+from discord.ext import commands
+
+from discord_ext_commands_coghelper import (
+    ArgumentError,
+    CogHelper,
+    Argument,
+    BoolArgument,
+    ListArgument,
+    DatetimeArgument,
+    ChoiceArgument,
+    TypingPolicy,
+    compile_arguments,
+)
+from tests import JST
+
+CTX = SimpleNamespace(message=SimpleNamespace(content="!command"))
+
+ARGUMENTS = (
+    Argument("channel_id", int),
+    BoolArgument("all"),
+    ListArgument("users", ",", predicate=int, default=[]),
+    DatetimeArgument("before", "%Y-%m-%d", "%Y/%m/%d", tz=JST),
+    Argument("name", attr="display_name", default="unknown"),
+)
+
+
+@pytest.mark.parametrize(
+    ("args", "expected"),
+    [
+        (
+            dict(),
+            dict(
+                channel_id=None,
+                all=False,
+                users=[],
+                before=None,
+                display_name="unknown",
+            ),
+        ),
+        (
+            dict(channel_id="1", all="True", users="1,2", before="2000/01/31", name="a"),
+            dict(
+                channel_id=1,
+                all=True,
+                users=[1, 2],
+                before=datetime.datetime(2000, 1, 31, tzinfo=JST),
+                display_name="a",
+            ),
+        ),
+        (
+            dict(all="false", unknown="value"),
+            dict(
+                channel_id=None,
+                all=False,
+                users=[],
+                before=None,
+                display_name="unknown",
+            ),
+        ),
+    ],
+)
+def test_compile_arguments(args: Dict[str, str], expected: Dict[str, Any]):
+    parse = compile_arguments(ARGUMENTS)
+    parsed = parse(CTX, args)
+    assert parsed.to_dict() == expected
+    assert not hasattr(parsed, "__dict__")
+
+
+@pytest.mark.parametrize(
+    ("arguments", "args", "cause"),
+    [
+        ((Argument("channel_id", int),), dict(channel_id="abc"), "channel_id"),
+        ((Argument("channel_id", int, required=True),), dict(), "channel_id"),
+    ],
+)
+def test_compile_arguments_error(arguments, args: Dict[str, str], cause: str):
+    parse = compile_arguments(arguments)
+    with pytest.raises(ArgumentError) as e:
+        parse(CTX, args)
+    assert cause in e.value.causes
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [("delayed", "delayed"), ("NEVER", "never"), ("al", "always")],
+)
+def test_choice_argument(value: str, expected: str):
+    parse = compile_arguments((ChoiceArgument("typing", TypingPolicy),))
+    assert parse(CTX, dict(typing=value)).typing == expected
+
+
+def test_choice_argument_error():
+    parse = compile_arguments((ChoiceArgument("typing", TypingPolicy),))
+    with pytest.raises(ArgumentError) as e:
+        parse(CTX, dict(typing="sometimes"))
+    assert e.value.causes["typing"] == (
+        "sometimes is invalid. (choices: never, always, delayed)"
+    )
+
+
+def test_compile_arguments_duplicate():
+    with pytest.raises(ValueError):
+        compile_arguments((Argument("a"), Argument("b", attr="a")))
+
+
+def test_compile_arguments_mutable_default():
+    parse = compile_arguments(
+        (ListArgument("users", ",", int, default=[]), Argument("options", default={}))
+    )
+    first = parse(CTX, {})
+    first.users.append(1)
+    first.options["key"] = "value"
+    second = parse(CTX, {})
+    assert second.users == []
+    assert second.options == {}
+
+
+def test_coghelper_arguments():
+    class SampleCog(commands.Cog, CogHelper):
+        arguments = (Argument("count", int, default=1),)
+
+    class DerivedCog(SampleCog):
+        pass
+
+    cog = DerivedCog(None)
+    cog._parse_args(CTX, dict(count="3"))
+    assert cog.args.count == 3
+    assert type(cog.args).__name__ == "SampleCogArguments"
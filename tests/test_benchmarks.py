@@ -0,0 +1,32 @@
+import asyncio
+import json
+
+from benchmarks import suite
+
+
+def test_benchmark_suite(tmp_path):
+    output = tmp_path / "results.json"
+    assert suite.main(["--repeat", "1", "--number", "1", "--output", str(output)]) == 0
+    results = json.loads(output.read_text())["results"]
+    assert set(results) == set(suite.CASES)
+    assert all(result["min_us"] > 0 for result in results.values())
+
+
+def test_benchmark_compare():
+    baseline = {"results": {"a": {"min_us": 1.0}, "b": {"min_us": 1.0}}}
+    current = {"results": {"a": {"min_us": 1.1}, "b": {"min_us": 1.3}, "c": {"min_us": 9.0}}}
+    assert suite.compare(baseline, current, 1.2) == ["b"]
+
+
+def test_benchmark_round_trip_closes_loop(monkeypatch):
+    loops = []
+    new_event_loop = asyncio.new_event_loop
+
+    def record_event_loop():
+        loops.append(new_event_loop())
+        return loops[-1]
+
+    monkeypatch.setattr(suite.asyncio, "new_event_loop", record_event_loop)
+    suite.run_suite(["execute_round_trip", "execute_round_trip_latency"], 1, 1)
+    assert len(loops) == 2
+    assert all(loop.is_closed() for loop in loops)
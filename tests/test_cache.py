@@ -0,0 +1,136 @@
+import asyncio
+from types import SimpleNamespace
+
+from discord.ext import commands
+
+from discord_ext_commands_coghelper import CogHelper, ResultCache, cached_result
+from discord_ext_commands_coghelper.testing import FakeContext, FakeGuild
+
+
+class ReportCog(commands.Cog, CogHelper):
+    def __init__(self, bot):
+        super().__init__(bot)
+        self.computed = 0
+
+    def _parse_args(self, ctx, args):
+        pass
+
+    async def _execute(self, ctx):
+        count = await self._count(ctx)
+        await ctx.send(str(count))
+
+    @cached_result(ttl=60)
+    async def _count(self, ctx):
+        self.computed += 1
+        await asyncio.sleep(0.01)
+        return self.computed
+
+
+def test_cached_result():
+    async def run():
+        cog = ReportCog(None)
+        ctx = FakeContext()
+        # concurrent identical invocations share one computation
+        await asyncio.gather(*[cog.execute(ctx, ("before=2022-01-01",)) for _ in range(3)])
+        await cog.execute(ctx, ("before=2022-01-01",))
+        await cog.execute(ctx, ("before=2022-02-01",))
+        await cog.execute(FakeContext(guild=FakeGuild(2, [])), ("before=2022-01-01",))
+        return cog, ctx
+
+    cog, ctx = asyncio.run(run())
+    assert cog.computed == 3
+    assert [sent["content"] for sent in ctx.sent] == ["1", "1", "1", "1", "2"]
+    stats = ReportCog._count.cache.stats
+    assert stats.coalesced == 2
+    assert stats.hits == 1
+    ReportCog._count.cache.clear()
+
+
+def test_result_cache_invalidate():
+    async def run():
+        cache = ResultCache(ttl=60)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return len(calls)
+
+        assert await cache.get_or_compute("a", 1, compute) == 1
+        assert await cache.get_or_compute("b", 2, compute) == 2
+        cache.on_message(SimpleNamespace(guild=SimpleNamespace(id=1)))
+        assert await cache.get_or_compute("a", 1, compute) == 3
+        assert await cache.get_or_compute("b", 2, compute) == 2
+
+        # invalidated while computing, the result is not stored
+        async def slow():
+            await asyncio.sleep(0.01)
+            return "stale"
+
+        task = asyncio.ensure_future(cache.get_or_compute("c", 1, slow))
+        await asyncio.sleep(0)
+        cache.invalidate(1)
+        assert await task == "stale"
+        assert await cache.get_or_compute("c", 1, compute) == 4
+
+    asyncio.run(run())
+
+
+def test_result_cache_ttl_and_size():
+    async def run():
+        cache = ResultCache(ttl=0.01, maxsize=1)
+
+        async def compute():
+            return object()
+
+        first = await cache.get_or_compute("a", None, compute)
+        await asyncio.sleep(0.02)
+        assert await cache.get_or_compute("a", None, compute) is not first
+        await cache.get_or_compute("b", None, compute)
+        assert len(cache) == 1
+
+    asyncio.run(run())
+
+
+def test_result_cache_exception():
+    async def run():
+        cache = ResultCache()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("failed")
+
+        results = await asyncio.gather(
+            cache.get_or_compute("a", None, fail),
+            cache.get_or_compute("a", None, fail),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, ValueError) for result in results)
+        assert len(cache) == 0
+
+    asyncio.run(run())
+
+
+def test_result_cache_cancelled():
+    async def run():
+        cache = ResultCache()
+        computed = []
+
+        async def compute():
+            computed.append(None)
+            await asyncio.sleep(0.01)
+            return len(computed)
+
+        tasks = [
+            asyncio.ensure_future(cache.get_or_compute("a", None, compute))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.001)
+        tasks[0].cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert isinstance(results[0], asyncio.CancelledError)
+        # one of the followers computes again and the other shares it
+        assert results[1:] == [2, 2]
+        assert len(computed) == 2
+        assert len(cache) == 1
+
+    asyncio.run(run())
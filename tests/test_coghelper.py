@@ -0,0 +1,323 @@
+import asyncio
+import io
+import json
+import threading
+from typing import Dict, Tuple
+
+import pytest
+from discord.ext import commands
+
+from discord_ext_commands_coghelper import (
+    Argument,
+    ArgumentError,
+    CogHelper,
+    ErrorDispatcher,
+    ExecutionError,
+    ExecutionRecord,
+    Instrumentation,
+    JsonLinesSink,
+    MemorySink,
+    MetricsSink,
+    TypingPolicy,
+)
+from discord_ext_commands_coghelper.testing import (
+    FakeContext,
+    FakeMember,
+    FakeTextChannel,
+)
+
+
+class SampleCog(commands.Cog, CogHelper):
+    def __init__(self, bot):
+        super().__init__(bot)
+        self.executed = 0
+
+    def _parse_args(self, ctx, args: Dict[str, str]):
+        if "invalid" in args:
+            raise ArgumentError(ctx, invalid="invalid argument")
+        self.fail = "fail" in args
+
+    async def _execute(self, ctx):
+        self.executed += 1
+        if self.fail:
+            raise ExecutionError(ctx, reason="failed")
+        await ctx.send("ok")
+
+
+def test_execute():
+    cog = SampleCog(None)
+    ctx = FakeContext()
+    asyncio.run(cog.execute(ctx, ()))
+    assert cog.executed == 1
+    assert ctx.sent[0]["content"] == "ok"
+
+
+class EchoCog(commands.Cog, CogHelper):
+    arguments = (Argument("n", int),)
+
+    async def _execute(self, ctx):
+        # other invocations parse their arguments while this one waits
+        await asyncio.sleep(0.01)
+        await ctx.send(str(self.args.n))
+
+
+def test_execute_concurrent_args():
+    cog = EchoCog(None)
+    contexts = [FakeContext() for _ in range(3)]
+
+    async def run():
+        await asyncio.gather(
+            *(cog.execute(ctx, (f"n={i}",)) for i, ctx in enumerate(contexts))
+        )
+
+    asyncio.run(run())
+    assert [ctx.sent[0]["content"] for ctx in contexts] == ["0", "1", "2"]
+    assert cog.args is None
+
+
+def test_execute_by_bot():
+    cog = SampleCog(None)
+    ctx = FakeContext(author=FakeMember(1, bot=True))
+    asyncio.run(cog.execute(ctx, ()))
+    assert cog.executed == 0
+    assert ctx.sent == []
+
+
+def test_execute_errors():
+    cog = SampleCog(None)
+    ctx = FakeContext()
+    asyncio.run(cog.execute(ctx, ("invalid",)))
+    asyncio.run(cog.execute(ctx, ("fail",)))
+    assert cog.executed == 1
+    assert [sent["embed"].title for sent in ctx.sent] == [
+        "⚠️Argument Error",
+        "⚠️Execution Error",
+    ]
+
+
+def test_instrumentation():
+    stream = io.StringIO()
+    memory = MemorySink()
+    cog = SampleCog(None)
+    sink = JsonLinesSink(stream)
+    cog.instrumentation = Instrumentation(sinks=[memory, sink])
+    for args in [(), ("invalid",), ("fail",), ()]:
+        asyncio.run(cog.execute(FakeContext(command="sample"), args))
+    sink.close()
+
+    assert [record.status for record in memory.records] == [
+        "ok",
+        "argument_error",
+        "execution_error",
+        "ok",
+    ]
+    assert set(memory.records[0].phases) == {"parse_args", "execute", "total"}
+    assert set(memory.records[1].phases) == {"parse_args", "send_error", "total"}
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(lines) == 4
+    assert lines[0]["command"] == "sample"
+
+    instrumentation = cog.instrumentation
+    assert set(instrumentation.percentiles("sample")) == {50, 90, 99}
+    assert instrumentation.percentiles("unknown") == {}
+    assert instrumentation.counts()[("sample", "ok")] == 2
+    assert "execute" in instrumentation.summary()["sample"]
+
+
+class _ThreadRecordingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def write(self, s):
+        self.threads.add(threading.current_thread().name)
+        return super().write(s)
+
+
+class _FailingSink(MetricsSink):
+    def emit(self, record):
+        raise OSError("disk full")
+
+
+def test_instrumentation_sinks_off_loop():
+    stream = _ThreadRecordingStream()
+    sink = JsonLinesSink(stream)
+    cog = SampleCog(None)
+    cog.instrumentation = Instrumentation(sinks=[_FailingSink(), sink])
+    ctx = FakeContext(command="sample")
+
+    async def run():
+        for args in [(), ("fail",)]:
+            await cog.execute(ctx, args)
+
+    # a failing sink does not replace the result of the command
+    asyncio.run(run())
+    sink.close()
+    assert ctx.sent[0]["content"] == "ok"
+    assert ctx.sent[1]["embed"].title == "⚠️Execution Error"
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["status"] for line in lines] == ["ok", "execution_error"]
+    assert threading.current_thread().name not in stream.threads
+
+    # without a running event loop, the lines are written at once
+    JsonLinesSink(stream).emit(ExecutionRecord("sample", None, None, None))
+    assert threading.current_thread().name in stream.threads
+    assert len(stream.getvalue().splitlines()) == 3
+
+
+class SlowCog(SampleCog):
+    delay = 0.0
+
+    async def _execute(self, ctx):
+        await asyncio.sleep(self.delay)
+        await super()._execute(ctx)
+
+
+@pytest.mark.parametrize(
+    ("policy", "delay", "args", "expected"),
+    [
+        (TypingPolicy.ALWAYS, 0.0, (), 1),
+        (TypingPolicy.ALWAYS, 0.0, ("invalid",), 0),
+        (TypingPolicy.NEVER, 0.05, (), 0),
+        (TypingPolicy.DELAYED, 0.0, (), 0),
+        (TypingPolicy.DELAYED, 0.05, (), 1),
+        (TypingPolicy.DELAYED, 0.0, ("invalid",), 0),
+    ],
+)
+def test_typing_policy(policy: str, delay: float, args: Tuple[str, ...], expected: int):
+    cog = SlowCog(None)
+    cog.typing_policy = policy
+    cog.typing_delay = 0.01
+    cog.delay = delay
+    ctx = FakeContext()
+    asyncio.run(cog.execute(ctx, args))
+    assert ctx.typing_count == expected
+    assert len(ctx.sent) == 1
+
+
+class ReportCog(commands.Cog, CogHelper):
+    single_flight = True
+
+    def __init__(self, bot):
+        super().__init__(bot)
+        self.parsed = 0
+        self.executed = 0
+
+    def _parse_args(self, ctx, args: Dict[str, str]):
+        self.parsed += 1
+        self.fail = "fail" in args
+        self.crash = "crash" in args
+
+    async def _execute(self, ctx):
+        self.executed += 1
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise ExecutionError(ctx, reason="failed")
+        await ctx.send("report", embed=None)
+        if self.crash:
+            raise RuntimeError("crashed")
+
+
+@pytest.mark.parametrize(
+    "single_flight, invocations, expected",
+    [
+        (True, [("a=1", "b=2"), ("b=2", "a=1"), ("a=1", "b=2")], 1),
+        (True, [("a=1",), ("a=2",), ("a=1",)], 2),
+        (False, [("a=1",), ("a=1",), ("a=1",)], 3),
+    ],
+)
+def test_execute_single_flight(single_flight: bool, invocations, expected: int):
+    cog = ReportCog(None)
+    cog.single_flight = single_flight
+    channel = FakeContext().channel
+    contexts = [FakeContext(channel=channel) for _ in invocations]
+
+    async def run():
+        await asyncio.gather(
+            *(cog.execute(ctx, args) for ctx, args in zip(contexts, invocations))
+        )
+
+    asyncio.run(run())
+    assert cog.parsed == expected
+    assert cog.executed == expected
+    assert [ctx.sent for ctx in contexts] == [[dict(content="report", embed=None)]] * 3
+    assert cog._flights == {}
+
+
+def test_execute_single_flight_error_and_channels():
+    cog = ReportCog(None)
+    cog.instrumentation = Instrumentation()
+    memory = MemorySink()
+    cog.instrumentation.add_sink(memory)
+    channel = FakeContext().channel
+    contexts = [
+        FakeContext(channel=channel),
+        FakeContext(channel=channel),
+        FakeContext(channel=FakeTextChannel(11)),
+    ]
+
+    async def run():
+        await asyncio.gather(*(cog.execute(ctx, ("fail",)) for ctx in contexts))
+
+    asyncio.run(run())
+    # another channel does not share
+    assert cog.executed == 2
+    assert all(ctx.sent[0]["embed"].title == "⚠️Execution Error" for ctx in contexts)
+    statuses = sorted(record.status for record in memory.records)
+    assert statuses == ["execution_error", "execution_error", "shared"]
+
+
+def test_execute_single_flight_error_dispatcher():
+    async def run():
+        cog = ReportCog(None)
+        cog.error_dispatcher = ErrorDispatcher(window=0.01)
+        contexts = [FakeContext(channel=FakeTextChannel(10 + i // 2)) for i in range(4)]
+        await asyncio.gather(*(cog.execute(ctx, ("fail",)) for ctx in contexts))
+        await cog.error_dispatcher.join()
+        return cog, contexts
+
+    cog, contexts = asyncio.run(run())
+    assert cog.executed == 2
+    # the waiting invocations dispatch the error by themselves
+    assert [ctx.channel.id for ctx in contexts] == [10, 10, 11, 11]
+    titles = [[message["embed"].title for message in ctx.sent] for ctx in contexts]
+    assert titles == [["⚠️Execution Error"]] * 4
+
+
+def test_execute_single_flight_exception():
+    cog = ReportCog(None)
+    channel = FakeContext().channel
+    contexts = [FakeContext(channel=channel) for _ in range(3)]
+
+    async def run():
+        return await asyncio.gather(
+            *(cog.execute(ctx, ("crash",)) for ctx in contexts), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert cog.executed == 1
+    assert [str(result) for result in results] == ["crashed"] * 3
+    # the partial output is not replayed as a success
+    assert [len(ctx.sent) for ctx in contexts] == [1, 0, 0]
+    assert cog._flights == {}
+
+
+def test_execute_single_flight_cancelled_leader():
+    cog = ReportCog(None)
+    channel = FakeContext().channel
+    contexts = [FakeContext(channel=channel) for _ in range(3)]
+
+    async def run():
+        tasks = [asyncio.ensure_future(cog.execute(ctx, ("a=1",))) for ctx in contexts]
+        await asyncio.sleep(0.005)
+        tasks[0].cancel()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert results[1:] == [None, None]
+    # one of the waiting invocations runs instead and the other shares it
+    assert cog.executed == 2
+    assert [len(ctx.sent) for ctx in contexts] == [0, 1, 1]
+    assert cog._flights == {}
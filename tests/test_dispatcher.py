@@ -0,0 +1,86 @@
+import asyncio
+
+from discord import Embed
+
+from discord_ext_commands_coghelper import ErrorDispatcher
+from discord_ext_commands_coghelper.testing import FakeContext, FakeTextChannel
+from tests.test_coghelper import SampleCog
+
+
+def _render(title: str):
+    return lambda count: Embed(title=f"{title} x{count}")
+
+
+def test_dispatcher_coalesce():
+    async def run():
+        dispatcher = ErrorDispatcher(window=0.05)
+        ctx = FakeContext()
+        for _ in range(10):
+            dispatcher.dispatch(ctx, "error", _render("error"))
+        await dispatcher.join()
+        # within the window, sent after it expires
+        for _ in range(3):
+            dispatcher.dispatch(ctx, "error", _render("error"))
+        assert dispatcher.queue_depth() == 1
+        await dispatcher.join()
+        return dispatcher, ctx
+
+    dispatcher, ctx = asyncio.run(run())
+    assert [sent["embed"].title for sent in ctx.sent] == ["error x10", "error x3"]
+    assert dispatcher.stats.coalesced == 11
+    assert dispatcher.stats.sent == 2
+    assert dispatcher.queue_depth() == 0
+
+
+def test_dispatcher_rate_limit():
+    async def run():
+        dispatcher = ErrorDispatcher(rate=50, burst=2, max_queue=4)
+        ctx = FakeContext()
+        other = FakeContext(channel=FakeTextChannel(11))
+        results = [dispatcher.dispatch(ctx, i, _render(str(i))) for i in range(6)]
+        dispatcher.dispatch(other, 0, _render("other"))
+        assert dispatcher.queue_depth(ctx.channel.id) == 4
+        start = asyncio.get_event_loop().time()
+        await dispatcher.join()
+        return dispatcher, ctx, results, asyncio.get_event_loop().time() - start
+
+    dispatcher, ctx, results, elapsed = asyncio.run(run())
+    assert results == [True] * 4 + [False] * 2
+    assert len(ctx.sent) == 4
+    assert dispatcher.stats.dropped == 2
+    assert dispatcher.stats.sent == 5
+    # 2 by burst, 2 paced at 50 per second
+    assert elapsed >= 0.03
+
+
+def test_execute_with_dispatcher():
+    async def run():
+        cog = SampleCog(None)
+        cog.error_dispatcher = ErrorDispatcher()
+        ctx = FakeContext()
+        await asyncio.gather(*[cog.execute(ctx, ("invalid",)) for _ in range(5)])
+        await cog.error_dispatcher.join()
+        return ctx
+
+    ctx = asyncio.run(run())
+    assert len(ctx.sent) == 1
+    assert ctx.sent[0]["embed"].title == "⚠️Argument Error (x5)"
+
+
+def test_dispatcher_send_failure():
+    def broken(count):
+        raise TypeError("bad embed")
+
+    async def run():
+        dispatcher = ErrorDispatcher()
+        ctx = FakeContext()
+        dispatcher.dispatch(ctx, "broken", broken)
+        dispatcher.dispatch(ctx, "b", _render("b"))
+        await dispatcher.join()
+        return dispatcher, ctx
+
+    dispatcher, ctx = asyncio.run(run())
+    # the failure does not stop the channel
+    assert [message["embed"].title for message in ctx.sent] == ["b x1"]
+    assert dispatcher.stats.failed == 1
+    assert dispatcher.stats.sent == 1
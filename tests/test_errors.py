@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import pytest
+
+from discord_ext_commands_coghelper import (
+    ArgumentError,
+    ChannelNotFoundError,
+    EmbedTemplate,
+    ExecutionError,
+    UserNotFoundError,
+)
+
+CTX = SimpleNamespace(message=SimpleNamespace(content="!command"))
+
+
+@pytest.mark.parametrize(
+    ("error", "title", "fields"),
+    [
+        (ArgumentError(CTX, key="value"), "⚠️Argument Error", [("key", "value")]),
+        (ExecutionError(CTX, title="⚠️Failed"), "⚠️Failed", []),
+        (ChannelNotFoundError(CTX, 10), "⚠️Channel NotFound", [("channel_id", "10")]),
+        (UserNotFoundError(CTX, 20), "⚠️User NotFound", [("user_id", "20")]),
+    ],
+)
+def test_to_embed(error, title, fields):
+    embed = error.to_embed()
+    assert embed.title == title
+    assert embed.description == "!command"
+    assert [(field.name, field.value) for field in embed.fields] == fields
+
+
+def test_to_embed_new_instance():
+    error = ChannelNotFoundError(CTX, 10)
+    first = error.to_embed()
+    first.add_field(name="added", value="value")
+    first.title = "changed"
+    second = error.to_embed(count=3)
+    assert second.title == "⚠️Channel NotFound (x3)"
+    assert len(second.fields) == 1
+
+
+def test_embed_template():
+    template = EmbedTemplate(colour=0xFF0000, footer="footer", inline=False)
+    embed = template.render("title", None, (("a", "1"),))
+    assert embed.colour.value == 0xFF0000
+    assert embed.footer.text == "footer"
+    assert embed.fields[0].inline is False
+    assert "description" not in embed.to_dict()
+
+
+def test_to_embed_current_values():
+    class Cause:
+        value = "old"
+
+        def __str__(self):
+            return self.value
+
+    cause = Cause()
+    error = ExecutionError(CTX, cause=cause)
+    assert error.to_embed().fields[0].value == "old"
+    cause.value = "new"
+    assert error.to_embed().fields[0].value == "new"
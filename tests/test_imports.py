@@ -0,0 +1,87 @@
+import importlib
+import subprocess
+import sys
+from typing import Dict
+
+import pytest
+
+import discord_ext_commands_coghelper
+import discord_ext_commands_coghelper.utils
+
+
+def import_times(statement: str) -> Dict[str, int]:
+    """Run the statement in a new interpreter and return the cumulative import time of each module in microseconds"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "import discord_ext_commands_coghelper",
+        "import discord_ext_commands_coghelper.utils",
+        "from discord_ext_commands_coghelper.utils.misc import try_strptime",
+        "from discord_ext_commands_coghelper.utils import get_bool, Constant",
+        "from discord_ext_commands_coghelper import tokenize_args",
+    ],
+)
+def test_import_does_not_load_discord(statement: str):
+    times = import_times(statement)
+    assert "discord_ext_commands_coghelper" in times
+    assert "discord" not in times
+    assert "discord.ext.commands" not in times
+
+
+def test_import_loads_on_access():
+    times = import_times("from discord_ext_commands_coghelper import CogHelper")
+    assert "discord.ext.commands" in times
+
+
+@pytest.mark.parametrize(
+    "package", [discord_ext_commands_coghelper, discord_ext_commands_coghelper.utils]
+)
+def test_lazy_names(package):
+    for name in package.__all__:
+        assert getattr(package, name) is not None
+        assert name in dir(package)
+    with pytest.raises(AttributeError):
+        getattr(package, "unknown_name")
+
+
+def test_submodule_attributes():
+    # in a new interpreter, the submodules are not imported yet
+    statement = "; ".join(
+        [
+            "import discord_ext_commands_coghelper as pkg",
+            "assert 'errors' in dir(pkg) and 'misc' in dir(pkg.utils)",
+            "assert pkg.errors.ArgumentError is pkg.ArgumentError",
+            "assert pkg.coghelper.CogHelper is pkg.CogHelper",
+            "assert pkg.testing.FakeContext",
+            "assert pkg.utils.misc.try_strptime is pkg.utils.try_strptime",
+            "assert pkg.utils.dict.get_bool is pkg.utils.get_bool",
+            "assert pkg.utils.contant.Constant is pkg.utils.Constant",
+        ]
+    )
+    subprocess.run([sys.executable, "-c", statement], check=True)
+    with pytest.raises(AttributeError):
+        getattr(discord_ext_commands_coghelper.utils, "unknown_module")
+
+
+def test_star_import():
+    namespace = {}
+    exec("from discord_ext_commands_coghelper import *", namespace)
+    assert namespace["CogHelper"] is discord_ext_commands_coghelper.CogHelper
+    module = importlib.import_module("discord_ext_commands_coghelper.utils.dict")
+    assert discord_ext_commands_coghelper.utils.get_bool is module.get_bool
@@ -0,0 +1,52 @@
+import asyncio
+import json
+import logging
+
+from discord_ext_commands_coghelper import get_logger, JsonFormatter
+from discord_ext_commands_coghelper.testing import FakeContext
+from tests.test_coghelper import SampleCog
+
+
+class CountingStr:
+    def __init__(self):
+        self.count = 0
+
+    def __str__(self):
+        self.count += 1
+        return "value"
+
+
+def test_structured_logger_disabled():
+    logger = get_logger("tests.disabled")
+    logger.logger.setLevel(logging.WARNING)
+    value = CountingStr()
+    logger.debug("event", value=value)
+    assert value.count == 0
+
+
+def test_structured_logger_fields(caplog):
+    logger = get_logger("tests.fields")
+    with caplog.at_level(logging.DEBUG, logger="tests.fields"):
+        logger.debug("event", FakeContext(command="sample"), duration=0.5)
+    record = caplog.records[0]
+    assert record.event == "event"
+    assert record.fields == dict(
+        command="sample", guild_id=1, channel_id=10, user_id=100, duration=0.5
+    )
+    assert record.getMessage().startswith("event command=sample guild_id=1")
+    assert record.funcName == "test_structured_logger_fields"
+
+    data = json.loads(JsonFormatter().format(record))
+    assert data["duration"] == 0.5
+    assert data["event"] == "event"
+
+
+def test_execute_logging(caplog):
+    with caplog.at_level(logging.DEBUG, logger="discord_ext_commands_coghelper"):
+        asyncio.run(SampleCog(None).execute(FakeContext(), ("invalid",)))
+    assert [record.event for record in caplog.records] == [
+        "execute",
+        "send ArgumentError",
+        "executed",
+    ]
+    assert "duration" in caplog.records[-1].fields
@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+import pytest
+from discord.ext import commands
+
+from discord_ext_commands_coghelper import (
+    CogHelper,
+    CpuPool,
+    ExecutionError,
+    PoolKind,
+)
+from discord_ext_commands_coghelper.testing import FakeContext
+
+
+def _count_words(contents):
+    counts = {}
+    for content in contents:
+        for word in content.split():
+            counts[word] = counts.get(word, 0) + 1
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+
+def _sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+@pytest.mark.parametrize("kind", [PoolKind.PROCESS, PoolKind.THREAD])
+def test_cpu_pool_run(kind: str):
+    pool = CpuPool(max_workers=2, kind=kind)
+    try:
+        result = asyncio.run(pool.run(FakeContext(), _count_words, ["a b", "b c", "b"]))
+    finally:
+        pool.shutdown()
+    assert result == [("b", 3), ("a", 1), ("c", 1)]
+    assert pool.stats.submitted == 1
+    assert pool.stats.completed == 1
+    assert pool.active == 0
+
+
+def test_cpu_pool_timeout():
+    pool = CpuPool(max_workers=1, kind=PoolKind.THREAD, timeout=0.01)
+    try:
+        with pytest.raises(ExecutionError) as info:
+            asyncio.run(pool.run(FakeContext(), _sleep, 0.1))
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(pool.run(None, _sleep, 0.1))
+        # the first run keeps the worker busy until it finishes, the queued second one is dropped
+        assert pool.active == 1
+    finally:
+        pool.shutdown()
+    assert info.value.causes == {"timeout": "0.01s"}
+    assert pool.stats.timeouts == 2
+    assert pool.active == 0
+
+
+def test_cpu_pool_cancel_for_message():
+    pool = CpuPool(max_workers=1, kind=PoolKind.THREAD)
+
+    async def run():
+        ctx = FakeContext(message_id=5)
+        other = FakeContext(message_id=6)
+        tasks = [
+            asyncio.ensure_future(pool.run(ctx, _sleep, 0.05)),
+            asyncio.ensure_future(pool.run(ctx, _sleep, 0.05)),
+            asyncio.ensure_future(pool.run(other, _sleep, 0.05)),
+        ]
+        await asyncio.sleep(0.01)
+        assert pool.active == 3
+        assert pool.queued == 2
+        assert pool.utilization == 1.0
+        pool.on_message_delete(ctx.message)
+        await asyncio.sleep(0.01)
+        # the queued run is dropped, the executing one is counted until it finishes
+        assert pool.active == 2
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        pool.shutdown()
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert isinstance(results[1], asyncio.CancelledError)
+    assert results[2] == 0.05
+    assert pool.stats.cancelled == 2
+    assert pool.stats.completed == 1
+    assert pool.utilization == 0.0
+
+
+class ReportCog(commands.Cog, CogHelper):
+    def _parse_args(self, ctx, args):
+        self.contents = [value for key, value in sorted(args.items())]
+
+    async def _execute(self, ctx):
+        ranking = await self.run_cpu_bound(ctx, _count_words, self.contents)
+        await ctx.send(str(ranking[0]))
+
+
+@pytest.mark.parametrize("pool", [None, CpuPool(max_workers=1, kind=PoolKind.THREAD)])
+def test_run_cpu_bound(pool):
+    cog = ReportCog(None)
+    cog.cpu_pool = pool
+    ctx = FakeContext()
+    asyncio.run(cog.execute(ctx, ("a=x y", "b=y")))
+    assert ctx.sent[0]["content"] == "('y', 2)"
+    if pool is not None:
+        assert pool.stats.completed == 1
+        pool.shutdown()
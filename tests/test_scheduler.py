@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+from discord.ext import commands
+
+from discord_ext_commands_coghelper import (
+    CogHelper,
+    ExecutionError,
+    ExecutionScheduler,
+    Instrumentation,
+    MemorySink,
+)
+from discord_ext_commands_coghelper.testing import FakeContext, FakeGuild, FakeMember
+
+
+def _ctx(guild_id: int = 1, user_id: int = 100, command: str = "report") -> FakeContext:
+    return FakeContext(
+        command=command, guild=FakeGuild(guild_id, []), author=FakeMember(user_id)
+    )
+
+
+async def _hold(scheduler: ExecutionScheduler, ctx, order, seconds: float = 0.01):
+    ticket = await scheduler.acquire(ctx)
+    order.append(ctx.guild.id)
+    await asyncio.sleep(seconds)
+    ticket.release()
+
+
+@pytest.mark.parametrize(
+    "limits, contexts, expected",
+    [
+        (dict(per_guild=1), [_ctx(1), _ctx(1), _ctx(2)], 2),
+        (dict(per_user=1), [_ctx(1, 100), _ctx(2, 100), _ctx(1, 101)], 2),
+        (dict(per_command=2), [_ctx(1), _ctx(2), _ctx(3), _ctx(3, command="x")], 3),
+    ],
+)
+def test_scheduler_limits(limits, contexts, expected):
+    scheduler = ExecutionScheduler(**limits)
+
+    async def run():
+        tasks = [asyncio.ensure_future(_hold(scheduler, ctx, [])) for ctx in contexts]
+        await asyncio.sleep(0)
+        running = scheduler.running
+        await asyncio.gather(*tasks)
+        return running
+
+    assert asyncio.run(run()) == expected
+    assert scheduler.running == 0
+    assert scheduler.queue_depth() == 0
+    assert scheduler.stats.admitted == len(contexts)
+
+
+def test_scheduler_round_robin():
+    scheduler = ExecutionScheduler(per_command=1)
+    order = []
+
+    async def run():
+        busy = [_ctx(1, user) for user in range(5)]
+        quiet = [_ctx(2), _ctx(3)]
+        tasks = [asyncio.ensure_future(_hold(scheduler, c, order, 0.001)) for c in busy]
+        await asyncio.sleep(0)
+        tasks += [asyncio.ensure_future(_hold(scheduler, c, order, 0.001)) for c in quiet]
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth(1) == 4
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    # the quiet guilds do not wait for all executions of the busy guild
+    assert order[:4] == [1, 1, 2, 3]
+
+
+def test_scheduler_overflow_and_cancel():
+    scheduler = ExecutionScheduler(per_guild=1, max_queue=1, overflow_title="Busy")
+
+    async def run():
+        first = asyncio.ensure_future(_hold(scheduler, _ctx(), [], 0.05))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(_hold(scheduler, _ctx(), []))
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutionError) as info:
+            await scheduler.acquire(_ctx())
+        second.cancel()
+        await asyncio.gather(second, return_exceptions=True)
+        assert scheduler.queue_depth() == 0
+        await first
+        return info.value
+
+    error = asyncio.run(run())
+    assert error.title == "⚠️Busy"
+    assert error.causes == {"queue": 1}
+    assert scheduler.stats.rejected == 1
+    assert scheduler.stats.cancelled == 1
+    assert scheduler.running == 0
+
+
+class SlowCog(commands.Cog, CogHelper):
+    def _parse_args(self, ctx, args):
+        pass
+
+    async def _execute(self, ctx):
+        await asyncio.sleep(0.02)
+        await ctx.send("done")
+
+
+def test_execute_with_scheduler():
+    cog = SlowCog(None)
+    cog.scheduler = ExecutionScheduler(per_guild=1, max_queue=1)
+    memory = MemorySink()
+    cog.instrumentation = Instrumentation(sinks=[memory])
+    contexts = [_ctx(), _ctx(), _ctx()]
+
+    async def run():
+        await asyncio.gather(*(cog.execute(ctx, ()) for ctx in contexts))
+
+    asyncio.run(run())
+    assert [c.sent[0].get("content") for c in contexts] == ["done", "done", None]
+    assert contexts[2].sent[0]["embed"].title == "⚠️Too Many Requests"
+    statuses = [record.status for record in memory.records]
+    assert sorted(statuses) == ["ok", "ok", "rejected"]
+    waited = [r.phases["queue"] for r in memory.records if r.status == "ok"]
+    assert max(waited) >= 0.015
+    assert all("queue" in record.phases for record in memory.records)
+
+
+class EchoCog(commands.Cog, CogHelper):
+    def _parse_args(self, ctx, args):
+        # state on the cog, as cogs parsing by themselves usually keep it
+        self.n = args["n"]
+
+    async def _execute(self, ctx):
+        await asyncio.sleep(0.01)
+        await ctx.send(self.n)
+
+
+def test_execute_with_scheduler_args():
+    cog = EchoCog(None)
+    cog.scheduler = ExecutionScheduler(per_guild=1)
+    contexts = [_ctx(), _ctx(), _ctx()]
+
+    async def run():
+        await asyncio.gather(
+            *(cog.execute(ctx, (f"n={i}",)) for i, ctx in enumerate(contexts))
+        )
+
+    asyncio.run(run())
+    assert [c.sent[0]["content"] for c in contexts] == ["0", "1", "2"]
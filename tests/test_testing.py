@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+import discord
+import pytest
+from discord.ext import commands
+
+from discord_ext_commands_coghelper import ChannelNotFoundError, CogHelper
+from discord_ext_commands_coghelper.testing import (
+    FakeMessage,
+    FakeRuntime,
+    FakeTextChannel,
+    make_guild,
+    run_load,
+)
+from discord_ext_commands_coghelper.utils import LocationCache, find_text_channel
+
+
+class FindCog(commands.Cog, CogHelper):
+    typing_policy = "never"
+
+    def _parse_args(self, ctx, args):
+        self.message_id = int(args["message_id"])
+
+    async def _execute(self, ctx):
+        result = await find_text_channel(
+            ctx.guild, self.message_id, hint=ctx.channel, cache=LocationCache()
+        )
+        if result is None:
+            raise ChannelNotFoundError(ctx, self.message_id)
+        await ctx.send(result[1].content)
+
+
+def test_make_guild():
+    guild = make_guild(1, channels=3, messages=4)
+    assert len(guild.channels) == 3
+    assert guild.created_at <= guild.channels[0].created_at
+    ids = [m.id for c in guild.channels for m in c._messages.values()]
+    assert ids == sorted(ids)
+    assert all(c.last_message_id == max(c._messages) for c in guild.channels)
+    assert make_guild(2).id != guild.id
+
+
+@pytest.mark.parametrize(
+    "message_ids, last_message_id, expected",
+    [
+        ([5, 7], None, 7),
+        ([5, 7], 3, 7),
+        ([5, 7], 9, 9),
+        ([], 3, 3),
+    ],
+)
+def test_fake_text_channel_last_message_id(message_ids, last_message_id, expected: int):
+    messages = [FakeMessage(message_id) for message_id in message_ids]
+    channel = FakeTextChannel(1, messages, last_message_id=last_message_id)
+    assert channel.last_message_id == expected
+    channel.add_message(FakeMessage(expected + 1))
+    assert channel.last_message_id == expected + 1
+
+
+@pytest.mark.parametrize(
+    "kwargs, error",
+    [
+        (dict(not_found_rate=1.0), discord.NotFound),
+        (dict(forbidden_rate=1.0), discord.Forbidden),
+    ],
+)
+def test_runtime_errors(kwargs, error):
+    runtime = FakeRuntime(seed=0, **kwargs)
+    guild = make_guild(1, channels=1, runtime=runtime)
+    channel = guild.channels[0]
+    with pytest.raises(error):
+        asyncio.run(channel.fetch_message(channel.last_message_id))
+    assert runtime.http_calls["fetch_message"] == 1
+
+
+def test_runtime_rate_limit():
+    runtime = FakeRuntime(rate_limit=100)
+
+    async def run():
+        await asyncio.gather(*(runtime.request("send") for _ in range(110)))
+
+    started_at = time.perf_counter()
+    asyncio.run(run())
+    assert time.perf_counter() - started_at >= 0.09
+    assert runtime.rate_limited == 10
+    assert runtime.http_calls["send"] == 110
+
+
+def test_run_load():
+    runtime = FakeRuntime(latency=0.001)
+    guilds = [make_guild(i, channels=4, messages=2, runtime=runtime) for i in range(3)]
+
+    def args(index, guild):
+        if index % 10 == 9:
+            return ("message_id=1",)
+        return (f"message_id={guild.channels[index % 4].last_message_id}",)
+
+    report = asyncio.run(run_load(FindCog(None), guilds, 30, args, concurrency=10))
+    assert report.executions == 30
+    assert report.failures == 0
+    assert report.error_replies == 3
+    assert report.http_calls["send"] == 30
+    assert report.http_calls == runtime.http_calls
+    # the hint channel finds the message at once, others fall back to the search, unknown IDs are pruned
+    assert 1.5 <= report.http_calls_per_command <= 5
+    assert report.latency(99) >= report.latency(50) > 0.001
+    assert report.throughput > 0
+    assert set(report.to_dict()["latency"]) == {50, 90, 99}
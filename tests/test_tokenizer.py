@@ -0,0 +1,49 @@
+from typing import Tuple, Any, Dict
+
+import pytest
+
+from discord_ext_commands_coghelper.tokenizer import (
+    tokenize_arg,
+    tokenize_args,
+    clear_tokenizer_cache,
+    tokenizer_cache_info,
+)
+
+
+@pytest.mark.parametrize(
+    ("arg", "expected"),
+    [
+        ("key=value", ("key", "value")),
+        ("flag", ("flag", "True")),
+        ("a=b=c", ("a", "b=c")),
+        ("key=", ("key", "")),
+        ('key="a b"', ("key", "a b")),
+        ("key='a=b'", ("key", "a=b")),
+        ("key=\"unbalanced'", ("key", "\"unbalanced'")),
+        ('key="', ("key", '"')),
+    ],
+)
+def test_tokenize_arg(arg: str, expected: Tuple[str, str]):
+    assert tokenize_arg(arg) == expected
+
+
+@pytest.mark.parametrize(
+    ("args", "expected"),
+    [
+        (("a=1", "b", "c=x=y"), dict(a="1", b="True", c="x=y")),
+        (("a=1", 10, None, "a=2"), dict(a="2")),
+        ((), dict()),
+        ((["unhashable"], "a=1"), dict(a="1")),
+    ],
+)
+def test_tokenize_args(args: Tuple[Any, ...], expected: Dict[str, str]):
+    assert tokenize_args(args) == expected
+
+
+def test_tokenize_args_cache():
+    clear_tokenizer_cache()
+    first = tokenize_args(("a=1", "b=2"))
+    first["a"] = "modified"
+    second = tokenize_args(("a=1", "b=2"))
+    assert second == dict(a="1", b="2")
+    assert tokenizer_cache_info().hits == 1
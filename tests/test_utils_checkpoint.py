@@ -0,0 +1,132 @@
+import asyncio
+import datetime
+import threading
+
+import discord
+import pytest
+
+from discord_ext_commands_coghelper.utils import (
+    Checkpoint,
+    CheckpointStore,
+    IncrementalAggregator,
+    MemoryCheckpointStore,
+    SqliteCheckpointStore,
+)
+from discord_ext_commands_coghelper.testing import FakeMessage, FakeTextChannel
+from discord_ext_commands_coghelper.utils import checkpoint as checkpoint_module
+
+BASE = datetime.datetime(2020, 1, 1)
+
+
+def _snowflake(minutes: int) -> int:
+    return discord.utils.time_snowflake(BASE + datetime.timedelta(minutes=minutes))
+
+
+def _add_messages(channel: FakeTextChannel, start: int, stop: int):
+    for minute in range(start, stop):
+        channel.add_message(FakeMessage(_snowflake(minute), content=f"m{minute}"))
+
+
+def _count(state, messages):
+    return {
+        "count": state["count"] + len(messages),
+        "chars": state["chars"] + sum(len(m.content) for m in messages),
+    }
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path) -> CheckpointStore:
+    if request.param == "memory":
+        yield MemoryCheckpointStore()
+        return
+    store = SqliteCheckpointStore(str(tmp_path / "checkpoints.db"))
+    yield store
+    store.close()
+
+
+def test_checkpoint_store(store: CheckpointStore):
+    assert store.get("report", 1) is None
+    store.set("report", 1, Checkpoint(100, {"count": 3}, 0.0))
+    store.set("report", 2, Checkpoint(200, {"count": 4}, 0.0))
+    store.set("other", 1, Checkpoint(300, [1, 2], 0.0))
+    assert store.get("report", 1) == Checkpoint(100, {"count": 3}, 0.0)
+    assert store.get("other", 1) == Checkpoint(300, [1, 2], 0.0)
+    store.delete("report", 1)
+    assert store.get("report", 1) is None
+    assert store.get("report", 2) is not None
+    store.delete("report")
+    assert store.get("report", 2) is None
+    assert store.get("other", 1) is not None
+
+
+def test_incremental_aggregator(store: CheckpointStore):
+    channels = [FakeTextChannel(_snowflake(0) - i) for i in range(3)]
+    for channel in channels:
+        _add_messages(channel, 1, 251)
+    aggregator = IncrementalAggregator(
+        store, "report", lambda: {"count": 0, "chars": 0}, _count
+    )
+
+    states = asyncio.run(aggregator.aggregate(channels, concurrency=2))
+    assert [states[c.id]["count"] for c in channels] == [250, 250, 250]
+    assert [c.history_count for c in channels] == [3, 3, 3]
+    checkpoint = aggregator.checkpoint(channels[0])
+    assert checkpoint.last_message_id == _snowflake(250)
+    assert checkpoint.last_message_at == BASE + datetime.timedelta(minutes=250)
+
+    # only the new messages are fetched and merged
+    _add_messages(channels[0], 251, 261)
+    states = asyncio.run(aggregator.aggregate(channels, concurrency=2))
+    assert [states[c.id]["count"] for c in channels] == [260, 250, 250]
+    assert [c.history_count for c in channels] == [4, 4, 4]
+    expected = sum(len(f"m{minute}") for minute in range(1, 261))
+    assert states[channels[0].id]["chars"] == expected
+
+    aggregator.reset(channels[0])
+    states = asyncio.run(aggregator.aggregate(channels[0]))
+    assert states[channels[0].id]["count"] == 260
+
+
+def test_incremental_aggregator_after():
+    channel = FakeTextChannel(_snowflake(0))
+    _add_messages(channel, 1, 101)
+    aggregator = IncrementalAggregator(
+        MemoryCheckpointStore(), "report:after", lambda: {"count": 0, "chars": 0}, _count
+    )
+    after = (BASE + datetime.timedelta(minutes=60, seconds=30)).replace(
+        tzinfo=datetime.timezone.utc
+    )
+    states = asyncio.run(aggregator.aggregate([channel], after))
+    assert states[channel.id]["count"] == 40
+
+
+def test_sqlite_checkpoint_store_in_event_loop(tmp_path, monkeypatch):
+    threads = []
+    apply = checkpoint_module._apply_checkpoint_writes
+
+    def record_thread(connection, writes):
+        threads.append(threading.current_thread())
+        apply(connection, writes)
+
+    monkeypatch.setattr(checkpoint_module, "_apply_checkpoint_writes", record_thread)
+    path = str(tmp_path / "checkpoints.db")
+    store = SqliteCheckpointStore(path)
+    threads.clear()
+
+    async def run():
+        for page in range(10):
+            store.set("report", 1, Checkpoint(page, {"count": page}, 0.0))
+            # buffered checkpoints are visible before they are committed
+            assert store.get("report", 1).last_message_id == page
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+    # committed off the event loop, fewer times than written
+    assert threads
+    assert threading.main_thread() not in threads
+    assert len(threads) < 10
+    store.close()
+
+    store = SqliteCheckpointStore(path)
+    assert store.get("report", 1) == Checkpoint(9, {"count": 9}, 0.0)
+    store.close()
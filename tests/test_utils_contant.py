@@ -0,0 +1,76 @@
+import pytest
+
+from discord_ext_commands_coghelper.utils import Constant, ConstantError
+
+
+class Color(Constant):
+    RED = "red"
+    GREEN = "green"
+    GRAY = "gray"
+
+
+class MoreColor(Color):
+    GREY = "gray"
+    BLUE = "Blue"
+    SIZES = [1, 2]
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("red", "red"),
+        ("RED", "red"),
+        ("Red", "red"),
+        ("r", "red"),
+        ("gree", "green"),
+        ("gre", None),
+        ("gr", None),
+        ("gra", "gray"),
+        ("grey", "gray"),
+        ("blue", "Blue"),
+        ("b", "Blue"),
+        ("SIZES", [1, 2]),
+        ("", None),
+        ("yellow", None),
+        (None, None),
+        ([1, 2], None),
+    ],
+)
+def test_find(text, expected):
+    assert MoreColor.find(text) == expected
+
+
+def test_find_default():
+    missing = object()
+    assert Color.find("grey", missing) is missing
+    assert Color.find("g", missing) is missing
+
+
+def test_constants():
+    assert dict(Color.constants()) == dict(RED="red", GREEN="green", GRAY="gray")
+    assert list(MoreColor.constants()) == ["RED", "GREEN", "GRAY", "GREY", "BLUE", "SIZES"]
+    assert Color.choices() == ("red", "green", "gray")
+    assert MoreColor.name_of("gray") == "GRAY"
+    assert MoreColor.name_of([1, 2]) is None
+    assert Color.name_of("Blue") is None
+    with pytest.raises(TypeError):
+        MoreColor.constants()["RED"] = "blue"
+
+
+def test_constant_errors():
+    with pytest.raises(ConstantError):
+        Color.RED = "blue"
+    with pytest.raises(ConstantError):
+        Color()
+    with pytest.raises(ConstantError):
+
+        class Rebind(Color):
+            RED = "crimson"
+
+    class Other(Constant):
+        RED = "crimson"
+
+    with pytest.raises(ConstantError):
+
+        class Collision(Color, Other):
+            pass
@@ -8,7 +8,11 @@ from discord_ext_commands_coghelper.utils import (
     get_list,
     get_datetime,
     get_datetime_fmts,
+    get_choice,
+    Constant,
 )
+from discord_ext_commands_coghelper import ArgumentError
+from discord_ext_commands_coghelper.testing import FakeContext
 
 
 @pytest.mark.parametrize(
@@ -117,3 +121,32 @@ def test_get_datetime_fmts(
     expected: datetime.datetime,
 ):
     assert get_datetime_fmts(dic, key, *fmts, default=default) == expected
+
+
+class Period(Constant):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+@pytest.mark.parametrize(
+    ("dic", "default", "expected"),
+    [
+        (dict(period="week"), None, "week"),
+        (dict(period="Month"), None, "month"),
+        (dict(period="DAY"), None, "day"),
+        (dict(period="w"), None, "week"),
+        (dict(), "day", "day"),
+    ],
+)
+def test_get_choice(dic: Dict[str, str], default: str, expected: str):
+    assert get_choice(FakeContext(), dic, "period", Period, default) == expected
+
+
+@pytest.mark.parametrize("value", ["year", "", "m o"])
+def test_get_choice_error(value: str):
+    with pytest.raises(ArgumentError) as e:
+        get_choice(FakeContext(), dict(period=value), "period", Period)
+    assert e.value.causes == {
+        "period": f"{value} is invalid. (choices: day, week, month)"
+    }
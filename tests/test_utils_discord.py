@@ -1,10 +1,39 @@
+import asyncio
 import datetime
-from typing import Dict, Tuple, List
+import time
+from types import SimpleNamespace
+from typing import Dict, Tuple, List, Optional
 
+import discord
 import pytest
 from discord.ext.commands import Context
 
-from discord_ext_commands_coghelper.utils import get_before_after, get_before_after_fmts
+from discord_ext_commands_coghelper import ArgumentError, UserNotFoundError
+from discord_ext_commands_coghelper.utils import (
+    find_text_channel,
+    find_text_channels,
+    get_default_location_cache,
+    LocationCache,
+    MemoryLocationCache,
+    get_channel_search_stats,
+    resolve_users,
+    UserCache,
+    get_before_after,
+    get_before_after_fmts,
+    get_corrected_before_after_str,
+    get_corrected_before_after_str_many,
+)
+from discord_ext_commands_coghelper.testing import (
+    FakeBot,
+    FakeContext,
+    FakeGuild,
+    FakeTextChannel,
+    FakeMember,
+    FakeMessage,
+    FakeRuntime,
+    make_forbidden,
+    make_guild,
+)
 from tests import JST
 
 
@@ -12,7 +41,7 @@ from tests import JST
     ("ctx", "dic", "fmt", "tzinfo", "expected"),
     [
         (
-            None,  # TODO: Mock Context
+            FakeContext(),
             dict(before="2000-01-31", after="2000-01-01"),
             "%Y-%m-%d",
             None,
@@ -22,14 +51,14 @@ from tests import JST
             ),
         ),
         (
-            None,  # TODO: Mock Context
+            FakeContext(),
             dict(),
             "%Y-%m-%d",
             None,
             (None, None),
         ),
         (
-            None,  # TODO: Mock Context
+            FakeContext(),
             dict(before="2000-01-31", after="2000-01-01"),
             "%Y-%m-%d",
             JST,
@@ -54,7 +83,7 @@ def test_get_before_after(
     ("ctx", "dic", "fmts", "tzinfo", "expected"),
     [
         (
-            None,  # TODO: Mock Context
+            FakeContext(),
             dict(before="20000131", after="20000101"),
             ["%Y-%m-%d", "%Y/%m/%d", "%Y%m%d"],
             None,
@@ -64,14 +93,14 @@ def test_get_before_after(
             ),
         ),
         (
-            None,  # TODO: Mock Context
+            FakeContext(),
             dict(before="2000#01#31", after="2000#01#01"),
             ["%Y-%m-%d", "%Y/%m/%d", "%Y%m%d"],
             None,
             (None, None),
         ),
         (
-            None,  # TODO: Mock Context
+            FakeContext(),
             dict(before="2000/01/31", after="2000/01/01"),
             ["%Y-%m-%d", "%Y/%m/%d", "%Y%m%d"],
             JST,
@@ -92,4 +121,419 @@ def test_get_before_after_fmts(
     assert get_before_after_fmts(ctx, dic, *fmts, tz=tzinfo) == expected
 
 
-# TODO: test get_corrected_before_after_str
+def test_get_before_after_reversed():
+    ctx = FakeContext()
+    dic = dict(before="2000-01-01", after="2000-01-31")
+    with pytest.raises(ArgumentError) as info:
+        get_before_after(ctx, dic, "%Y-%m-%d")
+    assert info.value.causes == {"before": "before must be a future than after."}
+    with pytest.raises(ArgumentError):
+        get_before_after_fmts(ctx, dic, "%Y/%m/%d", "%Y-%m-%d")
+
+
+@pytest.mark.parametrize(
+    ("windows", "expected"),
+    [
+        (
+            [
+                (
+                    datetime.datetime(2000, 1, 31, tzinfo=JST),
+                    datetime.datetime(2000, 1, 1, tzinfo=JST),
+                ),
+                (datetime.datetime(2000, 2, 1, tzinfo=JST), None),
+            ],
+            [("2000-01-31", "2000-01-01"), ("2000-02-01", "1999-12-31")],
+        ),
+        ([], []),
+    ],
+)
+def test_get_corrected_before_after_str(
+    windows: List[Tuple[Optional[datetime.datetime], Optional[datetime.datetime]]],
+    expected: List[Tuple[str, str]],
+):
+    # created_at of discord.py is an utc naive datetime
+    owner = SimpleNamespace(created_at=datetime.datetime(1999, 12, 31, 12))
+    fmts = ["%Y-%m-%d"]
+    assert [
+        get_corrected_before_after_str(before, after, owner, JST, *fmts)
+        for before, after in windows
+    ] == expected
+    assert get_corrected_before_after_str_many(windows, owner, JST, *fmts) == expected
+
+
+@pytest.fixture(autouse=True)
+def clear_location_cache():
+    get_default_location_cache().clear()
+
+
+def _make_guild(count: int, target: int, latency: float = 0.0) -> FakeGuild:
+    channels = [
+        FakeTextChannel(
+            channel_id=100 + i,
+            messages=[FakeMessage(1000)] if i == target else [],
+            latency=latency,
+            forbidden=(i % 5 == 4),
+            last_message_id=2000 + i,
+        )
+        for i in range(count)
+    ]
+    return FakeGuild(1, channels)
+
+
+@pytest.mark.parametrize("concurrency", [1, 4, 50])
+def test_find_text_channel(concurrency: int):
+    guild = _make_guild(20, target=3, latency=0.001)
+    channel, message = asyncio.run(
+        find_text_channel(guild, 1000, concurrency=concurrency)
+    )
+    assert channel.id == 103
+    assert message.id == 1000
+    assert asyncio.run(find_text_channel(guild, 9999, concurrency=concurrency)) is None
+
+
+def test_find_text_channel_cancel():
+    guild = _make_guild(20, target=1, latency=0.05)
+    guild.get_channel(101).latency = 0.001
+    # channels whose last activity is close to the message are probed first
+    channel, _ = asyncio.run(find_text_channel(guild, 1000, concurrency=5))
+    assert channel.id == 101
+    assert guild.fetch_count == 5
+    assert sum(c.cancelled_count for c in guild.channels) == 4
+
+
+def test_find_text_channel_hint():
+    guild = _make_guild(20, target=0)
+    hint = guild.channels[0]
+    channel, _ = asyncio.run(find_text_channel(guild, 1000, hint=hint))
+    assert channel is hint
+    assert guild.fetch_count == 1
+
+
+def test_find_text_channel_http_exception():
+    guild = _make_guild(3, target=-1)
+
+    async def fetch_message(message_id):
+        raise discord.HTTPException(SimpleNamespace(status=500, reason="Error"), "")
+
+    guild.channels[1].fetch_message = fetch_message
+    with pytest.raises(discord.HTTPException):
+        asyncio.run(find_text_channel(guild, 1000, concurrency=3))
+
+
+def test_find_text_channel_cache():
+    cache = MemoryLocationCache()
+    guild = _make_guild(20, target=3)
+    channel, _ = asyncio.run(find_text_channel(guild, 1000, cache=cache))
+    assert cache.get(1000) == channel.id
+    count = guild.fetch_count
+
+    channel, _ = asyncio.run(find_text_channel(guild, 1000, cache=cache))
+    assert channel.id == 103
+    assert guild.fetch_count == count + 1
+
+    assert asyncio.run(find_text_channel(guild, 9999, cache=cache)) is None
+    count = guild.fetch_count
+    assert asyncio.run(find_text_channel(guild, 9999, cache=cache)) is None
+    assert guild.fetch_count == count
+
+
+def test_find_text_channel_forbidden_not_cached():
+    cache = MemoryLocationCache()
+    # the channels 104, 109, ... can not be read
+    guild = _make_guild(20, target=-1)
+    assert asyncio.run(find_text_channel(guild, 1000, cache=cache)) is None
+    assert not cache.is_missing(guild.id, 1000)
+    results = asyncio.run(find_text_channels(guild, [1000, 1001], cache=cache))
+    assert results == {1000: None, 1001: None}
+    assert not cache.is_missing(guild.id, 1001)
+
+    for channel in guild.channels:
+        channel.forbidden = False
+    assert asyncio.run(find_text_channel(guild, 1000, cache=cache)) is None
+    assert cache.is_missing(guild.id, 1000)
+
+def test_find_text_channel_stale_cache():
+    cache = MemoryLocationCache()
+    cache.set(1000, 105)
+    guild = _make_guild(20, target=3)
+    channel, _ = asyncio.run(find_text_channel(guild, 1000, cache=cache))
+    assert channel.id == 103
+    assert cache.get(1000) == 103
+
+
+def test_find_text_channel_pruning():
+    base = datetime.datetime(2020, 1, 1)
+
+    def snowflake(days: int) -> int:
+        return discord.utils.time_snowflake(base + datetime.timedelta(days=days))
+
+    message = FakeMessage(snowflake(10))
+    channels = [
+        # created after the message
+        FakeTextChannel(snowflake(20), last_message_id=snowflake(30)),
+        # last activity before the message
+        FakeTextChannel(snowflake(0), last_message_id=snowflake(5)),
+        FakeTextChannel(snowflake(1), last_message_id=snowflake(300)),
+        FakeTextChannel(snowflake(2), messages=[message], last_message_id=snowflake(11)),
+        FakeTextChannel(snowflake(3), last_message_id=None),
+    ]
+    guild = FakeGuild(1, channels)
+    stats = get_channel_search_stats()
+    stats.reset()
+
+    channel, _ = asyncio.run(find_text_channel(guild, message.id))
+    assert channel is channels[3]
+    assert stats.pruned == 2
+    assert stats.saved_probes == 2
+    assert stats.probes == 1
+
+
+def _snowflake(days: float) -> int:
+    return discord.utils.time_snowflake(
+        datetime.datetime(2020, 1, 1) + datetime.timedelta(days=days)
+    )
+
+
+def _make_batch_guild(runtime: FakeRuntime) -> FakeGuild:
+    # 10 channels with 300 messages each, the message of day n + i / 10 is in the channel i
+    channels = [FakeTextChannel(_snowflake(i), runtime=runtime) for i in range(10)]
+    for n in range(300):
+        for i, channel in enumerate(channels):
+            channel.add_message(FakeMessage(_snowflake(20 + n + i / 10)))
+    return FakeGuild(1, channels, runtime=runtime)
+
+
+def _http_calls(runtime: FakeRuntime) -> int:
+    return sum(runtime.http_calls.values())
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_find_text_channels(concurrency: int):
+    runtime = FakeRuntime()
+    guild = _make_batch_guild(runtime)
+    stats = get_channel_search_stats()
+    stats.reset()
+    expected = {
+        _snowflake(30.3): 3,
+        _snowflake(32.3): 3,
+        _snowflake(220.3): 3,
+        _snowflake(50.7): 7,
+        _snowflake(120.5): 5,
+        # between the messages
+        _snowflake(120.05): None,
+        # after the last message
+        _snowflake(500): None,
+    }
+    results = asyncio.run(
+        find_text_channels(
+            guild, expected, concurrency=concurrency, cache=MemoryLocationCache()
+        )
+    )
+    assert list(results) == list(expected)
+    for message_id, index in expected.items():
+        if index is None:
+            assert results[message_id] is None
+            continue
+        channel, message = results[message_id]
+        assert channel is guild.channels[index]
+        assert message.id == message_id
+    # each channel is counted once, the candidates per Message ID
+    assert stats.channels == 10
+    assert stats.candidates == 10 * len(expected)
+    batch_calls = _http_calls(runtime)
+
+    for message_id in expected:
+        asyncio.run(find_text_channel(guild, message_id, cache=LocationCache()))
+    single_calls = _http_calls(runtime) - batch_calls
+    assert batch_calls < single_calls
+
+
+def test_find_text_channels_cache():
+    runtime = FakeRuntime()
+    guild = _make_batch_guild(runtime)
+    message_ids = [_snowflake(30.3), _snowflake(50.3), _snowflake(500)]
+    cache = MemoryLocationCache()
+    first = asyncio.run(find_text_channels(guild, message_ids, cache=cache))
+    assert cache.get(message_ids[0]) == guild.channels[3].id
+    assert cache.is_missing(guild.id, message_ids[2])
+
+    calls = _http_calls(runtime)
+    stats = get_channel_search_stats()
+    stats.reset()
+    second = asyncio.run(find_text_channels(guild, message_ids, cache=cache))
+    assert second == first
+    # the cached channel is probed once for both IDs and the missing one is skipped
+    assert _http_calls(runtime) == calls + 1
+    assert stats.searches == 3
+    assert stats.cache_hits == 2
+    assert stats.negative_cache_hits == 1
+
+
+@pytest.mark.parametrize("concurrency, peak", [(1, 1), (4, 4)])
+def test_find_text_channels_cache_concurrency(concurrency: int, peak: int):
+    runtime = FakeRuntime(latency=0.01)
+    guild = _make_batch_guild(runtime)
+    tracker = SimpleNamespace(active=0, peak=0)
+    cache = MemoryLocationCache()
+    message_ids = []
+    for i, channel in enumerate(guild.channels[:4]):
+        channel.tracker = tracker
+        for n in (30, 31):
+            message_id = _snowflake(n + i / 10)
+            cache.set(message_id, channel.id)
+            message_ids.append(message_id)
+    results = asyncio.run(
+        find_text_channels(guild, message_ids, concurrency=concurrency, cache=cache)
+    )
+    assert all(results[i][1].id == i for i in message_ids)
+    assert tracker.peak == peak
+
+
+def test_find_text_channels_stale_cache():
+    cache = MemoryLocationCache()
+    cache.set(1000, 105)
+    guild = _make_guild(20, target=3)
+    results = asyncio.run(find_text_channels(guild, [1000, 9999], cache=cache))
+    assert results[1000][0].id == 103
+    assert results[9999] is None
+    assert cache.get(1000) == 103
+
+
+def test_find_text_channels_hint():
+    guild = make_guild(1, channels=5, messages=10)
+    hint = guild.channels[3]
+    message_ids = [m.id for m in hint._messages.values()][2:5]
+    results = asyncio.run(
+        find_text_channels(guild, message_ids, hint=hint, cache=LocationCache())
+    )
+    assert all(results[i][0] is hint for i in message_ids)
+    assert hint.history_count == 1
+    assert guild.fetch_count == 0
+
+
+def _make_user_guild(runtime: FakeRuntime, **kwargs) -> FakeGuild:
+    members = [FakeMember(user_id) for user_id in range(1, 251)]
+    return FakeGuild(1, [], members, runtime=runtime, **kwargs)
+
+
+def test_resolve_users_gateway_cache():
+    runtime = FakeRuntime()
+    ctx = FakeContext(guild=_make_user_guild(runtime))
+    users = asyncio.run(resolve_users(ctx, [3, 1, 2], cache=UserCache()))
+    assert list(users) == [3, 1, 2]
+    assert [user.id for user in users.values()] == [3, 1, 2]
+    assert _http_calls(runtime) == 0
+
+
+@pytest.mark.parametrize(
+    ("members_intent", "route"),
+    [(True, "query_members"), (False, "fetch_member")],
+)
+def test_resolve_users_query(members_intent: bool, route: str):
+    runtime = FakeRuntime()
+    guild = _make_user_guild(
+        runtime, member_cache=False, members_intent=members_intent
+    )
+    ctx = FakeContext(guild=guild)
+    cache = UserCache()
+    user_ids = list(range(1, 151))
+    users = asyncio.run(resolve_users(ctx, user_ids, cache=cache))
+    assert list(users) == user_ids
+    assert all(users[i].id == i for i in user_ids)
+    assert runtime.http_calls[route] == (2 if members_intent else 150)
+
+    # resolved again from the caches without requests
+    calls = _http_calls(runtime)
+    guild._cached_members.clear()
+    asyncio.run(resolve_users(ctx, user_ids, cache=cache))
+    assert _http_calls(runtime) == calls
+
+
+def test_resolve_users_not_found():
+    runtime = FakeRuntime()
+    ctx = FakeContext(guild=_make_user_guild(runtime, member_cache=False))
+    cache = UserCache()
+    with pytest.raises(UserNotFoundError) as info:
+        asyncio.run(resolve_users(ctx, [999, 1, 998], cache=cache))
+    assert info.value.causes == {"user_id": "999, 998"}
+    assert runtime.http_calls["query_members"] == 1
+    assert cache.is_missing(1, 999)
+    assert cache.get(1, 1).id == 1
+
+    with pytest.raises(UserNotFoundError):
+        asyncio.run(resolve_users(ctx, [1, 999], cache=cache))
+    assert runtime.http_calls["query_members"] == 1
+
+
+def test_resolve_users_without_guild():
+    runtime = FakeRuntime()
+    guild = _make_user_guild(runtime)
+    bot = FakeBot([guild], runtime=runtime, users=[FakeMember(1000)])
+    ctx = FakeContext(guild=guild, bot=bot)
+    users = asyncio.run(
+        resolve_users(ctx, [1, 1000], members=False, cache=UserCache())
+    )
+    assert [user.id for user in users.values()] == [1, 1000]
+    assert runtime.http_calls["fetch_user"] == 1
+
+
+class _TrackingBot(FakeBot):
+    def __init__(self, *args, fail: Optional[int] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fail = fail
+        self.active = 0
+        self.peak = 0
+        self.cancelled = 0
+
+    async def fetch_user(self, user_id: int):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            if user_id == self.fail:
+                raise make_forbidden()
+            return await super().fetch_user(user_id)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.active -= 1
+
+
+@pytest.mark.parametrize("concurrency", [1, 5])
+def test_resolve_users_concurrency(concurrency: int):
+    runtime = FakeRuntime(latency=0.005)
+    bot = _TrackingBot([], runtime=runtime, users=[FakeMember(i) for i in range(1, 31)])
+    ctx = FakeContext(bot=bot)
+    user_ids = list(range(1, 31))
+    users = asyncio.run(
+        resolve_users(
+            ctx, user_ids, members=False, cache=UserCache(), concurrency=concurrency
+        )
+    )
+    assert list(users) == user_ids
+    assert bot.peak == concurrency
+
+
+def test_resolve_users_fetch_failure():
+    runtime = FakeRuntime(latency=0.005)
+    bot = _TrackingBot(
+        [], runtime=runtime, users=[FakeMember(i) for i in range(1, 31)], fail=3
+    )
+    ctx = FakeContext(bot=bot)
+    with pytest.raises(discord.Forbidden):
+        asyncio.run(
+            resolve_users(ctx, range(1, 31), members=False, cache=UserCache(), concurrency=5)
+        )
+    # the other fetches are cancelled instead of left running
+    assert bot.cancelled > 0
+    assert runtime.http_calls["fetch_user"] < 30
+    assert bot.active == 0
+
+
+def test_user_cache_member_ttl():
+    cache = UserCache(ttl=60, member_ttl=0.01)
+    cache.set(None, FakeMember(1))
+    cache.set(10, FakeMember(1))
+    time.sleep(0.02)
+    assert cache.get(None, 1).id == 1
+    assert cache.get(10, 1) is None
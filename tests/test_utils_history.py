@@ -0,0 +1,98 @@
+import asyncio
+import datetime
+from types import SimpleNamespace
+
+import discord
+import pytest
+
+from discord_ext_commands_coghelper.utils import aggregate_history, scan_history
+from discord_ext_commands_coghelper.testing import FakeMessage, FakeTextChannel
+from tests import JST
+
+BASE = datetime.datetime(2020, 1, 1)
+
+
+def _snowflake(minutes: int) -> int:
+    return discord.utils.time_snowflake(BASE + datetime.timedelta(minutes=minutes))
+
+
+def _make_channels(count: int, messages: int, tracker=None):
+    channels = []
+    for i in range(count):
+        channel = FakeTextChannel(_snowflake(0) + i, latency=0.001)
+        channel.tracker = tracker
+        for minute in range(1, messages + 1):
+            channel.add_message(FakeMessage(_snowflake(minute) + i))
+        channels.append(channel)
+    return channels
+
+
+async def _collect(iterator):
+    return [message async for message in iterator]
+
+
+def test_scan_history():
+    tracker = SimpleNamespace(active=0, peak=0)
+    channels = _make_channels(6, 250, tracker)
+    messages = asyncio.run(_collect(scan_history(channels, concurrency=2)))
+    assert len(messages) == 6 * 250
+    assert len({message.id for message in messages}) == 6 * 250
+    assert tracker.peak == 2
+    # messages of a channel are newest first
+    first = [message.id for message in messages if message.channel is channels[0]]
+    assert first == sorted(first, reverse=True)
+
+
+def test_scan_history_window():
+    channels = _make_channels(2, 100)
+    before = (BASE + datetime.timedelta(minutes=50, seconds=30)).replace(
+        tzinfo=datetime.timezone.utc
+    ).astimezone(JST)
+    after = BASE + datetime.timedelta(minutes=10, seconds=30)
+    messages = asyncio.run(
+        _collect(scan_history(channels, before=before, after=after))
+    )
+    # minutes 11 to 50
+    assert len(messages) == 2 * 40
+
+
+def test_scan_history_break():
+    channels = _make_channels(4, 1000)
+
+    async def run():
+        count = 0
+        async for _ in scan_history(channels, concurrency=4):
+            count += 1
+            if count == 10:
+                break
+        await asyncio.sleep(0.01)
+        return sum(channel.history_count for channel in channels)
+
+    # stops fetching, the buffer is bounded
+    assert asyncio.run(run()) < 4 * 10
+
+
+@pytest.mark.parametrize("ignore_forbidden", [True, False])
+def test_scan_history_forbidden(ignore_forbidden: bool):
+    channels = _make_channels(2, 10)
+    channels[1].forbidden = True
+    iterator = scan_history(channels, ignore_forbidden=ignore_forbidden)
+    if ignore_forbidden:
+        assert len(asyncio.run(_collect(iterator))) == 10
+    else:
+        with pytest.raises(discord.Forbidden):
+            asyncio.run(_collect(iterator))
+
+
+def test_aggregate_history():
+    channels = _make_channels(3, 250)
+    counts = {}
+    pages = []
+
+    def on_page(channel, page):
+        counts[channel.id] = counts.get(channel.id, 0) + len(page)
+        pages.append(len(page))
+
+    asyncio.run(aggregate_history(channels, on_page, concurrency=2, page_size=100))
+    assert list(counts.values()) == [250, 250, 250]
+    assert max(pages) == 100
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+
+from discord_ext_commands_coghelper.utils import (
+    LocationCache,
+    MemoryLocationCache,
+    SqliteLocationCache,
+    get_default_location_cache,
+    set_default_location_cache,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path) -> LocationCache:
+    if request.param == "memory":
+        yield MemoryLocationCache(maxsize=2, negative_ttl=0.05)
+        return
+    cache = SqliteLocationCache(str(tmp_path / "locations.db"), negative_ttl=0.05)
+    yield cache
+    cache.close()
+
+
+def test_location_cache(cache: LocationCache):
+    assert cache.get(1) is None
+    cache.set(1, 10)
+    assert cache.get(1) == 10
+    cache.discard(1)
+    assert cache.get(1) is None
+
+
+def test_location_cache_missing(cache: LocationCache):
+    assert not cache.is_missing(100, 1)
+    cache.set_missing(100, 1)
+    assert cache.is_missing(100, 1)
+    assert not cache.is_missing(200, 1)
+    time.sleep(0.06)
+    assert not cache.is_missing(100, 1)
+
+
+def test_memory_location_cache_eviction():
+    cache = MemoryLocationCache(maxsize=2)
+    cache.set(1, 10)
+    cache.set(2, 20)
+    assert cache.get(1) == 10
+    cache.set(3, 30)
+    assert cache.get(2) is None
+    assert len(cache) == 2
+
+
+def test_memory_location_cache_ttl():
+    cache = MemoryLocationCache(ttl=0.05)
+    cache.set(1, 10)
+    time.sleep(0.06)
+    assert cache.get(1) is None
+
+
+def test_sqlite_location_cache_persistence(tmp_path):
+    path = str(tmp_path / "locations.db")
+    cache = SqliteLocationCache(path)
+    cache.set(1, 10)
+    cache.close()
+    cache = SqliteLocationCache(path)
+    assert cache.get(1) == 10
+    cache.close()
+
+
+def test_sqlite_location_cache_in_event_loop(tmp_path):
+    path = str(tmp_path / "locations.db")
+    cache = SqliteLocationCache(path)
+
+    async def run():
+        cache.set(1, 10)
+        cache.set_missing(100, 2)
+        # buffered writes are visible before they are committed
+        assert cache.get(1) == 10
+        assert cache.is_missing(100, 2)
+        cache.discard(1)
+        assert cache.get(1) is None
+        cache.set(3, 30)
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+    cache.close()
+    cache = SqliteLocationCache(path)
+    assert cache.get(1) is None
+    assert cache.get(3) == 30
+    assert cache.is_missing(100, 2)
+    cache.close()
+
+
+def test_default_location_cache_is_opt_in():
+    default = get_default_location_cache()
+    default.set(1, 10)
+    assert default.get(1) is None
+    cache = MemoryLocationCache()
+    set_default_location_cache(cache)
+    try:
+        assert get_default_location_cache() is cache
+    finally:
+        set_default_location_cache(None)
+    assert get_default_location_cache().get(1) is None
@@ -7,6 +7,8 @@ from discord_ext_commands_coghelper.utils import (
     to_utc_naive,
     try_strptime,
     try_strftime,
+    try_strptime_many,
+    try_strftime_many,
 )
 from tests import JST, UTC
 
@@ -44,6 +46,9 @@ def test_to_utc_naive(dt: datetime.datetime, expected):
             None,
             None,
         ),
+        ("２０２２-01-01", ["%Y-%m-%d"], None, datetime.datetime(2022, 1, 1)),
+        ("2022-01-01T00", ["%Y-%m-%dT00"], None, datetime.datetime(2022, 1, 1)),
+        ("2022-01- 5", ["%Y-%m-%d"], None, datetime.datetime(2022, 1, 5)),
     ],
 )
 def test_try_strptime(data: str, fmts: List[str], default: datetime.datetime, expected):
@@ -69,3 +74,63 @@ def test_try_strptime(data: str, fmts: List[str], default: datetime.datetime, ex
 )
 def test_try_strftime(dt: datetime.datetime, fmts: List[str], default: str, expected):
     assert try_strftime(dt, *fmts, default=default) == expected
+
+
+@pytest.mark.parametrize(
+    ("data", "fmts", "default", "expected"),
+    [
+        (
+            ["2000-01-01", "2000/01/02", "2000-01-03", "invalid", None],
+            ["%Y/%m/%d", "%Y-%m-%d"],
+            None,
+            [
+                datetime.datetime(2000, 1, 1),
+                datetime.datetime(2000, 1, 2),
+                datetime.datetime(2000, 1, 3),
+                None,
+                None,
+            ],
+        ),
+        ([], ["%Y-%m-%d"], None, []),
+        (
+            # the second value can be parsed by both formats
+            ["13/02/2000", "03/04/2000"],
+            ["%m/%d/%Y", "%d/%m/%Y"],
+            None,
+            [datetime.datetime(2000, 2, 13), datetime.datetime(2000, 3, 4)],
+        ),
+    ],
+)
+def test_try_strptime_many(data: List[str], fmts: List[str], default, expected):
+    assert try_strptime_many(data, *fmts, default=default) == expected
+    assert [try_strptime(value, *fmts, default=default) for value in data] == expected
+
+
+class _HourlessDatetime(datetime.datetime):
+    def strftime(self, fmt):
+        if "%H" in fmt and self.hour == 0:
+            raise ValueError("no hour")
+        return super().strftime(fmt)
+
+
+@pytest.mark.parametrize(
+    ("dts", "fmts", "default", "expected"),
+    [
+        (
+            [datetime.datetime(2000, 1, 1), datetime.datetime(2000, 1, 2), None],
+            ["%Y-%m-%d"],
+            "-",
+            ["2000-01-01", "2000-01-02", "-"],
+        ),
+        (
+            # the first format fails only for the first value
+            [_HourlessDatetime(2000, 1, 1, 0), _HourlessDatetime(2000, 1, 1, 5)],
+            ["%Y-%m-%d %H", "%Y-%m-%d"],
+            None,
+            ["2000-01-01", "2000-01-01 05"],
+        ),
+    ],
+)
+def test_try_strftime_many(dts: List[datetime.datetime], fmts: List[str], default, expected):
+    assert try_strftime_many(dts, *fmts, default=default) == expected
+    assert [try_strftime(dt, *fmts, default=default) for dt in dts] == expected
@@ -0,0 +1,88 @@
+import datetime
+from types import SimpleNamespace
+from typing import List, Optional
+
+import discord
+import pytest
+
+from discord_ext_commands_coghelper.utils import (
+    filter_snowflakes,
+    get_before_after,
+    get_snowflake_bounds,
+    time_to_snowflake,
+)
+from discord_ext_commands_coghelper.testing import FakeContext
+from tests import JST
+
+
+@pytest.mark.parametrize(
+    "dt",
+    [
+        datetime.datetime(2015, 1, 1),
+        datetime.datetime(2020, 1, 1, 12, 34, 56, 789123),
+        datetime.datetime(2038, 1, 19, 3, 14, 8, 999999),
+    ],
+)
+@pytest.mark.parametrize("high", [False, True])
+def test_time_to_snowflake(dt: datetime.datetime, high: bool):
+    assert time_to_snowflake(dt, high) == discord.utils.time_snowflake(dt, high)
+    aware = dt.replace(tzinfo=datetime.timezone.utc).astimezone(JST)
+    assert time_to_snowflake(aware, high) == time_to_snowflake(dt, high)
+    naive = aware.replace(tzinfo=None)
+    assert time_to_snowflake(naive, high, JST) == time_to_snowflake(dt, high)
+
+
+def test_get_snowflake_bounds():
+    ctx = FakeContext()
+    dic = dict(before="2020-01-31", after="2020-01-01")
+    before, after = get_before_after(ctx, dic, "%Y-%m-%d", JST)
+    before_id, after_id = get_snowflake_bounds(before, after)
+    assert before_id == discord.utils.time_snowflake(
+        datetime.datetime(2020, 1, 30, 15), high=False
+    )
+    assert after_id == discord.utils.time_snowflake(
+        datetime.datetime(2019, 12, 31, 15), high=True
+    )
+    # naive values are in tz
+    naive = get_before_after(ctx, dic, "%Y-%m-%d")
+    assert get_snowflake_bounds(*naive, tz=JST) == (before_id, after_id)
+
+    owner = SimpleNamespace(id=after_id - 100)
+    assert get_snowflake_bounds(None, None, owner) == (None, owner.id)
+    assert get_snowflake_bounds(before, None, owner) == (before_id, owner.id)
+    assert get_snowflake_bounds(None, None) == (None, None)
+
+
+SNOWFLAKES = [10, 20, 30, 40, 50]
+
+
+@pytest.mark.parametrize(
+    ("before", "after", "expected"),
+    [
+        (None, None, SNOWFLAKES),
+        (40, None, [10, 20, 30]),
+        (None, 20, [30, 40, 50]),
+        (41, 19, [20, 30, 40]),
+        (20, 30, []),
+    ],
+)
+@pytest.mark.parametrize("assume_sorted", [False, True])
+def test_filter_snowflakes(
+    before: Optional[int],
+    after: Optional[int],
+    expected: List[int],
+    assume_sorted: bool,
+):
+    assert (
+        filter_snowflakes(SNOWFLAKES, before, after, assume_sorted=assume_sorted)
+        == expected
+    )
+    if not assume_sorted:
+        assert filter_snowflakes(SNOWFLAKES[::-1], before, after) == expected[::-1]
+
+
+def test_filter_snowflakes_array():
+    numpy = pytest.importorskip("numpy")
+    snowflakes = numpy.array(SNOWFLAKES, dtype=numpy.uint64)
+    assert filter_snowflakes(snowflakes, 41, 19).tolist() == [20, 30, 40]
+    assert filter_snowflakes(snowflakes).tolist() == SNOWFLAKES
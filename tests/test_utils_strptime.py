@@ -0,0 +1,81 @@
+import datetime
+from typing import List, Optional
+
+import pytest
+
+from discord_ext_commands_coghelper.utils import DatetimeParser, get_datetime_parser
+
+
+@pytest.mark.parametrize(
+    ("data", "fmts", "expected"),
+    [
+        ("2000-01-31", ["%Y/%m/%d", "%Y-%m-%d"], datetime.datetime(2000, 1, 31)),
+        ("20000131", ["%Y/%m/%d", "%Y-%m-%d", "%Y%m%d"], datetime.datetime(2000, 1, 31)),
+        (
+            "2000-01-31t10:20",
+            ["%Y-%m-%dT%H:%M"],
+            datetime.datetime(2000, 1, 31, 10, 20),
+        ),
+        (
+            "Jan 31 2000",
+            ["%Y-%m-%d", "%b %d %Y"],
+            datetime.datetime(2000, 1, 31),
+        ),
+        # accepted by strptime, not skipped by the literal characters
+        ("２０２２-01-01", ["%Y/%m/%d", "%Y-%m-%d"], datetime.datetime(2022, 1, 1)),
+        ("2022-01-01T00", ["%Y-%m-%d", "%Y-%m-%dT00"], datetime.datetime(2022, 1, 1)),
+        ("2022-01- 5", ["%Y/%m/%d", "%Y-%m-%d"], datetime.datetime(2022, 1, 5)),
+        ("2000#01#31", ["%Y-%m-%d", "%Y/%m/%d"], None),
+        ("2000-13-31", ["%Y-%m-%d"], None),
+    ],
+)
+def test_datetime_parser(data: str, fmts: List[str], expected: Optional[datetime.datetime]):
+    parser = DatetimeParser(tuple(fmts))
+    assert parser.parse(data) == expected
+    # cached result
+    assert parser.parse(data) == expected
+    assert parser.cache_hits == 1
+
+
+def test_datetime_parser_stats():
+    parser = DatetimeParser(("%Y/%m/%d", "%Y-%m-%d", "%Y%m%d"))
+    for day in range(1, 4):
+        assert parser.parse(f"2000-01-0{day}") == datetime.datetime(2000, 1, day)
+    assert parser.parse("2000/01/01") == datetime.datetime(2000, 1, 1)
+
+    stats = parser.stats
+    assert stats["%Y-%m-%d"].hits == 3
+    assert stats["%Y/%m/%d"].hits == 1
+    # mismatched separators never reach strptime
+    assert stats["%Y/%m/%d"].misses == 0
+    assert stats["%Y%m%d"].misses == 0
+    # hits do not change the order
+    assert parser.order == parser.fmts
+
+    parser.reset_stats()
+    assert parser.stats["%Y-%m-%d"].hits == 0
+    assert parser.order == parser.fmts
+
+
+def test_get_datetime_parser():
+    assert get_datetime_parser("%Y", "%m") is get_datetime_parser("%Y", "%m")
+    assert get_datetime_parser("%Y", "%m") is not get_datetime_parser("%m", "%Y")
+
+
+def test_datetime_parser_default():
+    parser = DatetimeParser(("%Y-%m-%d",))
+    default = datetime.datetime(1999, 1, 1)
+    assert parser.parse("invalid", default) == default
+    assert parser.parse(None, default) == default
+
+
+def test_datetime_parser_ambiguous():
+    parser = DatetimeParser(("%m/%d/%Y", "%d/%m/%Y"))
+    # only the second format can parse it
+    assert parser.parse("13/02/2000") == datetime.datetime(2000, 2, 13)
+    # both can, the first one wins regardless of the earlier hits
+    assert parser.parse("03/04/2000") == datetime.datetime(2000, 3, 4)
+    assert parser.parse_with_format("03/04/2000") == (
+        datetime.datetime(2000, 3, 4),
+        "%m/%d/%Y",
+    )